@@ -0,0 +1,115 @@
+"""
+Скомпилированные ключи ответов заданий.
+
+Проверка ответа раньше на каждом сохранении разрешала GenericForeignKey
+задания (лишний запрос), заново собирала get_task_data и прогоняла
+правильные ответы через bleach и нормализацию. Ключ собирает всё это один
+раз: очищенные и нормализованные ответы пропусков, флаги правильности
+вариантов, карта карточек, очищенный текст по умолчанию.
+
+Ключ хранится в двухуровневом кеше по specific-объекту (content_type_id,
+object_id): задания-копии ссылаются на тот же specific и делят один ключ.
+Когда клон переключает задание на новый specific, меняется object_id,
+а значит и ключ. Правка specific на месте (TaskProcessor) удаляет ключ
+явно после commit. Локальный уровень других процессов может отставать
+на CLASSROOM_ANSWER_KEY_LOCAL_TTL секунд.
+"""
+from dataclasses import dataclass, field
+
+import bleach
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from classroom.utils.format_string import normalize_answer_string
+from classroom.utils.tiered_cache import TieredCache
+
+ALLOWED_TAGS = ['strong', 'b', 'i', 'u', 'ul', 'ol', 'li', 'div', 'p', 'br', 'span', 'sup']
+
+answer_key_cache = TieredCache(
+    "answer_key",
+    maxsize=getattr(settings, "CLASSROOM_ANSWER_KEY_LOCAL_SIZE", 4096),
+    local_ttl=getattr(settings, "CLASSROOM_ANSWER_KEY_LOCAL_TTL", 5),
+    shared_ttl=getattr(settings, "CLASSROOM_ANSWER_KEY_TTL", 3600),
+)
+
+
+def clean_html(html):
+    """Очищает HTML от неразрешенных тегов, атрибутов и стилей"""
+    if not html:
+        return html
+    return bleach.clean(html, tags=ALLOWED_TAGS, attributes={}, strip=True)
+
+
+def clean_text(text):
+    """Очищает текстовое содержимое от HTML"""
+    if not text:
+        return text
+    return bleach.clean(text, tags=[], strip=True)
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerKey:
+    task_type: str
+    total_answers: int = 0
+    # test: флаги правильности вариантов по вопросам
+    options: tuple = ()
+    # true_false: правильное значение каждого утверждения
+    statements: tuple = ()
+    # fill_gaps: очищенные и нормализованные правильные ответы
+    gaps: tuple = ()
+    # match_cards: card_left -> card_right
+    cards: dict = field(default_factory=dict)
+    # text_input: очищенный текст по умолчанию
+    default_text: str = ""
+
+
+def compile_answer_key(task_type, specific) -> AnswerKey:
+    total_answers = getattr(specific, "total_answers", 0) or 0
+
+    if task_type == "test":
+        return AnswerKey(task_type, total_answers, options=tuple(
+            tuple(bool(option.get("is_correct", False)) for option in question.get("options", []))
+            for question in specific.questions or []
+        ))
+    if task_type == "true_false":
+        return AnswerKey(task_type, total_answers, statements=tuple(
+            bool(statement.get("is_true", False)) for statement in specific.statements or []
+        ))
+    if task_type == "fill_gaps":
+        return AnswerKey(task_type, total_answers, gaps=tuple(
+            normalize_answer_string(clean_text(str(answer))) for answer in specific.answers or []
+        ))
+    if task_type == "match_cards":
+        cards = {}
+        for card in specific.cards or []:
+            cards.setdefault(card.get("card_left", ""), card.get("card_right", ""))
+        return AnswerKey(task_type, total_answers, cards=cards)
+    if task_type == "text_input":
+        return AnswerKey(task_type, default_text=clean_html(specific.default_text or "") or "")
+    return AnswerKey(task_type, total_answers)
+
+
+def _load_answer_key(task):
+    content_type = ContentType.objects.get_for_id(task.content_type_id)
+    specific = content_type.model_class()._default_manager.filter(pk=task.object_id).first()
+    if specific is None:
+        return None
+    return compile_answer_key(task.task_type, specific)
+
+
+def get_answer_key(task):
+    """
+    Возвращает AnswerKey задания; None, если specific не найден.
+    """
+    return answer_key_cache.get(
+        f"{task.content_type_id}:{task.object_id}", lambda: _load_answer_key(task)
+    )
+
+
+def invalidate_answer_key(content_type_id, object_id):
+    """
+    Удаляет ключ specific-объекта после commit текущей транзакции:
+    у всех заданий, которые на него ссылаются.
+    """
+    transaction.on_commit(lambda: answer_key_cache.delete(f"{content_type_id}:{object_id}"))
@@ -1,78 +1,173 @@
 import json
+import time
 import asyncio
+import logging
+from collections import OrderedDict
 from typing import Optional
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+
+from classroom.models import Classroom
+from classroom.services.answers import save_user_answer, build_answer_payload, UnsupportedTaskType
+from classroom.services.event_log import get_event_log, publish_event, stamp_frame
+from classroom.services.lanes import LANE_CONTROL, control_channel, event_lane, get_outbox_max_pending, lane_group
+from classroom.services.channel_registry import get_channel_registry
+from classroom.services.connection_state import ConnectionState
+from classroom.services.keepalive import IDLE_CLOSE_CODE, get_ping_interval, ticker
+from classroom.services.presence import get_presence
+from classroom.services.roster import aget_role, ROLE_TEACHER, ROLE_STUDENT
+from classroom.utils import metrics
+from classroom.utils.json_codec import dumps, encode_frame
+from classroom.utils.outbound_queue import OutboundQueue
+from classroom.utils.rate_limit import InboundLimiter, POLICY_DROP, POLICY_MERGE
+from classroom.utils.wire_format import JSON_WIRE, get_wire, negotiate
+from courses.models import Task
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# Действия, повторы которых для одной пары (task_id, student_id)
+# схлопываются в исходящей очереди: клиент всё равно перезапрашивает состояние
+COALESCED_ACTIONS = {
+    "answer:sent",
+    "answer:reset",
+    "section:change",
+    "section_list:change",
+    "chat:update",
+    "user:online:event",
+    "user:offline:event",
+}
+
+
+def get_batch_window():
+    """
+    Окно микробатчинга исходящих кадров в секундах; 0 — батчинг выключен.
+    """
+    return getattr(settings, "CLASSROOM_BATCH_WINDOW_MS", 0) / 1000
 
 
 class VirtualClassConsumer(AsyncWebsocketConsumer):
-    _active_connections = {}
-    _lock = asyncio.Lock()
+    """
+    Соединение виртуального класса.
+
+    Всё состояние соединения — в компактной записи self.state
+    (classroom.services.connection_state); экземпляр пользователя после
+    подключения не удерживается. Keepalive общий для процесса
+    (classroom.services.keepalive), а не задача на каждый сокет.
+    Редко нужные атрибуты заданы на классе и попадают в __dict__
+    экземпляра только когда используются.
+    """
+
+    outbox = None
+    wire = JSON_WIRE
+    _merged = None
+    _merge_task = None
+    _control_task = None
+    _replay_frames = None
+
+    @property
+    def classroom_id(self):
+        return self.state.classroom_id
+
+    @property
+    def user_id(self):
+        return self.state.user_id
+
+    @property
+    def is_teacher(self) -> bool:
+        return self.state.is_teacher
+
+    @property
+    def is_student(self) -> bool:
+        return self.state.is_student
 
     async def connect(self):
-        Classroom = apps.get_model("classroom", "Classroom")
+        classroom_id = self.scope.get("url_route", {}).get("kwargs", {}).get("classroom_id")
+        user = self.scope.get("user")
 
-        self.classroom_id = (
-            self.scope.get("url_route", {}).get("kwargs", {}).get("classroom_id")
-        )
-        self.user = self.scope.get("user")
-        self.user_id = getattr(self.user, "id", None)
-
-        if not self.classroom_id or not self.user or not self.user.is_authenticated:
-            await self.close()
-            return
-
-        try:
-            self.classroom = await database_sync_to_async(Classroom.objects.get)(id=self.classroom_id)
-        except Classroom.DoesNotExist:
+        if not classroom_id or not user or not user.is_authenticated:
             await self.close()
             return
 
-        self.is_teacher = await self._is_teacher()
-        self.is_student = await self._is_student()
-        if not (self.is_teacher or self.is_student):
+        role = await aget_role(classroom_id, user.id)
+        if role not in (ROLE_TEACHER, ROLE_STUDENT):
             await self.close()
             return
 
-        self.groups_map = {
-            "classroom": f"classroom_{self.classroom_id}",
-            "user": f"user_{self.user_id}",
-            "students": f"classroom_{self.classroom_id}_students",
-            "teacher": f"classroom_{self.classroom_id}_teacher",
-        }
-
-        await self.channel_layer.group_add(self.groups_map["classroom"], self.channel_name)
-        await self.channel_layer.group_add(self.groups_map["user"], self.channel_name)
-
-        if self.is_student:
-            await self.channel_layer.group_add(self.groups_map["students"], self.channel_name)
-        if self.is_teacher:
-            await self.channel_layer.group_add(self.groups_map["teacher"], self.channel_name)
-
-        await self.accept()
-
-        await self.send(text_data=json.dumps({
-            "type": "connected",
-            "data": {
-                "classroom_id": self.classroom_id,
-                "user_id": self.user_id,
-                "is_teacher": self.is_teacher,
-            }
+        state = ConnectionState.from_user(classroom_id, user, role)
+        # Дальше соединению нужен только state: экземпляр User из scope отпускаем
+        self.scope["user"] = state
+        self.control_channel = control_channel(self.channel_name)
+
+        # Управляющие события приходят по отдельной полосе: группы-двойники
+        # и второй канал соединения, который читает _control_loop.
+        # Каналы отмечаются в реестре до вступления в группы, иначе
+        # чистильщик может принять свежее членство за мёртвое
+        await get_channel_registry(self.channel_layer).touch([self.channel_name, self.control_channel])
+        await asyncio.gather(*(
+            add
+            for group in state.member_groups
+            for add in (
+                self.channel_layer.group_add(group, self.channel_name),
+                self.channel_layer.group_add(lane_group(group, LANE_CONTROL), self.control_channel),
+            )
+        ))
+        self.state = state
+
+        # Клиент может предложить бинарный подпротокол MessagePack
+        subprotocol = negotiate(self.scope.get("subprotocols"))
+        if subprotocol is not None:
+            self.wire = get_wire(subprotocol)
+        await self.accept(subprotocol)
+        state.last_seen = time.monotonic()
+
+        self.limiter = InboundLimiter(classroom_id)
+
+        window = get_batch_window()
+        if window > 0:
+            self.outbox = OutboundQueue(self._send_frame, window, get_outbox_max_pending(), self.wire.batch)
+
+        await self._send_frame(encode_frame("connected", {
+            "classroom_id": self.classroom_id,
+            "user_id": self.user_id,
+            "is_teacher": self.is_teacher,
+            "seq": await get_event_log(self.channel_layer).current_seqs(state.member_groups),
+            "ping_interval": get_ping_interval(),
         }))
 
         if self.is_student:
             await self._send_online_status_to_teacher(online=True)
 
+        ticker.add(self)
+        self._control_task = asyncio.create_task(self._control_loop())
+
     async def disconnect(self, close_code):
-        if hasattr(self, 'is_student') and self.is_student:
-            await self._send_online_status_to_teacher(online=False)
+        ticker.discard(self)
+        if self.outbox is not None:
+            self.outbox.close()
+
+        for task in (self._control_task, self._merge_task):
+            if task is not None:
+                task.cancel()
 
-        if not hasattr(self, "groups_map"):
+        state = getattr(self, "state", None)
+        if state is None:
             return
-        for group in self.groups_map.values():
+        if state.is_student:
+            await self._send_online_status_to_teacher(online=False)
+
+        try:
+            await get_channel_registry(self.channel_layer).remove([self.channel_name, self.control_channel])
+        except Exception:
+            logger.warning("Failed to unregister channel %s", self.channel_name, exc_info=True)
+        for group in state.member_groups:
             try:
                 await self.channel_layer.group_discard(group, self.channel_name)
+                await self.channel_layer.group_discard(lane_group(group, LANE_CONTROL), self.control_channel)
             except Exception:
                 pass
 
@@ -86,15 +181,28 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
             await self.send_error("Invalid JSON format")
             return
 
+        self.state.last_seen = time.monotonic()
         action_type = payload.get("type")
         data = payload.get("data", {}) or {}
-        task_id = data.get("task_id")
-        student_id = data.get("student_id")
 
         if not action_type:
             await self.send_error("Message 'type' is required")
             return
 
+        if action_type == "pong":
+            return
+        if action_type == "ping":
+            await self._send_frame(encode_frame("pong", {}))
+            return
+
+        if not await self._admit(action_type, data):
+            return
+        await self._handle_action(action_type, data)
+
+    async def _handle_action(self, action_type, data):
+        task_id = data.get("task_id")
+        student_id = data.get("student_id")
+
         if action_type in ["chat:send_message", "chat:update"]:
             await self._handle_chat_message(action_type, data)
             return
@@ -103,6 +211,14 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
             await self._handle_user_delete(data)
             return
 
+        if action_type == "answer:save":
+            await self._handle_answer_save(data)
+            return
+
+        if action_type == "resume":
+            await self._handle_resume(data)
+            return
+
         if self.is_teacher:
             if action_type == "users:online":
                 await self._handle_users_online()
@@ -120,6 +236,64 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
 
         await self.send_error("Доступ запрещен.")
 
+    async def _admit(self, action_type, data) -> bool:
+        """
+        Пропускает действие через токен-бакеты соединения и класса.
+        При исчерпании применяет политику действия: reject, drop или merge.
+        """
+        limiter = getattr(self, "limiter", None)
+        if limiter is None:
+            return True
+
+        wait = limiter.acquire(action_type)
+        if not wait:
+            return True
+
+        policy = limiter.policy(action_type)
+        if policy == POLICY_MERGE:
+            key = (action_type, data.get("task_id"), str(data.get("student_id")))
+            if self._merged is None:
+                self._merged = OrderedDict()
+            if self._merged.pop(key, None) is not None:
+                metrics.incr(f"ws_inbound_merged:{action_type}")
+            else:
+                metrics.incr(f"ws_inbound_deferred:{action_type}")
+            self._merged[key] = data
+            if self._merge_task is None:
+                self._merge_task = asyncio.create_task(self._flush_merged(wait))
+        elif policy == POLICY_DROP:
+            metrics.incr(f"ws_inbound_dropped:{action_type}")
+        else:
+            metrics.incr(f"ws_inbound_rejected:{action_type}")
+            await self._send_frame(encode_frame("rate_limited", {
+                "action": action_type,
+                "request_id": data.get("request_id"),
+                "retry_after_ms": int(wait * 1000) + 1,
+            }))
+        return False
+
+    async def _flush_merged(self, delay):
+        """
+        Выполняет отложенные merge-действия по мере появления токенов;
+        для каждого ключа выполняется только последнее.
+        """
+        try:
+            await asyncio.sleep(delay)
+            while self._merged:
+                key, data = next(iter(self._merged.items()))
+                wait = self.limiter.acquire(key[0])
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                del self._merged[key]
+                try:
+                    await self._handle_action(key[0], data)
+                except Exception:
+                    logger.exception("Merged action %s failed in classroom %s", key[0], self.classroom_id)
+        finally:
+            self._merged = None
+            self._merge_task = None
+
     async def _handle_user_delete(self, payload):
         if not self.is_teacher:
             await self.send_error("Только учитель может удалить ученика")
@@ -130,52 +304,162 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
             await self.send_error("student_id is required for user:delete")
             return
 
-        await self.channel_layer.group_send(
+        await self._publish(
             f"user_{student_id}",
             {
                 "type": "user_deleted_event",
-                "action": "user:delete",
+                "recipient": ROLE_STUDENT,
                 "student_id": student_id,
                 "sender_id": self.user_id,
-                "sender_username": getattr(self.user, "username", "Anonymous"),
-                "payload": payload,
+                "frame": encode_frame("user:deleted", {
+                    "student_id": student_id,
+                    "message": "Вы были удалены из класса",
+                }),
             }
         )
 
-        await self.channel_layer.group_send(
-            self.groups_map["teacher"],
+        await self._publish(
+            self.state.teacher_group,
             {
                 "type": "user_deleted_event",
-                "action": "user:delete",
+                "recipient": ROLE_TEACHER,
                 "student_id": student_id,
                 "sender_id": self.user_id,
-                "sender_username": getattr(self.user, "username", "Anonymous"),
-                "payload": payload,
+                "frame": encode_frame("user:delete:event", {
+                    "student_id": student_id,
+                    "deleted_by": self.user_id,
+                }),
             }
         )
 
+    async def _handle_answer_save(self, data):
+        """
+        Сохраняет ответ и отвечает отправителю кадром answer:saved с результатом.
+        Вторая сторона получает answer:sent уже с данными ответа и не делает запрос.
+        """
+        request_id = data.get("request_id")
+        task_id = data.get("task_id")
+        student_id = data.get("student_id")
+
+        if self.is_student:
+            student_id = self.user_id
+        if not task_id or student_id in (None, "", "all"):
+            await self._reply_answer_saved(request_id, errors="task_id and student_id required")
+            return
+
+        role = await aget_role(self.classroom_id, student_id)
+        if role is None or (self.is_student and str(student_id) != str(self.user_id)):
+            await self._reply_answer_saved(request_id, errors="Access denied")
+            return
+
+        result, errors = await self._save_answer(task_id, student_id, data.get("data") or {})
+        if errors:
+            await self._reply_answer_saved(request_id, errors=errors)
+            return
+
+        await self._reply_answer_saved(request_id, result=result)
+
+        event_payload = {"answer": result["answer"], "task_type": result["task_type"]}
+        if self.is_student:
+            await self._publish(
+                self.state.teacher_group,
+                self._format_event("student_to_teacher", "answer:sent", result["task_id"], str(self.user_id), event_payload)
+            )
+        elif role == ROLE_STUDENT:
+            await self._publish(
+                f"user_{student_id}",
+                self._format_event("user_targeted", "answer:sent", result["task_id"], student_id, event_payload)
+            )
+
+    async def _reply_answer_saved(self, request_id, result=None, errors=None):
+        data = {"request_id": request_id, "success": errors is None}
+        if errors is None:
+            data.update(result)
+        else:
+            data["errors"] = errors
+        await self._send_frame(encode_frame("answer:saved", data))
+
+    @database_sync_to_async
+    def _save_answer(self, task_id, student_id, data):
+        try:
+            task = Task.objects.get(id=task_id)
+            classroom = Classroom.objects.get(id=self.classroom_id)
+            target_user = User.objects.get(id=student_id)
+        except (Task.DoesNotExist, Classroom.DoesNotExist, User.DoesNotExist, ValueError):
+            return None, "Не найдено"
+
+        try:
+            answer, _ = save_user_answer(classroom, task, target_user, data)
+        except UnsupportedTaskType:
+            return None, "Unsupported task type"
+        except ValidationError as exc:
+            return None, " ".join(exc.messages)
+        except Exception:
+            logger.exception("Failed to save answer for task %s, student %s", task_id, student_id)
+            return None, "Internal server error"
+        return build_answer_payload(task, answer), None
+
+    async def _handle_resume(self, data):
+        """
+        Досылает события, пропущенные в потоках групп соединения.
+
+        last_seq — словарь {stream: seq}. Ответ resume:result содержит
+        пропущенные кадры каждого потока в исходном порядке, отфильтрованные
+        так же, как при живой доставке, и текущие seq потоков.
+        complete=false означает, что часть пропуска вытеснена из журнала
+        и нужна полная перезагрузка данных.
+        """
+        last_seqs = data.get("last_seq")
+        groups = self.state.member_groups
+        try:
+            last_seqs = {group: int(last_seqs[group]) for group in groups}
+        except (TypeError, KeyError, ValueError):
+            await self.send_error("last_seq is required for resume")
+            return
+
+        log = get_event_log(self.channel_layer)
+        results = await asyncio.gather(*(log.since(group, last_seqs[group]) for group in groups))
+        complete = all(result[2] for result in results)
+
+        frames = []
+        if complete:
+            self._replay_frames = frames
+            try:
+                for group, (entries, _, _) in zip(groups, results):
+                    for seq, event in entries:
+                        handler = getattr(self, event.get("type", ""), None)
+                        if handler is None:
+                            continue
+                        await handler(dict(
+                            event, seq=seq, stream=group, frame=stamp_frame(event["frame"], group, seq),
+                        ))
+            finally:
+                del self._replay_frames
+
+        header = dumps({
+            "request_id": data.get("request_id"),
+            "complete": complete,
+            "seq": {group: result[1] for group, result in zip(groups, results)},
+        })
+        await self._send_frame(
+            '{"type":"resume:result","data":' + header[:-1] + ',"events":[' + ",".join(frames) + ']}}'
+        )
+
+    async def _publish(self, group, event):
+        await publish_event(self.channel_layer, group, event)
+
     async def _handle_users_online(self):
         if not self.is_teacher:
             await self.send_error("Only teacher can request users online")
             return
 
-        students = await database_sync_to_async(list)(
-            self.classroom.students.all().values_list("id", flat=True)
-        )
-
-        online_list = []
-        async with self._lock:
-            for student_id in students:
-                key = (self.classroom_id, student_id)
-                online_list.append({
-                    "student_id": student_id,
-                    "online": self._active_connections.get(key, 0) > 0,
-                })
+        online_ids = await get_presence(self.channel_layer).online_users(self.classroom_id)
+        online_list = [
+            {"student_id": student_id, "online": True}
+            for student_id in online_ids
+        ]
 
-        await self.send(text_data=json.dumps({
-            "type": "users:online",
-            "data": online_list
-        }))
+        await self._send_frame(encode_frame("users:online", online_list))
 
     async def _handle_chat_message(self, action_type, payload):
         text = payload.get("text")
@@ -186,37 +470,41 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
                 await self.send_error("Добавьте текст сообщения")
                 return
 
-            sender_name = await self._get_user_name()
+            sender_name = self._get_user_name()
 
-            await self.channel_layer.group_send(
-                self.groups_map["classroom"],
+            await self._publish(
+                self.state.classroom_group,
                 {
                     "type": "chat_message_event",
-                    "action": action_type,
-                    "message_id": message_id,
                     "sender_id": self.user_id,
-                    "sender_name": sender_name,
-                    "text": text,
-                    "student_id": "all",
-                    "payload": payload,
+                    "frame": encode_frame("chat:send_message", {
+                        "message_id": message_id,
+                        "text": text,
+                        "sender_id": self.user_id,
+                        "sender_name": sender_name,
+                        "student_id": "all",
+                    }),
                 }
             )
         elif action_type == "chat:update":
-            await self.channel_layer.group_send(
-                self.groups_map["classroom"],
+            await self._publish(
+                self.state.classroom_group,
                 {
                     "type": "chat_update_event",
-                    "action": action_type,
+                    "action": "chat:update",
                     "sender_id": self.user_id,
-                    "student_id": "all",
-                    "payload": payload,
+                    "frame": encode_frame("chat:update", {
+                        "sender_id": self.user_id,
+                        "student_id": "all",
+                        "payload": payload,
+                    }),
                 }
             )
 
     async def _handle_teacher_message(self, action_type, task_id, student_id, payload):
         if student_id == "all":
-            await self.channel_layer.group_send(
-                self.groups_map["students"],
+            await self._publish(
+                self.state.students_group,
                 self._format_event("classroom_broadcast", action_type, task_id, student_id, payload)
             )
             return
@@ -225,26 +513,35 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
             await self.send_error("Ученик не находится в классе")
             return
 
-        await self.channel_layer.group_send(
+        await self._publish(
             f"user_{student_id}",
             self._format_event("user_targeted", action_type, task_id, student_id, payload)
         )
 
     async def _handle_student_message(self, action_type, task_id, payload):
-        await self.channel_layer.group_send(
-            self.groups_map["teacher"],
+        await self._publish(
+            self.state.teacher_group,
             self._format_event("student_to_teacher", action_type, task_id, str(self.user_id), payload)
         )
 
     def _format_event(self, event_type, action, task_id, student_id, payload):
+        """
+        Формирует сообщение channel layer с уже закодированным клиентским кадром.
+        Получатели только фильтруют и пересылают frame.
+        """
         return {
             "type": f"{event_type}_event",
             "action": action,
             "task_id": task_id,
             "student_id": student_id,
             "sender_id": self.user_id,
-            "sender_username": getattr(self.user, "username", "Anonymous"),
-            "payload": payload,
+            "frame": encode_frame(action, {
+                "task_id": task_id,
+                "student_id": student_id,
+                "sender_id": self.user_id,
+                "sender_username": self.state.username,
+                "payload": payload,
+            }),
         }
 
     async def classroom_broadcast_event(self, event):
@@ -258,167 +555,148 @@ class VirtualClassConsumer(AsyncWebsocketConsumer):
 
     async def chat_message_event(self, event):
         if event.get("sender_id") == self.user_id:
+            await self._skip(event)
             return
-        await self.send(text_data=json.dumps({
-            "type": "chat:send_message",
-            "data": {
-                "message_id": event.get("message_id"),
-                "text": event.get("text"),
-                "sender_id": event.get("sender_id"),
-                "sender_name": event.get("sender_name"),
-                "student_id": event.get("student_id"),
-            }
-        }))
+        await self._forward(event)
 
     async def chat_update_event(self, event):
         if event.get("sender_id") == self.user_id:
+            await self._skip(event)
             return
-        await self.send(text_data=json.dumps({
-            "type": "chat:update",
-            "data": {
-                "sender_id": event.get("sender_id"),
-                "student_id": event.get("student_id"),
-                "payload": event.get("payload"),
-            }
-        }))
+        await self._forward(event)
 
     async def user_online_event(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "user:online:event",
-            "data": {
-                "student_id": event.get("student_id"),
-                "student_username": event.get("student_username"),
-            }
-        }))
+        await self._forward(event)
 
     async def user_offline_event(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "user:offline:event",
-            "data": {
-                "student_id": event.get("student_id"),
-            }
-        }))
+        await self._forward(event)
 
     async def user_deleted_event(self, event):
-        if self.is_student and str(self.user_id) == str(event.get("student_id")):
-            try:
-                await self.send(text_data=json.dumps({
-                    "type": "user:deleted",
-                    "data": {
-                        "student_id": event.get("student_id"),
-                        "message": "Вы были удалены из класса",
-                    }
-                }))
-            except:
-                pass
-            return
+        if event.get("recipient") == ROLE_STUDENT:
+            forward = self.is_student and str(self.user_id) == str(event.get("student_id"))
+        else:
+            forward = self.is_teacher and str(self.user_id) != str(event.get("sender_id"))
 
-        if self.is_teacher and str(self.user_id) != str(event.get("sender_id")):
-            try:
-                await self.send(text_data=json.dumps({
-                    "type": "user:delete:event",
-                    "data": {
-                        "student_id": event.get("student_id"),
-                        "deleted_by": event.get("sender_id"),
-                    }
-                }))
-            except:
-                pass
+        if forward:
+            await self._forward(event)
+        else:
+            await self._skip(event)
 
     async def lesson_attached(self, event):
-        try:
-            await self.send(text_data=json.dumps({
-                "type": "lesson:attached",
-                "data": {
-                    "lesson_id": event.get("lesson_id"),
-                    "payload": event.get("payload", {}),
-                }
-            }))
-        except:
-            pass
+        await self._forward(event)
+
+    async def statistics_event(self, event):
+        if self.is_teacher:
+            await self._forward(event)
+        else:
+            await self._skip(event)
 
     async def _send_event(self, event):
         sender_id = event.get("sender_id")
         if event.get("action") in ["answer:sent", "answer:reset"]:
             if self.is_student and sender_id == self.user_id:
+                await self._skip(event)
                 return
+        await self._forward(event)
+
+    async def _forward(self, event):
+        replay_frames = self._replay_frames
+        if replay_frames is not None:
+            replay_frames.append(event["frame"])
+            return
+
+        outbox = self.outbox
+        if outbox is not None:
+            outbox.push(
+                event["frame"], self._coalesce_key(event),
+                control=event_lane(event) == LANE_CONTROL,
+                seq=event.get("seq"), stream=event.get("stream"),
+            )
+            return
+        await self._send_frame(event["frame"])
+
+    async def _skip(self, event):
+        """
+        Закрывает у клиента seq события, которое соединение не пересылает.
+        При replay не нужно: resume:result сдвигает потоки до текущих seq.
+        """
+        seq = event.get("seq")
+        if seq is None or self._replay_frames is not None:
+            return
+        if self.outbox is not None:
+            self.outbox.skip(event["stream"], seq)
+            return
+        await self._send_frame(encode_frame("seq:skip", {event["stream"]: [seq]}))
+
+    @staticmethod
+    def _coalesce_key(event):
+        action = event.get("action")
+        if action not in COALESCED_ACTIONS:
+            return None
+        return (action, event.get("task_id"), str(event.get("student_id")))
+
+    async def _send_frame(self, frame):
         try:
-            await self.send(text_data=json.dumps({
-                "type": event.get("action"),
-                "data": {
-                    "task_id": event.get("task_id"),
-                    "student_id": event.get("student_id"),
-                    "sender_id": event.get("sender_id"),
-                    "sender_username": event.get("sender_username"),
-                    "payload": event.get("payload"),
-                }
-            }))
-        except:
-            pass
+            await self.send(**self.wire.message(frame))
+        except Exception:
+            # Соединение уже закрывается: кадр некуда доставить
+            logger.warning("Failed to send frame to %s", self.channel_name, exc_info=True)
 
     async def send_error(self, message: str):
-        try:
-            await self.send(text_data=json.dumps({"type": "error", "message": message}))
-        except:
-            pass
+        await self._send_frame(dumps({"type": "error", "message": message}))
 
     async def _send_online_status_to_teacher(self, online: bool):
-        async with self._lock:
-            key = (self.classroom_id, self.user_id)
-            current_count = self._active_connections.get(key, 0)
-
+        try:
             if online:
-                if current_count == 0:
-                    try:
-                        sender_name = await self._get_user_name()
-
-                        await self.channel_layer.group_send(
-                            self.groups_map["teacher"],
-                            {
-                                "type": "user_online_event",
-                                "student_id": str(self.user_id),
-                                "student_username": sender_name,
-                                "online": True,
-                            }
-                        )
-                    except:
-                        pass
-                self._active_connections[key] = current_count + 1
+                is_first = await get_presence(self.channel_layer).connect(self.classroom_id, self.user_id, self.channel_name)
+                if not is_first:
+                    return
+                sender_name = self._get_user_name()
+                await self._publish(
+                    self.state.teacher_group,
+                    {
+                        "type": "user_online_event",
+                        "action": "user:online:event",
+                        "student_id": str(self.user_id),
+                        "frame": encode_frame("user:online:event", {
+                            "student_id": str(self.user_id),
+                            "student_username": sender_name,
+                        }),
+                    }
+                )
             else:
-                if current_count == 1:
-                    try:
-                        await self.channel_layer.group_send(
-                            self.groups_map["teacher"],
-                            {
-                                "type": "user_offline_event",
-                                "student_id": str(self.user_id),
-                                "online": False,
-                            }
-                        )
-                    except:
-                        pass
-                    del self._active_connections[key]
-                elif current_count > 1:
-                    self._active_connections[key] = current_count - 1
-
-    @database_sync_to_async
-    def _is_teacher(self) -> bool:
-        return self.classroom.teacher_id == self.user_id
+                is_last = await get_presence(self.channel_layer).disconnect(self.classroom_id, self.user_id, self.channel_name)
+                if not is_last:
+                    return
+                await self._publish(
+                    self.state.teacher_group,
+                    {
+                        "type": "user_offline_event",
+                        "action": "user:offline:event",
+                        "student_id": str(self.user_id),
+                        "frame": encode_frame("user:offline:event", {
+                            "student_id": str(self.user_id),
+                        }),
+                    }
+                )
+        except Exception:
+            logger.exception(
+                "Failed to publish presence of user %s in classroom %s", self.user_id, self.classroom_id,
+            )
 
-    @database_sync_to_async
-    def _is_student(self) -> bool:
-        return self.classroom.students.filter(id=self.user_id).exists()
+    async def _control_loop(self):
+        """
+        Читает канал полосы control и передаёт события обычным обработчикам.
+        """
+        while True:
+            message = await self.channel_layer.receive(self.control_channel)
+            try:
+                await self.dispatch(message)
+            except Exception:
+                logger.exception("Control event %s failed in classroom %s", message.get("type"), self.classroom_id)
 
-    @database_sync_to_async
-    def _student_in_class(self, student_id) -> bool:
-        try:
-            sid = int(student_id)
-        except (ValueError, TypeError):
-            return False
-        return self.classroom.students.filter(id=sid).exists()
+    async def _student_in_class(self, student_id) -> bool:
+        return await aget_role(self.classroom_id, student_id) == ROLE_STUDENT
 
-    @database_sync_to_async
     def _get_user_name(self) -> str:
-        if self.user:
-            return self.user.display_name
-        return "Anonymous"
+        return self.state.display_name
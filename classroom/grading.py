@@ -0,0 +1,105 @@
+"""
+Проверка ответов учеников в памяти.
+
+Функции оценивают все пропуски, пары или варианты ответа сразу по
+скомпилированному ключу задания (classroom.answer_keys) и возвращают
+Grade: новые данные ответа и счётчики верных и неверных. В базу результат
+записывает BaseAnswer.apply_grade одним UPDATE.
+
+Для fill_gaps и match_cards счётчики — прибавка за эту отправку (в них
+копятся попытки), для test и true_false при проверке — итоговые значения.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from classroom.utils.format_string import normalize_answer_string
+
+GAP_KEY_RE = re.compile(r"^gap-(\d+)$")
+
+
+@dataclass
+class Grade:
+    answers: Any
+    correct: int = 0
+    wrong: int = 0
+
+    def count(self, is_correct):
+        if is_correct:
+            self.correct += 1
+        else:
+            self.wrong += 1
+
+
+def grade_gaps(gaps, current_answers, data, clean=str):
+    """
+    Проверяет изменённые пропуски отправки {"gap-<n>": значение}
+    по нормализованным правильным ответам gaps.
+
+    Пропуск с прежним значением не перепроверяется и не учитывается
+    в счётчиках; пропуск вне ключа остаётся с is_correct=None.
+    """
+    grade = Grade(dict(current_answers or {}))
+    for key, value in data.items():
+        match = GAP_KEY_RE.match(key)
+        if not match:
+            continue
+        gap_id = match.group(1)
+        user_value = clean(str(value))
+        if grade.answers.get(gap_id, {}).get("value") == user_value:
+            continue
+
+        gap_index = int(gap_id)
+        is_correct = None
+        if gap_index < len(gaps):
+            is_correct = normalize_answer_string(user_value) == gaps[gap_index]
+            grade.count(is_correct)
+        grade.answers[gap_id] = {"value": user_value, "is_correct": is_correct}
+    return grade
+
+
+def grade_pair(cards, current_answers, left, right):
+    """
+    Проверяет выбранную пару по карте card_left -> card_right;
+    повтор уже сохранённой пары не учитывается.
+    """
+    grade = Grade(dict(current_answers or {}))
+    if grade.answers.get(left, {}).get("card_right") == right:
+        return grade
+
+    is_correct = left in cards and cards[left] == right
+    grade.answers[left] = {"card_right": right, "is_correct": is_correct}
+    grade.count(is_correct)
+    return grade
+
+
+def grade_options(options, answers):
+    """
+    Проверяет выбранные варианты теста по флагам правильности вариантов
+    каждого вопроса; невыбранный вариант — неверный ответ.
+    """
+    grade = Grade([dict(answer) for answer in answers or []])
+    for i, answer in enumerate(grade.answers):
+        flags = options[i] if i < len(options) else ()
+        selected = answer.get("selected_option")
+        is_correct = isinstance(selected, int) and 0 <= selected < len(flags) and flags[selected]
+        answer["is_correct"] = is_correct
+        grade.count(is_correct)
+    return grade
+
+
+def grade_statements(statements, answers):
+    """
+    Проверяет ответы «верно/неверно» по правильным значениям утверждений;
+    утверждения без ответа не учитываются.
+    """
+    grade = Grade([dict(answer) for answer in answers or []])
+    for i, answer in enumerate(grade.answers):
+        selected = answer.get("selected_value")
+        if selected is None or i >= len(statements):
+            answer["is_correct"] = None
+            continue
+        is_correct = selected == statements[i]
+        answer["is_correct"] = is_correct
+        grade.count(is_correct)
+    return grade
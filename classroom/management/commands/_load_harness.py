@@ -0,0 +1,368 @@
+"""
+Нагрузочный стенд для VirtualClassConsumer на WebsocketCommunicator.
+
+Поднимает N классов × M учеников в одном процессе и гоняет реалистичный
+трафик урока: section:change от учителя всем ученикам, пачки answer:sent
+от учеников учителю, chat:update («печатает…») на весь класс.
+
+Каждое сообщение несёт bench_ts (time.perf_counter отправителя), получатель
+считает задержку доставки. Отправители и получатели живут в одном процессе
+и одном event loop, поэтому часы общие, а задержка включает и разбор кадра
+на стороне получателя.
+
+Используется командами bench_load, bench_connect и bench_idle_memory
+и их тестами; имя с «_» не даёт Django принять модуль за команду.
+Временные пользователи и классы создаются только в тестовой или
+стендовой БД (ensure_bench_database).
+"""
+import asyncio
+import contextlib
+import json
+import math
+import os
+import time
+import uuid
+
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.models import Classroom
+from classroom.services.roster import invalidate_roster, roster_cache
+from classroom.utils import metrics
+
+User = get_user_model()
+
+BENCH_CHANNEL_LAYERS = {"default": {"BACKEND": "classroom.management.commands._load_harness.BenchChannelLayer"}}
+BENCH_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+BENCH_ACTIONS = ("section:change", "answer:sent", "chat:update")
+
+BENCH_DATABASE_PREFIXES = ("test_", "bench_")
+
+
+class BenchChannelLayer(InMemoryChannelLayer):
+    """
+    InMemoryChannelLayer для стенда: чистка просроченных сообщений не чаще
+    раза в секунду. Штатный слой обходит все каналы на каждом receive,
+    и на тысячах соединений замер упирается в него, а не в консьюмер.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cleaned_at = 0.0
+
+    def _clean_expired(self):
+        now = time.monotonic()
+        if now - self._cleaned_at < 1:
+            return
+        self._cleaned_at = now
+        super()._clean_expired()
+
+
+def bench_backends(real_backends=False):
+    """
+    Контекст настроек стенда: in-memory channel layer и LocMem-кеш
+    либо настроенные в проекте бэкенды (например, локальный Redis).
+    """
+    if real_backends:
+        return contextlib.nullcontext()
+    return override_settings(CHANNEL_LAYERS=BENCH_CHANNEL_LAYERS, CACHES=BENCH_CACHES)
+
+
+def current_rss():
+    """
+    Текущий RSS процесса в байтах (Linux: /proc/self/statm; иначе пиковый RSS).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, p):
+    """
+    Перцентиль по методу ближайшего ранга; values должны быть отсортированы.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(seconds):
+    """
+    Сводка задержек в миллисекундах: count, p50, p99, max.
+    """
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+def ensure_bench_database(using=DEFAULT_DB_ALIAS):
+    """
+    Проверяет, что стенд пишет не в рабочую БД: допускаются SQLite в памяти
+    и базы, имя которых начинается с test_ или bench_.
+
+    Raises:
+        CommandError: БД не тестовая и не стендовая
+    """
+    connection = connections[using]
+    name = os.path.basename(str(connection.settings_dict["NAME"] or ""))
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        return
+    if name.startswith(BENCH_DATABASE_PREFIXES):
+        return
+    raise CommandError(
+        f"Стенд создаёт временных пользователей и классы: БД {name!r} не тестовая. "
+        f"Укажите базу с префиксом {' или '.join(BENCH_DATABASE_PREFIXES)}."
+    )
+
+
+class BenchFixture:
+    """
+    Временные учителя, классы и ученики в тестовой или стендовой БД;
+    удаляются в cleanup().
+    """
+
+    def __init__(self, classrooms, students):
+        ensure_bench_database()
+        suffix = uuid.uuid4().hex[:8]
+        self.teachers = User.objects.bulk_create([
+            User(username=f"bench_teacher_{suffix}_{c}", first_name=f"Teacher {c}", password="!")
+            for c in range(classrooms)
+        ])
+        self.classrooms = []
+        self.students = {}
+        for c, teacher in enumerate(self.teachers):
+            classroom = Classroom.objects.create(title=f"Benchmark {c}", teacher=teacher, join_password="bench")
+            members = User.objects.bulk_create([
+                User(username=f"bench_{suffix}_{c}_{s}", first_name=f"Student {s}", password="!")
+                for s in range(students)
+            ])
+            classroom.students.add(*members)
+            self.classrooms.append(classroom)
+            self.students[classroom.id] = members
+
+    def cold_roster(self):
+        roster_cache.clear_local()
+        for classroom in self.classrooms:
+            invalidate_roster(classroom.id)
+
+    def cleanup(self):
+        user_ids = [t.id for t in self.teachers]
+        for classroom in self.classrooms:
+            user_ids.extend(s.id for s in self.students[classroom.id])
+            classroom.delete()
+        User.objects.filter(id__in=user_ids).delete()
+
+
+class BenchClient:
+    """
+    Одно WebSocket-соединение стенда: подключение с замером задержки
+    и фоновый разбор входящих кадров.
+    """
+
+    def __init__(self, app, classroom_id, user, is_teacher=False):
+        self.user = user
+        self.is_teacher = is_teacher
+        self.communicator = WebsocketCommunicator(app, f"/ws/virtual-class/{classroom_id}/")
+        self.communicator.scope["user"] = user
+        self.communicator.scope["url_route"] = {"kwargs": {"classroom_id": str(classroom_id)}}
+        self.connected = False
+        self.connect_latency = None
+        self.received_frames = 0
+        self.received_bytes = 0
+        self._drain_task = None
+
+    async def connect(self, timeout=120):
+        started = time.perf_counter()
+        self.connected, _ = await self.communicator.connect(timeout=timeout)
+        if self.connected:
+            await self.communicator.receive_from(timeout=timeout)
+            self.connect_latency = time.perf_counter() - started
+        return self.connected
+
+    async def send(self, action, data):
+        await self.communicator.send_to(text_data=json.dumps({"type": action, "data": data}))
+
+    def start_drain(self, latencies):
+        self._drain_task = asyncio.create_task(self._drain(latencies))
+
+    async def _drain(self, latencies):
+        while True:
+            # Без таймаута: по таймауту WebsocketCommunicator отменяет приложение
+            text = await self.communicator.receive_from(timeout=None)
+            received_at = time.perf_counter()
+            self.received_frames += 1
+            self.received_bytes += len(text)
+            if "bench_ts" not in text:
+                continue
+
+            frame = json.loads(text)
+            frames = frame["data"] if frame.get("type") == "batch" else [frame]
+            for item in frames:
+                payload = (item.get("data") or {}).get("payload") or {}
+                sent_at = payload.get("bench_ts") if isinstance(payload, dict) else None
+                if sent_at is not None:
+                    latencies.setdefault(item["type"], []).append(received_at - sent_at)
+
+    async def close(self):
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._drain_task
+        if self.connected:
+            with contextlib.suppress(Exception):
+                await self.communicator.disconnect()
+
+
+class LoopLagMonitor:
+    """
+    Задержка event loop: насколько позже заказанного просыпается sleep(interval).
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+
+async def connect_clients(clients, timeout=120):
+    """
+    Одновременно подключает клиентов; возвращает число неудачных подключений.
+    """
+    results = await asyncio.gather(*(c.connect(timeout) for c in clients), return_exceptions=True)
+    return sum(1 for r in results if r is not True)
+
+
+async def run_load(fixture, rounds=20, interval=0.1, typing=3, settle_timeout=10):
+    """
+    Прогон нагрузки по fixture; возвращает машиночитаемый отчёт.
+
+    В каждом раунде в каждом классе одновременно: учитель рассылает
+    section:change всем ученикам, все ученики отправляют answer:sent
+    учителю, typing учеников отправляют chat:update на весь класс.
+    """
+    app = VirtualClassConsumer.as_asgi()
+    rooms = []
+    for classroom in fixture.classrooms:
+        teacher = BenchClient(app, classroom.id, classroom.teacher, is_teacher=True)
+        students = [BenchClient(app, classroom.id, s) for s in fixture.students[classroom.id]]
+        rooms.append((teacher, students))
+    clients = [c for teacher, students in rooms for c in (teacher, *students)]
+
+    metrics.reset()
+    rss_before = current_rss()
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    started = time.perf_counter()
+    failed = await connect_clients(clients)
+    connect_wall = time.perf_counter() - started
+    connect_latencies = [c.connect_latency for c in clients if c.connect_latency is not None]
+
+    # Даём дойти кадрам user:online:event до начала замеров
+    await asyncio.sleep(0.2)
+    rss_connected = current_rss()
+
+    latencies = {}
+    for client in clients:
+        if client.connected:
+            client.start_drain(latencies)
+
+    expected = dict.fromkeys(BENCH_ACTIONS, 0)
+    lag_from = len(monitor.samples)
+    traffic_started = time.perf_counter()
+
+    for round_no in range(rounds):
+        sends = []
+        for teacher, students in rooms:
+            live = [s for s in students if s.connected]
+            if teacher.connected:
+                sends.append(teacher.send("section:change", {
+                    "student_id": "all", "section_id": round_no, "bench_ts": time.perf_counter(),
+                }))
+                expected["section:change"] += len(live)
+                for student in live:
+                    sends.append(student.send("answer:sent", {
+                        "task_id": round_no, "bench_ts": time.perf_counter(),
+                    }))
+                    expected["answer:sent"] += 1
+            listeners = len(live) + (1 if teacher.connected else 0)
+            for student in live[:typing]:
+                sends.append(student.send("chat:update", {
+                    "typing": True, "bench_ts": time.perf_counter(),
+                }))
+                expected["chat:update"] += listeners - 1
+        await asyncio.gather(*sends)
+        await asyncio.sleep(interval)
+
+    deadline = time.perf_counter() + settle_timeout
+    while time.perf_counter() < deadline:
+        if all(len(latencies.get(a, ())) >= expected[a] for a in BENCH_ACTIONS):
+            break
+        await asyncio.sleep(0.05)
+    traffic_wall = time.perf_counter() - traffic_started
+
+    await monitor.stop()
+    lag_samples = monitor.samples[lag_from:]
+
+    await asyncio.gather(*(c.close() for c in clients))
+
+    connections = len(clients) - failed
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "config": {
+            "classrooms": len(rooms),
+            "students": len(fixture.students[fixture.classrooms[0].id]) if rooms else 0,
+            "rounds": rounds,
+            "interval_ms": interval * 1000,
+            "typing": typing,
+        },
+        "connections": connections,
+        "failed_connections": failed,
+        "connect": {**summarize(connect_latencies), "wall_ms": connect_wall * 1000},
+        "fanout": {
+            "all": summarize(all_latencies),
+            **{action: summarize(latencies.get(action, ())) for action in BENCH_ACTIONS},
+        },
+        "delivered": {action: len(latencies.get(action, ())) for action in BENCH_ACTIONS},
+        "expected": expected,
+        "received_bytes": sum(c.received_bytes for c in clients),
+        "traffic_wall_ms": traffic_wall * 1000,
+        "loop_lag": summarize(lag_samples),
+        "metrics": metrics.snapshot(),
+        "rss": {
+            "before_bytes": rss_before,
+            "connected_bytes": rss_connected,
+            "per_connection_bytes": (rss_connected - rss_before) // connections if connections else 0,
+        },
+    }
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from classroom.models import AnswerSummary
+from classroom.models.summary import SUMMARY_FIELDS
+from classroom.registry import get_all_answer_models
+
+
+# Ремонт сводки: первичное заполнение делает миграция 0004_backfill_answersummary.
+# Каждая пачка ответов читается SELECT ... FOR UPDATE в транзакции записи
+# сводки. Живое сохранение ответа блокирует ту же строку ответа и пишет
+# сводку в своей транзакции, поэтому оно либо закончено до чтения пачки,
+# либо ждёт её commit и перезаписывает сводку более новыми значениями.
+class Command(BaseCommand):
+    help = 'Repair AnswerSummary from all answer models; safe to run under live traffic'
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Answers locked and upserted per transaction')
+        parser.add_argument('--classroom', type=int, help='Only this classroom id')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        for model in get_all_answer_models():
+            queryset = model.objects.order_by('pk')
+            if options['classroom']:
+                queryset = queryset.filter(classroom_id=options['classroom'])
+            has_checked = any(field.name == 'is_checked' for field in model._meta.fields)
+            columns = ['classroom_id', 'task_id', 'user_id'] + [
+                name for name in SUMMARY_FIELDS if name != 'is_checked' or has_checked
+            ]
+
+            count = 0
+            last_pk = 0
+            while True:
+                with transaction.atomic():
+                    rows = list(
+                        queryset.filter(pk__gt=last_pk).select_for_update().values('pk', *columns)[:batch_size]
+                    )
+                    if not rows:
+                        break
+                    last_pk = rows[-1]['pk']
+                    AnswerSummary.upsert([AnswerSummary(**{name: row[name] for name in columns}) for row in rows])
+                count += len(rows)
+
+            total += count
+            self.stdout.write(f'{model.__name__}: {count}')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {total} answer summaries'))
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.services.connection_state import ConnectionState
+from classroom.services.roster import ROLE_STUDENT, ROLE_TEACHER
+from classroom.utils.json_codec import ENCODERS
+
+
+def _legacy_format_event(sender, action, task_id, student_id, payload):
+    """Формат сообщения до перехода на заранее закодированные кадры."""
+    return {
+        "type": "classroom_broadcast_event",
+        "action": action,
+        "task_id": task_id,
+        "student_id": student_id,
+        "sender_id": sender.user_id,
+        "sender_username": sender.state.username,
+        "payload": payload,
+    }
+
+
+async def _legacy_send_event(consumer, event):
+    """Обработчик до перехода: json.dumps на каждого получателя."""
+    if event.get("action") in ["answer:sent", "answer:reset"]:
+        if consumer.is_student and event.get("sender_id") == consumer.user_id:
+            return
+    await consumer.send(text_data=json.dumps({
+        "type": event.get("action"),
+        "data": {
+            "task_id": event.get("task_id"),
+            "student_id": event.get("student_id"),
+            "sender_id": event.get("sender_id"),
+            "sender_username": event.get("sender_username"),
+            "payload": event.get("payload"),
+        }
+    }))
+
+
+def _make_consumer(user_id, is_teacher):
+    consumer = VirtualClassConsumer()
+    consumer.state = ConnectionState(
+        classroom_id="1",
+        user_id=user_id,
+        role=ROLE_TEACHER if is_teacher else ROLE_STUDENT,
+        username=f"user_{user_id}",
+    )
+    consumer.sent_bytes = 0
+
+    async def send(text_data=None, bytes_data=None, close=False):
+        consumer.sent_bytes += len(text_data or "")
+
+    consumer.send = send
+    return consumer
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark: CPU time on the event loop per classroom broadcast (encode + fan-out handlers)'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=30, help='Students receiving each broadcast')
+        parser.add_argument('--iterations', type=int, default=2000, help='Broadcasts per measurement')
+        parser.add_argument(
+            '--encoder',
+            action='append',
+            choices=sorted(ENCODERS),
+            help='Encoder(s) for the frame path (default: all available)',
+        )
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+
+    def handle(self, *args, **options):
+        recipients = options['recipients']
+        iterations = options['iterations']
+        encoders = options['encoder'] or sorted(ENCODERS)
+
+        sender = _make_consumer(0, is_teacher=True)
+        students = [_make_consumer(i, is_teacher=False) for i in range(1, recipients + 1)]
+        payload = {
+            "section_id": 1842,
+            "student_id": "all",
+            "text": "Откройте раздел «Present Perfect» и выполните задания 3–5",
+            "options": list(range(10)),
+        }
+
+        results = [{
+            "path": "legacy",
+            "encoder": "json",
+            **self._measure(lambda: self._legacy_broadcast(sender, students, payload), iterations),
+        }]
+        for encoder in encoders:
+            with override_settings(CLASSROOM_JSON_ENCODER=encoder):
+                results.append({
+                    "path": "frame",
+                    "encoder": encoder,
+                    **self._measure(lambda: self._frame_broadcast(sender, students, payload), iterations),
+                })
+
+        report = {"recipients": recipients, "iterations": iterations, "results": results}
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        self.stdout.write(f'Recipients: {recipients}, iterations: {iterations}')
+        for row in results:
+            self.stdout.write(
+                f'{row["path"]:>7} / {row["encoder"]:<7} '
+                f'{row["cpu_us_per_broadcast"]:>9.1f} us CPU per broadcast'
+            )
+
+    @staticmethod
+    async def _legacy_broadcast(sender, students, payload):
+        event = _legacy_format_event(sender, "section:change", None, "all", payload)
+        for student in students:
+            await _legacy_send_event(student, event)
+
+    @staticmethod
+    async def _frame_broadcast(sender, students, payload):
+        event = sender._format_event("classroom_broadcast", "section:change", None, "all", payload)
+        for student in students:
+            await student.classroom_broadcast_event(event)
+
+    @staticmethod
+    def _measure(broadcast, iterations):
+        async def run():
+            for _ in range(iterations):
+                await broadcast()
+
+        asyncio.run(run())
+        started = time.process_time_ns()
+        asyncio.run(run())
+        elapsed = time.process_time_ns() - started
+        return {"cpu_us_per_broadcast": elapsed / iterations / 1000}
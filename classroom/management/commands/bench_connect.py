@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+from unittest import mock
+
+from channels.db import database_sync_to_async
+from django.core.management.base import BaseCommand
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.services.roster import get_role
+from classroom.management.commands._load_harness import BenchClient, BenchFixture, bench_backends, connect_clients, summarize
+
+# Путь до перехода на async ORM: проверка роли через database_sync_to_async
+LEGACY_AGET_ROLE = database_sync_to_async(get_role)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark: connect latency of VirtualClassConsumer for N simultaneous student connections'
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500, help='Simultaneous student connections')
+        parser.add_argument(
+            '--mode',
+            choices=['thread', 'async', 'both'],
+            default='both',
+            help='thread — database_sync_to_async role check (before), async — async ORM + roster cache (after)',
+        )
+        parser.add_argument(
+            '--real-backends',
+            action='store_true',
+            help='Use configured CHANNEL_LAYERS and CACHES instead of in-memory ones',
+        )
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+
+    def handle(self, *args, **options):
+        count = options['connections']
+        modes = ['thread', 'async'] if options['mode'] == 'both' else [options['mode']]
+
+        with bench_backends(options['real_backends']):
+            fixture = BenchFixture(classrooms=1, students=count)
+            try:
+                results = [self._run_mode(mode, fixture) for mode in modes]
+            finally:
+                fixture.cleanup()
+
+        if options['json']:
+            self.stdout.write(json.dumps({"connections": count, "results": results}))
+            return
+
+        self.stdout.write(f'Connections: {count}')
+        for row in results:
+            self.stdout.write(
+                f'{row["mode"]:>6}: p50 {row["p50_ms"]:.1f} ms, p95 {row["p95_ms"]:.1f} ms, '
+                f'max {row["max_ms"]:.1f} ms, wall {row["wall_ms"]:.1f} ms, failed {row["failed"]}'
+            )
+
+    def _run_mode(self, mode, fixture):
+        fixture.cold_roster()
+
+        if mode == 'thread':
+            with mock.patch('classroom.consumers.aget_role', LEGACY_AGET_ROLE):
+                latencies, failed, wall = asyncio.run(self._storm(fixture))
+        else:
+            latencies, failed, wall = asyncio.run(self._storm(fixture))
+
+        return {"mode": mode, **summarize(latencies), "wall_ms": wall * 1000, "failed": failed}
+
+    @staticmethod
+    async def _storm(fixture):
+        app = VirtualClassConsumer.as_asgi()
+        classroom = fixture.classrooms[0]
+        clients = [BenchClient(app, classroom.id, s) for s in fixture.students[classroom.id]]
+
+        started = time.perf_counter()
+        failed = await connect_clients(clients)
+        wall = time.perf_counter() - started
+
+        await asyncio.gather(*(c.close() for c in clients))
+        return [c.connect_latency for c in clients if c.connect_latency is not None], failed, wall
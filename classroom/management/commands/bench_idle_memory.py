@@ -0,0 +1,109 @@
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.core.management.base import BaseCommand
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.management.commands._load_harness import BenchClient, BenchFixture, bench_backends, connect_clients, current_rss
+
+
+class _IdleConsumer(AsyncWebsocketConsumer):
+    """Минимальный consumer: накладные расходы стенда и Channels без состояния класса."""
+
+    async def connect(self):
+        await self.accept()
+        await self.send(text_data='{"type":"connected"}')
+
+
+class Command(BaseCommand):
+    help = 'Memory benchmark: bytes per idle VirtualClassConsumer connection'
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10000, help='Idle student sockets')
+        parser.add_argument('--classrooms', type=int, default=40, help='Classrooms to spread sockets over')
+        parser.add_argument('--batch', type=int, default=1000, help='Sockets connected concurrently')
+        parser.add_argument(
+            '--real-backends',
+            action='store_true',
+            help='Use configured CHANNEL_LAYERS and CACHES instead of in-memory ones',
+        )
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+
+    def handle(self, *args, **options):
+        classrooms = max(1, options['classrooms'])
+        per_classroom = max(1, options['connections'] // classrooms)
+
+        with bench_backends(options['real_backends']):
+            fixture = BenchFixture(classrooms, per_classroom)
+            try:
+                fixture.cold_roster()
+                baseline = asyncio.run(self._measure(_IdleConsumer.as_asgi(), fixture, options['batch']))
+                fixture.cold_roster()
+                classroom = asyncio.run(self._measure(VirtualClassConsumer.as_asgi(), fixture, options['batch']))
+            finally:
+                fixture.cleanup()
+
+        report = {
+            "connections": classrooms * per_classroom,
+            "classrooms": classrooms,
+            "baseline": baseline,
+            "classroom": classroom,
+            "state_bytes_per_connection": classroom["traced_bytes_per_connection"] - baseline["traced_bytes_per_connection"],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        self.stdout.write(f'{report["connections"]} idle sockets in {classrooms} classrooms')
+        for label in ("baseline", "classroom"):
+            row = report[label]
+            self.stdout.write(
+                f'{label:>10}: {row["traced_bytes_per_connection"] / 1024:.2f} KiB traced, '
+                f'{row["rss_bytes_per_connection"] / 1024:.2f} KiB RSS per connection '
+                f'({row["failed"]} failed, connect {row["connect_s"]:.1f} s)'
+            )
+        self.stdout.write(
+            f'VirtualClassConsumer state: {report["state_bytes_per_connection"] / 1024:.2f} KiB per connection'
+        )
+
+    @staticmethod
+    async def _measure(app, fixture, batch):
+        clients = [
+            BenchClient(app, classroom.id, student)
+            for classroom in fixture.classrooms
+            for student in fixture.students[classroom.id]
+        ]
+
+        gc.collect()
+        tracemalloc.start()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+
+        started = time.perf_counter()
+        failed = 0
+        for i in range(0, len(clients), batch):
+            failed += await connect_clients(clients[i:i + batch])
+        connect_s = time.perf_counter() - started
+
+        await asyncio.sleep(0.5)
+        gc.collect()
+        traced_after = tracemalloc.get_traced_memory()[0]
+        rss_after = current_rss()
+        tracemalloc.stop()
+
+        await asyncio.gather(*(c.close() for c in clients))
+
+        connected = len(clients) - failed
+        return {
+            "failed": failed,
+            "connect_s": connect_s,
+            "traced_bytes_per_connection": (traced_after - traced_before) // connected if connected else 0,
+            "rss_bytes_per_connection": (rss_after - rss_before) // connected if connected else 0,
+        }
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from classroom.management.commands._load_harness import BenchFixture, bench_backends, run_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test: N classrooms x M students against VirtualClassConsumer; '
+        'reports connect latency, fan-out p50/p99, event-loop lag and RSS per connection'
+    )
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classrooms', type=int, default=10, help='Number of classrooms')
+        parser.add_argument('--students', type=int, default=30, help='Students per classroom')
+        parser.add_argument('--rounds', type=int, default=20, help='Traffic rounds')
+        parser.add_argument('--interval-ms', type=int, default=100, help='Pause between rounds')
+        parser.add_argument('--typing', type=int, default=3, help='Students sending chat:update per round')
+        parser.add_argument(
+            '--real-backends',
+            action='store_true',
+            help='Use configured CHANNEL_LAYERS and CACHES (e.g. local Redis) instead of in-memory ones',
+        )
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        with bench_backends(options['real_backends']):
+            fixture = BenchFixture(options['classrooms'], options['students'])
+            try:
+                fixture.cold_roster()
+                report = asyncio.run(run_load(
+                    fixture,
+                    rounds=options['rounds'],
+                    interval=options['interval_ms'] / 1000,
+                    typing=options['typing'],
+                ))
+            finally:
+                fixture.cleanup()
+
+        report["config"]["real_backends"] = options['real_backends']
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        config = report["config"]
+        self.stdout.write(
+            f'{config["classrooms"]} classrooms x {config["students"]} students, '
+            f'{report["connections"]} connections ({report["failed_connections"]} failed)'
+        )
+        self._line('connect', report["connect"])
+        for action, summary in report["fanout"].items():
+            self._line(f'fan-out {action}', summary)
+        self._line('loop lag', report["loop_lag"])
+        self.stdout.write(f'delivered {report["delivered"]} of {report["expected"]}')
+        self.stdout.write(f'RSS per connection: {report["rss"]["per_connection_bytes"] / 1024:.1f} KiB')
+
+    def _line(self, label, summary):
+        self.stdout.write(
+            f'{label:>22}: p50 {summary["p50_ms"]:.2f} ms, p99 {summary["p99_ms"]:.2f} ms, '
+            f'max {summary["max_ms"]:.2f} ms (n={summary["count"]})'
+        )
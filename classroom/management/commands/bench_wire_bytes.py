@@ -0,0 +1,132 @@
+import json
+import zlib
+
+from django.core.management.base import BaseCommand
+
+from classroom.services.event_log import stamp_frame
+from classroom.utils.json_codec import encode_frame
+from classroom.utils.outbound_queue import build_batch
+from classroom.utils.wire_format import pack_batch, pack_frame
+
+# Параметры permessage-deflate, которые websockets (uvicorn) предлагает по умолчанию
+DEFLATE_WINDOW_BITS = 12
+DEFLATE_MEM_LEVEL = 5
+
+
+def _ws_header(length):
+    """Заголовок серверного WebSocket-кадра (без маски) для полезной нагрузки length байт."""
+    if length < 126:
+        return 2
+    if length < 65536:
+        return 4
+    return 10
+
+
+def _answer_sent(n):
+    return encode_frame("answer:sent", {
+        "task_id": 9000 + n % 12,
+        "student_id": str(300 + n % 30),
+        "sender_id": 300 + n % 30,
+        "sender_username": f"student_{300 + n % 30}",
+        "payload": {
+            "task_type": "fill_gaps",
+            "answer": {
+                "answers": [
+                    {"user_answer": word, "is_correct": (n + i) % 3 != 0}
+                    for i, word in enumerate(("went", "has been", "were", "had done", "goes", "taught"))
+                ],
+                "is_checked": False,
+            },
+        },
+    })
+
+
+def _chat_update(n):
+    return encode_frame("chat:update", {
+        "sender_id": 300 + n % 30,
+        "student_id": "all",
+        "payload": {"student_id": "all"},
+    })
+
+
+def _section_change(n):
+    return encode_frame("section:change", {
+        "task_id": None,
+        "student_id": "all",
+        "sender_id": 12,
+        "sender_username": "teacher",
+        "payload": {"student_id": "all", "section_id": 1800 + n % 7},
+    })
+
+
+STREAM = "classroom_1800"
+
+SAMPLES = {
+    "chat:update": _chat_update,
+    "answer:sent": lambda n: stamp_frame(_answer_sent(n), STREAM, 1000 + n),
+    "section:change": lambda n: stamp_frame(_section_change(n), STREAM, 1000 + n),
+    "batch(10 x answer:sent)": lambda n: [stamp_frame(_answer_sent(n * 10 + i), STREAM, 1000 + n * 10 + i) for i in range(10)],
+}
+
+
+class _Deflate:
+    """Сжатие потока сообщений как в permessage-deflate с сохранением контекста."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -DEFLATE_WINDOW_BITS, DEFLATE_MEM_LEVEL,
+        )
+
+    def __call__(self, data):
+        compressed = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return compressed[:-4]  # RFC 7692: хвост 00 00 ff ff не передаётся
+
+
+class Command(BaseCommand):
+    help = 'Bytes on the wire per classroom event: JSON vs MessagePack, with and without permessage-deflate'
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200, help='Messages per stream (deflate keeps context)')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        results = {}
+        for name, make in SAMPLES.items():
+            messages = [make(n) for n in range(count)]
+            wire = {
+                "json": [self._json_bytes(m) for m in messages],
+                "msgpack": [self._msgpack_bytes(m) for m in messages],
+            }
+            row = {}
+            for fmt, payloads in wire.items():
+                deflate = _Deflate()
+                row[fmt] = self._per_message(payloads)
+                row[f"{fmt}+deflate"] = self._per_message([deflate(p) for p in payloads])
+            results[name] = row
+
+        report = {"messages": count, "bytes_per_message": results}
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        columns = ("json", "json+deflate", "msgpack", "msgpack+deflate")
+        self.stdout.write(f'Bytes on the wire per message (payload + frame header), {count} messages per stream')
+        self.stdout.write(f'{"event":>24} ' + ' '.join(f'{c:>16}' for c in columns))
+        for name, row in results.items():
+            self.stdout.write(f'{name:>24} ' + ' '.join(f'{row[c]:>16.1f}' for c in columns))
+
+    @staticmethod
+    def _json_bytes(message):
+        text = build_batch(message) if isinstance(message, list) else message
+        return text.encode("utf-8")
+
+    @staticmethod
+    def _msgpack_bytes(message):
+        return pack_batch(message) if isinstance(message, list) else pack_frame(message)
+
+    @staticmethod
+    def _per_message(payloads):
+        return sum(len(p) + _ws_header(len(p)) for p in payloads) / len(payloads)
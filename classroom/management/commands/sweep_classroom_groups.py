@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand
+
+from classroom.services.channel_registry import get_channel_registry
+
+
+class Command(BaseCommand):
+    help = 'Remove dead channels from classroom_* and user_* channel layer groups'
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Repeat every N seconds (0 — run once)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        registry = get_channel_registry(get_channel_layer())
+
+        while True:
+            started = time.monotonic()
+            removed = asyncio.run(registry.sweep())
+            self.stdout.write(
+                f'Removed {removed} dead group memberships in {(time.monotonic() - started) * 1000:.0f} ms'
+            )
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Сводка ответов для статистики. Таблицу заполняет
+    следующая миграция 0004_backfill_answersummary.
+    """
+
+    dependencies = [
+        ('classroom', '0002_initial'),
+        ('courses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerSummary',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('correct_answers', models.PositiveIntegerField(default=0)),
+                ('wrong_answers', models.PositiveIntegerField(default=0)),
+                ('total_answers', models.PositiveIntegerField(default=0)),
+                ('answered_at', models.DateTimeField(blank=True, null=True)),
+                ('is_checked', models.BooleanField(default=False)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_summaries', to='classroom.classroom')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('classroom', 'task', 'user'), name='unique_answer_summary')],
+            },
+        ),
+    ]
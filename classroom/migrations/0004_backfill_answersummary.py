@@ -0,0 +1,50 @@
+from django.db import migrations
+
+ANSWER_MODELS = (
+    'TestTaskAnswer',
+    'TrueFalseTaskAnswer',
+    'FillGapsTaskAnswer',
+    'MatchCardsTaskAnswer',
+    'TextInputTaskAnswer',
+)
+
+SUMMARY_FIELDS = ('correct_answers', 'wrong_answers', 'total_answers', 'answered_at', 'is_checked')
+
+BATCH_SIZE = 1000
+
+
+def backfill_answer_summary(apps, schema_editor):
+    """
+    Заполняет сводку из существующих ответов. Строки, которые уже успел
+    записать BaseAnswer.sync_summary, не перезаписываются.
+    """
+    AnswerSummary = apps.get_model('classroom', 'AnswerSummary')
+    db_alias = schema_editor.connection.alias
+
+    for model_name in ANSWER_MODELS:
+        model = apps.get_model('classroom', model_name)
+        has_checked = any(field.name == 'is_checked' for field in model._meta.fields)
+        columns = ['classroom_id', 'task_id', 'user_id'] + [
+            name for name in SUMMARY_FIELDS if name != 'is_checked' or has_checked
+        ]
+
+        batch = []
+        queryset = model.objects.using(db_alias).order_by('pk').values(*columns)
+        for row in queryset.iterator(chunk_size=BATCH_SIZE):
+            batch.append(AnswerSummary(**row))
+            if len(batch) >= BATCH_SIZE:
+                AnswerSummary.objects.using(db_alias).bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            AnswerSummary.objects.using(db_alias).bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0003_answersummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_answer_summary, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
 from .base import BaseAnswer, ChatMessage
 from .classroom import Classroom
 from .common_tasks_answers import TestTaskAnswer, TrueFalseTaskAnswer, FillGapsTaskAnswer, MatchCardsTaskAnswer, TextInputTaskAnswer
+from .summary import AnswerSummary
@@ -1,6 +1,12 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F
 from django.conf import settings
 
+from classroom.answer_keys import get_answer_key
+from classroom.grading import Grade
+from classroom.models.summary import AnswerSummary
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -15,23 +21,140 @@ class BaseAnswer(models.Model):
     wrong_answers = models.PositiveIntegerField(default=0)
     total_answers = models.PositiveIntegerField(default=0)
 
+    # Строка заблокирована upsert до конца транзакции: счётчики в памяти актуальны
+    _row_locked = False
+
     class Meta:
         app_label = "classroom"
         abstract = True
 
+    @classmethod
+    def upsert(cls, task, classroom, user):
+        """
+        Возвращает (answer, created): ответ пользователя на задание,
+        при необходимости созданный, по ограничению unique_*_answer_per_user_task.
+
+        На PostgreSQL — один запрос INSERT ... ON CONFLICT (task, user) DO UPDATE
+        ... RETURNING: пустой DO UPDATE возвращает существующую строку и
+        блокирует её до commit, а created — признак (xmax = 0) вставленной строки.
+        На остальных базах — INSERT ... ON CONFLICT DO NOTHING RETURNING, который
+        возвращает строку только при вставке, и SELECT существующей иначе.
+        Без поддержки RETURNING и ON CONFLICT у базы — обычный get_or_create.
+
+        Raises:
+            IntegrityError: ответ на задание уже есть в другом классе
+        """
+        connection = connections[router.db_for_write(cls)]
+        features = connection.features
+        if not (features.supports_update_conflicts_with_target and features.can_return_rows_from_bulk_insert):
+            return cls.objects.get_or_create(task=task, classroom=classroom, user=user)
+
+        answer = cls(task=task, classroom=classroom, user=user)
+        answer.prepare_insert()
+
+        opts = cls._meta
+        qn = connection.ops.quote_name
+        table = qn(opts.db_table)
+        fields = [field for field in opts.concrete_fields if not field.primary_key]
+        params = [field.get_db_prep_save(field.pre_save(answer, True), connection) for field in fields]
+        task_column = qn(opts.get_field("task").column)
+        user_column = qn(opts.get_field("user").column)
+        classroom_column = qn(opts.get_field("classroom").column)
+        columns = ", ".join(qn(field.column) for field in opts.concrete_fields)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(qn(field.column) for field in fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))}) "
+            f"ON CONFLICT ({task_column}, {user_column}) "
+        )
+        if connection.vendor == "postgresql":
+            sql += (
+                f"DO UPDATE SET {task_column} = EXCLUDED.{task_column} "
+                f"WHERE {table}.{classroom_column} = EXCLUDED.{classroom_column} "
+                f"RETURNING {columns}, (xmax = 0)"
+            )
+        else:
+            sql += f"DO NOTHING RETURNING {columns}, 1"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+            if row is None and connection.vendor != "postgresql":
+                # Строка уже была: вставка пропущена, читаем существующую
+                cursor.execute(
+                    f"SELECT {columns}, 0 FROM {table} "
+                    f"WHERE {task_column} = %s AND {user_column} = %s "
+                    f"AND {classroom_column} = %s",
+                    [task.pk, user.pk, classroom.pk],
+                )
+                row = cursor.fetchone()
+        if row is None:
+            raise IntegrityError(f"{cls.__name__}: ответ на задание {task.pk} есть в другом классе")
+
+        *row, inserted = row
+        values = []
+        for field, value in zip(opts.concrete_fields, row):
+            column = field.get_col(opts.db_table)
+            for converter in connection.ops.get_db_converters(column) + field.get_db_converters(connection):
+                value = converter(value, column, connection)
+            values.append(value)
+
+        answer = cls.from_db(connection.alias, [field.attname for field in opts.concrete_fields], values)
+        # SQLite блокирует на запись всю базу с первого INSERT транзакции
+        answer._row_locked = connection.in_atomic_block
+        return answer, bool(inserted)
+
+    def prepare_insert(self):
+        """
+        Заполняет поля новой строки перед upsert.
+        """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            self.sync_summary()
+
+    def sync_summary(self):
+        """
+        Переносит счётчики ответа в AnswerSummary (classroom.models.summary).
+        """
+        AnswerSummary.upsert([AnswerSummary.from_answer(self)])
+
     def save_answer_data(self, data):
         raise NotImplementedError("Subclasses must implement save_answer_data")
 
     def get_answer_data(self):
         raise NotImplementedError("Subclasses must implement get_answer_data")
 
-    def increment_correct_answers(self):
-        self.correct_answers += 1
-        self.save(update_fields=['correct_answers'])
-
-    def increment_wrong_answers(self):
-        self.wrong_answers += 1
-        self.save(update_fields=['wrong_answers'])
+    def apply_grade(self, grade, increment=False, **fields):
+        """
+        Сохраняет результат проверки (classroom.grading.Grade) и поля ответа одним UPDATE.
+
+        increment=True — счётчики прибавляются через F(), и параллельные
+        отправки не теряют попыток; после записи перечитываются только счётчики.
+        Если строка заблокирована upsert, прибавка считается в памяти.
+        Иначе счётчики записываются как есть. Сводка ответа обновляется
+        в той же транзакции.
+        """
+        fields["answers"] = grade.answers
+        if increment and self._row_locked:
+            grade = Grade(grade.answers, self.correct_answers + grade.correct, self.wrong_answers + grade.wrong)
+            increment = False
+        if not increment:
+            fields.update(correct_answers=grade.correct, wrong_answers=grade.wrong)
+        elif grade.correct or grade.wrong:
+            fields.update(
+                correct_answers=F("correct_answers") + grade.correct,
+                wrong_answers=F("wrong_answers") + grade.wrong,
+            )
+
+        with transaction.atomic(savepoint=False):
+            type(self).objects.filter(pk=self.pk).update(**fields)
+
+            for name, value in fields.items():
+                if not hasattr(value, "resolve_expression"):
+                    setattr(self, name, value)
+            if increment and (grade.correct or grade.wrong):
+                self.refresh_from_db(fields=["correct_answers", "wrong_answers"])
+            self.sync_summary()
 
     def get_success_percentage(self):
         total_attempts = self.correct_answers + self.wrong_answers
@@ -39,19 +162,34 @@ class BaseAnswer(models.Model):
             return 0
         return round((self.correct_answers / total_attempts) * 100)
 
+    def get_answer_key(self):
+        """
+        Скомпилированный ключ ответов задания (classroom.answer_keys).
+        """
+        key = get_answer_key(self.task)
+        if key is None:
+            raise ValidationError("Задание не найдено")
+        return key
+
     def get_task_total_answers(self):
         try:
-            specific_task = self.task.specific
-            if hasattr(specific_task, 'total_answers'):
-                return specific_task.total_answers
-        except Exception:
-            pass
-        return 0
+            return self.get_answer_key().total_answers
+        except ValidationError:
+            return 0
+
+    @classmethod
+    def get_reset_fields(cls, task):
+        """
+        Значения полей сброшенного ответа на задание task; общие для
+        delete_answers и массового сброса QuerySet.update.
+        """
+        return {"correct_answers": 0, "wrong_answers": 0}
 
     def delete_answers(self):
-        self.correct_answers = 0
-        self.wrong_answers = 0
-        self.save(update_fields=['correct_answers', 'wrong_answers'])
+        fields = self.get_reset_fields(self.task)
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.save(update_fields=list(fields))
 
 
 class ChatMessage(models.Model):
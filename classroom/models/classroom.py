@@ -74,6 +74,7 @@ class Classroom(models.Model):
         if password != self.join_password:
             raise ValidationError("Неверный пароль класса.")
         self.students.add(user)
+        self._invalidate_roster()
         return self
 
     def remove_student(self, user):
@@ -88,6 +89,7 @@ class Classroom(models.Model):
                 self._delete_student_answers(user)
                 self._delete_student_chat_messages(user)
                 self.students.remove(user)
+                self._invalidate_roster()
                 return {
                     "success": True,
                     "removed": True,
@@ -102,14 +104,29 @@ class Classroom(models.Model):
                     "error": f"Ошибка при удалении: {str(e)}"
                 }
 
+    def delete(self, *args, **kwargs):
+        classroom_id = self.pk
+        result = super().delete(*args, **kwargs)
+        from classroom.services.roster import invalidate_roster
+        transaction.on_commit(lambda: invalidate_roster(classroom_id))
+        return result
+
+    def _invalidate_roster(self):
+        """Сбрасывает кеш состава класса после фиксации транзакции"""
+        from classroom.services.roster import invalidate_roster
+        classroom_id = self.pk
+        transaction.on_commit(lambda: invalidate_roster(classroom_id))
+
     def _delete_student_answers(self, user):
         try:
             from classroom.registry import get_all_answer_models
+            from .summary import AnswerSummary
             answer_models = get_all_answer_models()
             for model in answer_models:
                 deleted_count, _ = model.objects.filter(user=user, classroom=self).delete()
                 if deleted_count > 0:
                     print(f"Deleted {deleted_count} answers from {model.__name__}")
+            AnswerSummary.objects.filter(user=user, classroom=self).delete()
         except ImportError:
             pass
 
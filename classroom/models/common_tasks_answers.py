@@ -1,12 +1,10 @@
-import re
 import time
-import bleach
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from .base import BaseAnswer
-from courses.services import get_task_data
-from classroom.utils import compare_normalized_answers
+from classroom.answer_keys import clean_html, clean_text, get_answer_key
+from classroom.grading import grade_gaps, grade_options, grade_pair, grade_statements
 
 
 class TestTaskAnswer(BaseAnswer):
@@ -22,47 +20,34 @@ class TestTaskAnswer(BaseAnswer):
         if self.is_checked:
             raise ValidationError("Ответ уже проверен и не может быть изменен")
 
-        task_data = get_task_data(self.task, to_frontend=False)
-        questions = task_data.get("questions", [])
+        key = self.get_answer_key()
+        questions_count = len(key.options)
 
         input_answers = data.get("answers", [])
-        if not self.answers or len(self.answers) != len(questions):
+        if not self.answers or len(self.answers) != questions_count:
             self.answers = [
                 {"question_index": i, "selected_option": None, "is_correct": False}
-                for i in range(len(questions))
+                for i in range(questions_count)
             ]
 
         for ans in input_answers:
             q_index = ans.get("question_index")
             selected_idx = ans.get("selected_option")
-            if 0 <= q_index < len(questions):
+            if 0 <= q_index < questions_count:
                 self.answers[q_index]["selected_option"] = selected_idx
 
-        self.total_answers = self.get_task_total_answers()
+        self.total_answers = key.total_answers
         self.answered_at = timezone.now()
-        self.save()
+        self.save(update_fields=["answers", "total_answers", "answered_at"])
+
+    def grade(self, key):
+        return grade_options(key.options, self.answers)
 
     def mark_as_checked(self):
         if self.is_checked:
             return
-        self.is_checked = True
-        self.correct_answers = 0
-        self.wrong_answers = 0
-
-        task_data = get_task_data(self.task, to_frontend=False)
-        questions = task_data.get("questions", [])
 
-        for i, answer_data in enumerate(self.answers):
-            selected_idx = answer_data.get("selected_option")
-            opts = questions[i].get("options", [])
-            is_correct = (0 <= selected_idx < len(opts) and bool(opts[selected_idx].get("is_correct", False)))
-            answer_data["is_correct"] = is_correct
-            if is_correct:
-                self.correct_answers += 1
-            else:
-                self.wrong_answers += 1
-
-        self.save()
+        self.apply_grade(self.grade(self.get_answer_key()), is_checked=True)
 
     def get_answer_data(self):
         return {
@@ -70,12 +55,9 @@ class TestTaskAnswer(BaseAnswer):
             "is_checked": self.is_checked
         }
 
-    def delete_answers(self):
-        self.answers = []
-        self.is_checked = False
-        self.correct_answers = 0
-        self.wrong_answers = 0
-        self.save()
+    @classmethod
+    def get_reset_fields(cls, task):
+        return {**super().get_reset_fields(task), "answers": [], "is_checked": False}
 
 
 class TrueFalseTaskAnswer(BaseAnswer):
@@ -95,21 +77,20 @@ class TrueFalseTaskAnswer(BaseAnswer):
         if self.is_checked:
             raise ValidationError("Ответ уже проверен и не может быть изменен")
 
-        task_data = get_task_data(self.task, to_frontend=False)
-        statements = task_data.get("statements", [])
+        statements_count = len(self.get_answer_key().statements)
 
         input_answers = data.get("answers", [])
-        if not self.answers or len(self.answers) != len(statements):
+        if not self.answers or len(self.answers) != statements_count:
             self.answers = [
                 {"statement_index": i, "selected_value": None, "is_correct": None}
-                for i in range(len(statements))
+                for i in range(statements_count)
             ]
 
         for ans in input_answers:
             idx = ans.get("statement_index")
             selected_value = ans.get("selected_value")
 
-            if 0 <= idx < len(statements):
+            if 0 <= idx < statements_count:
                 if selected_value is None:
                     self.answers[idx]["selected_value"] = None
                 else:
@@ -117,7 +98,7 @@ class TrueFalseTaskAnswer(BaseAnswer):
 
         self.total_answers = self.get_task_total_answers()
         self.answered_at = timezone.now()
-        self.save()
+        self.save(update_fields=["answers", "total_answers", "answered_at"])
 
     def mark_as_checked(self):
         """
@@ -127,30 +108,10 @@ class TrueFalseTaskAnswer(BaseAnswer):
         if self.is_checked:
             return
 
-        task_data = get_task_data(self.task, to_frontend=False)
-        statements = task_data.get("statements", [])
-
-        self.is_checked = True
-        self.correct_answers = 0
-        self.wrong_answers = 0
-
-        for i, answer_data in enumerate(self.answers):
-            selected_value = answer_data.get("selected_value")
+        self.apply_grade(self.grade(self.get_answer_key()), is_checked=True)
 
-            if selected_value is None:
-                answer_data["is_correct"] = None
-                continue
-
-            correct_value = bool(statements[i].get("is_true", False))
-            is_correct = selected_value == correct_value
-            answer_data["is_correct"] = is_correct
-
-            if is_correct:
-                self.correct_answers += 1
-            else:
-                self.wrong_answers += 1
-
-        self.save()
+    def grade(self, key):
+        return grade_statements(key.statements, self.answers)
 
     def get_task_total_answers(self):
         """
@@ -167,12 +128,9 @@ class TrueFalseTaskAnswer(BaseAnswer):
             "is_checked": self.is_checked
         }
 
-    def delete_answers(self):
-        self.answers = []
-        self.is_checked = False
-        self.correct_answers = 0
-        self.wrong_answers = 0
-        self.save()
+    @classmethod
+    def get_reset_fields(cls, task):
+        return {**super().get_reset_fields(task), "answers": [], "is_checked": False}
 
 
 class FillGapsTaskAnswer(BaseAnswer):
@@ -183,72 +141,19 @@ class FillGapsTaskAnswer(BaseAnswer):
             models.UniqueConstraint(fields=["task", "user"], name="unique_fillgaps_answer_per_user_task")
         ]
 
-    ALLOWED_TAGS = ['strong', 'b', 'i', 'u', 'ul', 'ol', 'li', 'div', 'p', 'br', 'span', 'sup']
-    ALLOWED_ATTRIBUTES = {}
-
-    def _clean_html(self, html):
-        """Очищает HTML от неразрешенных тегов, атрибутов и стилей"""
-        if not html:
-            return html
-
-        cleaned_html = bleach.clean(
-            html,
-            tags=self.ALLOWED_TAGS,
-            attributes=self.ALLOWED_ATTRIBUTES,
-            strip=True
-        )
-
-        return cleaned_html
-
-    def _clean_text_content(self, text):
-        """Очищает текстовое содержимое от HTML"""
-        if not text:
-            return text
-
-        return bleach.clean(text, tags=[], strip=True)
-
     def save_answer_data(self, data):
-        task_data = get_task_data(self.task, to_frontend=False)
-
-        if 'text' in task_data:
-            task_data['text'] = self._clean_html(task_data.get('text', ''))
-
-        correct_answers = []
-        for answer in task_data.get("answers", []):
-            cleaned_answer = self._clean_text_content(str(answer))
-            correct_answers.append(cleaned_answer)
-
-        current_answers = dict(self.answers or {})
-
-        for key, value in data.items():
-            match = re.match(r"^gap-(\d+)$", key)
-            if match:
-                gap_id = match.group(1)
-                user_value = self._clean_text_content(str(value))
-
-                old_answer = current_answers.get(gap_id, {}).get("value")
-                if old_answer != user_value:
-                    current_answers[gap_id] = {"value": user_value, "is_correct": None}
-                    self._check_and_update_single_gap(gap_id, current_answers, correct_answers)
-
-        self.total_answers = self.get_task_total_answers()
-        self.answers = current_answers
-        self.answered_at = timezone.now()
-        self.save()
-
-    def _check_and_update_single_gap(self, gap_id, answers_dict, correct_answers):
-        try:
-            gap_index = int(gap_id)
-            if 0 <= gap_index < len(correct_answers):
-                user_value = answers_dict[gap_id].get("value", "")
-                is_correct = compare_normalized_answers(correct_answers[gap_index], user_value)
-                answers_dict[gap_id]["is_correct"] = is_correct
-                if is_correct:
-                    self.increment_correct_answers()
-                else:
-                    self.increment_wrong_answers()
-        except Exception:
-            answers_dict[gap_id]["is_correct"] = None
+        """
+        Проверяет изменённые пропуски и сохраняет ответ одним UPDATE;
+        попытки прибавляются к счётчикам.
+        """
+        key = self.get_answer_key()
+        grade = grade_gaps(key.gaps, self.answers, data, clean=clean_text)
+        self.apply_grade(
+            grade,
+            increment=True,
+            total_answers=key.total_answers,
+            answered_at=timezone.now(),
+        )
 
     def get_answer_data(self):
         return {"answers": self.answers}
@@ -262,11 +167,9 @@ class FillGapsTaskAnswer(BaseAnswer):
     def is_completed(self):
         return bool(self.answers) and len(self.answers) >= self.get_total_gaps()
 
-    def delete_answers(self):
-        self.answers = {}
-        self.correct_answers = 0
-        self.wrong_answers = 0
-        self.save()
+    @classmethod
+    def get_reset_fields(cls, task):
+        return {**super().get_reset_fields(task), "answers": {}}
 
 
 class MatchCardsTaskAnswer(BaseAnswer):
@@ -280,8 +183,7 @@ class MatchCardsTaskAnswer(BaseAnswer):
         ]
 
     def save_answer_data(self, data):
-        task_data = get_task_data(self.task, to_frontend=False)
-        cards = task_data.get("cards", [])
+        key = self.get_answer_key()
 
         selected_pair = data.get("selected_pair")
         if not isinstance(selected_pair, dict):
@@ -292,37 +194,11 @@ class MatchCardsTaskAnswer(BaseAnswer):
         if left is None or right is None:
             raise ValidationError("В selected_pair нужны поля card_left и card_right")
 
-        current_answers = dict(self.answers or {})
-        old_right = current_answers.get(left, {}).get("card_right")
-        if old_right != right:
-            self.last_pair = {"card_left": left, "card_right": right}
-            self.last_pair_timestamp = time.time()
-            current_answers[left] = {"card_right": right, "is_correct": None}
-            self._check_and_update_single_pair(left, current_answers, cards)
-
-        self.total_answers = self.get_task_total_answers()
-        self.answers = current_answers
-        self.answered_at = timezone.now()
-        self.save()
-
-    def _check_and_update_single_pair(self, left_card, answers_dict, correct_pairs):
-        try:
-            answer_data = answers_dict[left_card]
-            right_card = answer_data.get("card_right", "")
-            is_correct = False
-            for correct_pair in correct_pairs or []:
-                left_expected = correct_pair.get("card_left", "")
-                right_expected = correct_pair.get("card_right", "")
-                if left_expected == left_card:
-                    is_correct = right_expected == right_card
-                    break
-            answers_dict[left_card]["is_correct"] = is_correct
-            if is_correct:
-                self.increment_correct_answers()
-            else:
-                self.increment_wrong_answers()
-        except Exception:
-            answers_dict[left_card]["is_correct"] = None
+        fields = {"total_answers": key.total_answers, "answered_at": timezone.now()}
+        grade = grade_pair(key.cards, self.answers, left, right)
+        if grade.correct or grade.wrong:
+            fields.update(last_pair={"card_left": left, "card_right": right}, last_pair_timestamp=time.time())
+        self.apply_grade(grade, increment=True, **fields)
 
     def get_answer_data(self):
         response_data = {"answers": self.answers}
@@ -336,13 +212,14 @@ class MatchCardsTaskAnswer(BaseAnswer):
                     response_data["last_pair"] = self.last_pair
         return response_data
 
-    def delete_answers(self):
-        self.answers = {}
-        self.last_pair = None
-        self.last_pair_timestamp = None
-        self.correct_answers = 0
-        self.wrong_answers = 0
-        self.save()
+    @classmethod
+    def get_reset_fields(cls, task):
+        return {
+            **super().get_reset_fields(task),
+            "answers": {},
+            "last_pair": None,
+            "last_pair_timestamp": None,
+        }
 
 
 class TextInputTaskAnswer(BaseAnswer):
@@ -353,37 +230,18 @@ class TextInputTaskAnswer(BaseAnswer):
             models.UniqueConstraint(fields=["task", "user"], name="unique_textinput_answer_per_user_task")
         ]
 
-    ALLOWED_TAGS = ['strong', 'b', 'i', 'u', 'ul', 'ol', 'li', 'div', 'p', 'br', 'span', 'sup']
-    ALLOWED_ATTRIBUTES = {}
-
-    def _clean_html(self, html):
-        """Очищает HTML от неразрешенных тегов, атрибутов и стилей"""
-        if not html:
-            return html
-
-        cleaned_html = bleach.clean(
-            html,
-            tags=self.ALLOWED_TAGS,
-            attributes=self.ALLOWED_ATTRIBUTES,
-            strip=True
-        )
-
-        return cleaned_html
-
     def _get_default_text(self):
         """
         Вспомогательный метод для получения default_text из задания.
-        Возвращает default_text или пустую строку, если его нет.
+        Возвращает очищенный default_text или пустую строку, если его нет.
         """
         try:
-            if hasattr(self.task, 'specific'):
-                task_specific = self.task.specific
-                if hasattr(task_specific, 'default_text'):
-                    default_text = task_specific.default_text or ""
-                    return self._clean_html(default_text)
+            return self.get_answer_key().default_text
         except Exception:
-            pass
-        return ""
+            return ""
+
+    def prepare_insert(self):
+        self.current_text = self._get_default_text()
 
     def save_answer_data(self, data):
         """
@@ -391,7 +249,7 @@ class TextInputTaskAnswer(BaseAnswer):
         Если передается текст (даже пустая строка), устанавливаем answered_at.
         """
         new_text = data.get("current_text", "")
-        self.current_text = self._clean_html(new_text)
+        self.current_text = clean_html(new_text)
 
         self.answered_at = timezone.now()
 
@@ -408,14 +266,13 @@ class TextInputTaskAnswer(BaseAnswer):
         else:
             return {"current_text": self._get_default_text()}
 
-    def delete_answers(self):
+    @classmethod
+    def get_reset_fields(cls, task):
         """
-        Сбрасывает ответы.
-        Устанавливает current_text в default_text и сбрасывает answered_at.
+        При сбросе current_text возвращается к default_text задания.
         """
-        self.current_text = self._get_default_text()
-        super().delete_answers()
-        self.save(update_fields=['current_text', 'correct_answers', 'wrong_answers'])
+        key = get_answer_key(task)
+        return {**super().get_reset_fields(task), "current_text": key.default_text if key else ""}
 
     def save(self, *args, **kwargs):
         """
@@ -425,7 +282,7 @@ class TextInputTaskAnswer(BaseAnswer):
         if not self.pk and not self.current_text:
             self.current_text = self._get_default_text()
         elif self.current_text:
-            self.current_text = self._clean_html(self.current_text)
+            self.current_text = clean_html(self.current_text)
         super().save(*args, **kwargs)
 
     def __str__(self):
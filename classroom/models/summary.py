@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import models
+
+User = settings.AUTH_USER_MODEL
+
+SUMMARY_FIELDS = ("correct_answers", "wrong_answers", "total_answers", "answered_at", "is_checked")
+
+
+class AnswerSummary(models.Model):
+    """
+    Узкая сводка ответа ученика: одна строка на (класс, задание, ученик).
+
+    Дублирует счётчики ответа любой из пяти моделей, чтобы статистика
+    читала одну индексированную таблицу вместо запроса к каждой модели.
+    Строку поддерживает BaseAnswer.sync_summary в той же транзакции, что
+    и запись ответа. Первичное заполнение — миграция 0004, ремонт —
+    backfill_answer_summary.
+    """
+    id = models.BigAutoField(primary_key=True)
+    classroom = models.ForeignKey("classroom.Classroom", on_delete=models.CASCADE, related_name="answer_summaries")
+    task = models.ForeignKey("courses.Task", on_delete=models.CASCADE, related_name="+")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+
+    correct_answers = models.PositiveIntegerField(default=0)
+    wrong_answers = models.PositiveIntegerField(default=0)
+    total_answers = models.PositiveIntegerField(default=0)
+    answered_at = models.DateTimeField(null=True, blank=True)
+    is_checked = models.BooleanField(default=False)
+
+    class Meta:
+        app_label = "classroom"
+        constraints = [
+            models.UniqueConstraint(fields=["classroom", "task", "user"], name="unique_answer_summary"),
+        ]
+
+    @classmethod
+    def from_answer(cls, answer):
+        return cls(
+            classroom_id=answer.classroom_id,
+            task_id=answer.task_id,
+            user_id=answer.user_id,
+            correct_answers=answer.correct_answers,
+            wrong_answers=answer.wrong_answers,
+            total_answers=answer.total_answers,
+            answered_at=answer.answered_at,
+            is_checked=getattr(answer, "is_checked", False),
+        )
+
+    @classmethod
+    def upsert(cls, rows, batch_size=None):
+        """
+        Вставляет или обновляет строки сводки одним INSERT ... ON CONFLICT.
+        """
+        return cls.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["classroom", "task", "user"],
+            update_fields=list(SUMMARY_FIELDS),
+        )
+
+    def __str__(self):
+        return f"AnswerSummary {self.user_id} -> {self.task_id} ({self.classroom_id})"
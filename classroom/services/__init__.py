@@ -3,4 +3,5 @@ from .chat import send_chat_message, get_last_chat_messages, edit_chat_message,
 from .actualize_data import get_current_lesson
 from .join_classroom import verify_classroom_password, finalize_join, validate_name_parts
 from .classroom import set_copying
-from .events.lesson import attach_lesson_and_notify
\ No newline at end of file
+from .events.lesson import attach_lesson_and_notify
+from .roster import get_roster, get_role, aget_roster, aget_role, is_member, invalidate_roster, ROLE_TEACHER, ROLE_STUDENT
\ No newline at end of file
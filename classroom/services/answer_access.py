@@ -1,14 +1,21 @@
+from .roster import get_role, ROLE_TEACHER, ROLE_STUDENT
+
+
 def check_user_access(request_user, classroom, target_user):
     """
     Проверяет, имеет ли request_user право работать с ответами target_user
     в рамках classroom.
+
+    Учитель работает с ответами любого участника класса,
+    ученик — только со своими.
     """
     if not request_user.is_authenticated or not target_user.is_authenticated:
         return False
 
-    available_users = classroom.get_available_users(request_user)
+    request_role = get_role(classroom.id, request_user.id)
 
-    return (
-        request_user in available_users
-        and target_user in available_users
-    )
\ No newline at end of file
+    if request_role == ROLE_TEACHER:
+        return get_role(classroom.id, target_user.id) is not None
+    if request_role == ROLE_STUDENT:
+        return request_user.id == target_user.id
+    return False
\ No newline at end of file
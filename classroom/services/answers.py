@@ -0,0 +1,217 @@
+"""
+Сохранение ответов учеников.
+
+Общий путь для HTTP-представления save_answer и действия answer:save
+в VirtualClassConsumer.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from courses.models import Task
+from classroom.models import AnswerSummary
+from classroom.registry import get_answer_model_by_task_type
+from classroom.answer_keys import get_answer_key
+from classroom.services.events.answers import notify_answer_reset, notify_answers_checked
+from classroom.services.statistics import notify_statistics_changed
+from classroom.utils.json_codec import dumps
+
+
+class UnsupportedTaskType(Exception):
+    pass
+
+
+class TaskNotFound(Exception):
+    pass
+
+
+def build_answer_payload(task, answer):
+    """
+    Формат ответа, который клиент передаёт в handleAnswer.
+    """
+    return {
+        "task_id": str(task.id),
+        "task_type": task.task_type,
+        "answer": answer.get_answer_data() if answer else None,
+    }
+
+
+def fetch_answers(classroom, tasks, users=None):
+    """
+    Загружает ответы пользователей users (None — всех) на задания tasks
+    одним запросом на каждый тип заданий и возвращает {(task_id, user_id): answer}.
+
+    Задания без модели ответа пропускаются. У найденных ответов task
+    подставляется из tasks, чтобы get_answer_data не загружал его заново.
+    """
+    tasks_by_type = defaultdict(dict)
+    for task in tasks:
+        tasks_by_type[task.task_type][task.id] = task
+
+    answers = {}
+    for task_type, type_tasks in tasks_by_type.items():
+        answer_model = get_answer_model_by_task_type(task_type)
+        if not answer_model:
+            continue
+        queryset = answer_model.objects.filter(classroom=classroom, task__in=type_tasks)
+        if users is not None:
+            queryset = queryset.filter(user__in=users)
+        for answer in queryset:
+            answer.task = type_tasks[answer.task_id]
+            answers[(answer.task_id, answer.user_id)] = answer
+    return answers
+
+
+def get_answerable_tasks(section):
+    return [
+        task for task in Task.objects.filter(section=section)
+        if get_answer_model_by_task_type(task.task_type)
+    ]
+
+
+def get_section_answer_payloads(classroom, section, target_user):
+    """
+    Ответы пользователя на все задания раздела в формате build_answer_payload.
+    """
+    tasks = get_answerable_tasks(section)
+    answers = fetch_answers(classroom, tasks, [target_user])
+    return [build_answer_payload(task, answers.get((task.id, target_user.id))) for task in tasks]
+
+
+def iter_section_answers_bundle(classroom, section):
+    """
+    Ответы всех участников класса на задания раздела для панели учителя.
+
+    Запросы выполняются сразу (один на тип заданий), а JSON
+    {"section_id", "tasks": [{"task_id", "task_type"}],
+     "answers": {user_id: {task_id: answer_data}}}
+    отдаётся частями по пользователю. Пользователи без ответов
+    и задания без ответа пользователя в answers не попадают.
+    """
+    tasks = get_answerable_tasks(section)
+    by_user = defaultdict(dict)
+    for (task_id, user_id), answer in fetch_answers(classroom, tasks).items():
+        by_user[user_id][task_id] = answer
+
+    def chunks():
+        yield dumps({
+            "section_id": str(section.id),
+            "tasks": [{"task_id": str(task.id), "task_type": task.task_type} for task in tasks],
+        })[:-1] + ',"answers":{'
+        for i, (user_id, answers) in enumerate(by_user.items()):
+            user_answers = {str(task_id): answer.get_answer_data() for task_id, answer in answers.items()}
+            yield ("," if i else "") + dumps(str(user_id)) + ":" + dumps(user_answers)
+        yield "}}"
+
+    return chunks()
+
+
+def save_user_answer(classroom, task, target_user, data):
+    """
+    Создаёт или обновляет ответ пользователя и возвращает (answer, created).
+
+    Raises:
+        UnsupportedTaskType: у типа задания нет модели ответа
+        ValidationError: данные ответа некорректны или ответ уже проверен
+    """
+    answer_model = get_answer_model_by_task_type(task.task_type)
+    if not answer_model:
+        raise UnsupportedTaskType(task.task_type)
+
+    with transaction.atomic():
+        # Строка ответа создаётся или читается одним запросом и остаётся
+        # заблокированной до commit: счётчики не нужно перечитывать
+        answer, created = answer_model.upsert(task, classroom, target_user)
+        # Задание уже загружено: ключ ответов берётся по нему без запроса к Task
+        answer.task = task
+
+        answer.save_answer_data(data)
+        notify_statistics_changed(classroom, task, [(target_user, answer)])
+    return answer, created
+
+
+def reset_task_answers(classroom, task, sender_id=None):
+    """
+    Сбрасывает ответы всех участников класса на задание и возвращает
+    число сброшенных ответов.
+
+    Тип задания известен, поэтому сброс — один UPDATE модели ответа и один
+    UPDATE сводки в одной транзакции. После commit учитель получает строки
+    статистики, а класс — одно событие answer:reset вместо события на ученика.
+
+    Raises:
+        UnsupportedTaskType: у типа задания нет модели ответа
+    """
+    answer_model = get_answer_model_by_task_type(task.task_type)
+    if not answer_model:
+        raise UnsupportedTaskType(task.task_type)
+
+    with transaction.atomic():
+        reset_count = answer_model.objects.filter(classroom=classroom, task=task).update(
+            **answer_model.get_reset_fields(task)
+        )
+        if not reset_count:
+            return 0
+
+        summaries = list(AnswerSummary.objects.filter(classroom=classroom, task=task).select_related("user"))
+        AnswerSummary.objects.filter(classroom=classroom, task=task).update(
+            correct_answers=0, wrong_answers=0, is_checked=False,
+        )
+        for summary in summaries:
+            summary.correct_answers = summary.wrong_answers = 0
+
+        notify_statistics_changed(classroom, task, [(summary.user, summary) for summary in summaries])
+        classroom_id, task_id = classroom.id, task.id
+        transaction.on_commit(
+            lambda: notify_answer_reset(classroom_id=classroom_id, task_id=task_id, sender_id=sender_id)
+        )
+    return reset_count
+
+
+def check_task_answers(classroom, task, sender_id=None):
+    """
+    Проверяет все непроверенные ответы класса на задание test или
+    true_false и возвращает список проверенных ответов.
+
+    Ключ ответов загружается один раз, ответы оцениваются в памяти и
+    записываются одним bulk_update, сводка — одним upsert. После commit
+    учитель получает одно обновление статистики, а класс — одно answer:sent.
+
+    Raises:
+        UnsupportedTaskType: тип задания не поддерживает проверку
+        TaskNotFound: у задания нет specific-объекта
+    """
+    answer_model = get_answer_model_by_task_type(task.task_type)
+    if not answer_model or not hasattr(answer_model, "mark_as_checked"):
+        raise UnsupportedTaskType(task.task_type)
+
+    key = get_answer_key(task)
+    if key is None:
+        raise TaskNotFound(task.id)
+
+    with transaction.atomic():
+        answers = list(
+            answer_model.objects.select_for_update(of=("self",))
+            .filter(classroom=classroom, task=task, is_checked=False)
+            .select_related("user")
+        )
+        if not answers:
+            return []
+
+        for answer in answers:
+            answer.task = task
+            grade = answer.grade(key)
+            answer.answers = grade.answers
+            answer.correct_answers = grade.correct
+            answer.wrong_answers = grade.wrong
+            answer.is_checked = True
+
+        answer_model.objects.bulk_update(answers, ["answers", "correct_answers", "wrong_answers", "is_checked"])
+        AnswerSummary.upsert([AnswerSummary.from_answer(answer) for answer in answers])
+
+        notify_statistics_changed(classroom, task, [(answer.user, answer) for answer in answers])
+        classroom_id, task_id = classroom.id, task.id
+        transaction.on_commit(
+            lambda: notify_answers_checked(classroom_id=classroom_id, task_id=task_id, sender_id=sender_id)
+        )
+    return answers
@@ -0,0 +1,122 @@
+"""
+Реестр живых каналов виртуального класса и чистка групп от мёртвых.
+
+Если воркер убит или сокет оборвался без закрытия, disconnect не вызывается,
+и имя канала остаётся в группах channel layer до group_expiry (сутки):
+fan-out продолжает слать сообщения в никуда. Поэтому каждое соединение
+отмечает свои каналы в реестре при подключении и на каждом keepalive:
+
+    classroom_channels:alive  ZSET channel_name -> время последней отметки
+
+Чистильщик (команда sweep_classroom_groups) проходит группы classroom_*
+и user_* (включая *_students, *_teacher и двойники .control) и удаляет
+каналы, которых нет в реестре или которые не отмечались дольше TTL.
+
+Для channel layer без Redis используется процессный реестр с тем же интерфейсом.
+"""
+import fnmatch
+import time
+
+from django.conf import settings
+
+ALIVE_KEY = "classroom_channels:alive"
+
+SWEPT_GROUP_PATTERNS = ("classroom_*", "user_*")
+
+
+def get_channel_ttl() -> int:
+    return getattr(settings, "CLASSROOM_CHANNEL_TTL", 120)
+
+
+class RedisChannelRegistry:
+    """
+    Реестр каналов поверх Redis-соединений channels_redis.
+    """
+
+    def __init__(self, channel_layer, ttl=None):
+        self.channel_layer = channel_layer
+        self.ttl = ttl or get_channel_ttl()
+
+    def _connection(self):
+        return self.channel_layer.connection(self.channel_layer.consistent_hash(ALIVE_KEY))
+
+    async def touch(self, channel_names) -> None:
+        now = time.time()
+        await self._connection().zadd(ALIVE_KEY, {name: now for name in channel_names})
+
+    async def remove(self, channel_names) -> None:
+        await self._connection().zrem(ALIVE_KEY, *channel_names)
+
+    async def sweep(self) -> int:
+        """
+        Удаляет мёртвые каналы из групп класса; возвращает число удалённых членств.
+        """
+        alive = self._connection()
+        await alive.zremrangebyscore(ALIVE_KEY, "-inf", time.time() - self.ttl)
+
+        prefix = self.channel_layer.prefix
+        removed = 0
+        for index in range(self.channel_layer.ring_size):
+            connection = self.channel_layer.connection(index)
+            for pattern in SWEPT_GROUP_PATTERNS:
+                async for key in connection.scan_iter(match=f"{prefix}:group:{pattern}", count=500):
+                    members = await connection.zrange(key, 0, -1)
+                    if not members:
+                        continue
+                    scores = await alive.zmscore(ALIVE_KEY, members)
+                    dead = [member for member, score in zip(members, scores) if score is None]
+                    if dead:
+                        removed += await connection.zrem(key, *dead)
+        return removed
+
+
+class LocalChannelRegistry:
+    """
+    Процессный реестр каналов для InMemoryChannelLayer.
+    """
+
+    def __init__(self, channel_layer, ttl=None):
+        self.channel_layer = channel_layer
+        self.ttl = ttl or get_channel_ttl()
+        self._alive = {}
+
+    async def touch(self, channel_names) -> None:
+        now = time.time()
+        for name in channel_names:
+            self._alive[name] = now
+
+    async def remove(self, channel_names) -> None:
+        for name in channel_names:
+            self._alive.pop(name, None)
+
+    async def sweep(self) -> int:
+        deadline = time.time() - self.ttl
+        for name, seen_at in list(self._alive.items()):
+            if seen_at < deadline:
+                del self._alive[name]
+
+        removed = 0
+        for group, channels in list(self.channel_layer.groups.items()):
+            if not any(fnmatch.fnmatchcase(group, pattern) for pattern in SWEPT_GROUP_PATTERNS):
+                continue
+            for name in [name for name in channels if name not in self._alive]:
+                del channels[name]
+                removed += 1
+        return removed
+
+
+_local_registry = None
+
+
+def get_channel_registry(channel_layer):
+    """
+    Возвращает реестр каналов, подходящий для данного channel layer.
+    """
+    global _local_registry
+
+    if hasattr(channel_layer, "connection") and hasattr(channel_layer, "consistent_hash"):
+        return RedisChannelRegistry(channel_layer)
+
+    if _local_registry is None or _local_registry.channel_layer is not channel_layer:
+        _local_registry = LocalChannelRegistry(channel_layer)
+    return _local_registry
@@ -0,0 +1,97 @@
+"""
+Компактное состояние WebSocket-соединения виртуального класса.
+
+VirtualClassConsumer живёт столько же, сколько сокет, поэтому всё, что он
+держит, умножается на число открытых соединений воркера. Вместо экземпляров
+User/Classroom и словаря имён групп соединение хранит одну запись со слотами:
+id, роль, имена для кадров и ссылки на имена групп класса. Имена групп класса
+интернированы и общие для всех соединений класса.
+
+Запись совместима с request.user по id, username и is_authenticated,
+поэтому подменяет пользователя в scope после подключения.
+"""
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import ClassVar
+
+from classroom.services.roster import ROLE_STUDENT, ROLE_TEACHER
+
+
+@lru_cache(maxsize=4096)
+def classroom_groups(classroom_id) -> tuple:
+    """
+    Интернированные имена групп класса: (весь класс, ученики, учитель).
+    """
+    return (
+        sys.intern(f"classroom_{classroom_id}"),
+        sys.intern(f"classroom_{classroom_id}_students"),
+        sys.intern(f"classroom_{classroom_id}_teacher"),
+    )
+
+
+@dataclass(slots=True)
+class ConnectionState:
+    classroom_id: str
+    user_id: int
+    role: str
+    username: str = "Anonymous"
+    display_name: str = "Anonymous"
+    last_seen: float = 0.0
+    groups: tuple = ()
+    user_group: str = ""
+
+    is_authenticated: ClassVar[bool] = True
+    is_anonymous: ClassVar[bool] = False
+
+    def __post_init__(self):
+        if not self.groups:
+            self.groups = classroom_groups(self.classroom_id)
+        if not self.user_group:
+            self.user_group = f"user_{self.user_id}"
+
+    @classmethod
+    def from_user(cls, classroom_id, user, role):
+        return cls(
+            classroom_id=classroom_id,
+            user_id=user.id,
+            role=role,
+            username=user.username,
+            display_name=getattr(user, "display_name", None) or user.username,
+        )
+
+    @property
+    def id(self):
+        return self.user_id
+
+    @property
+    def pk(self):
+        return self.user_id
+
+    @property
+    def is_teacher(self) -> bool:
+        return self.role == ROLE_TEACHER
+
+    @property
+    def is_student(self) -> bool:
+        return self.role == ROLE_STUDENT
+
+    @property
+    def classroom_group(self) -> str:
+        return self.groups[0]
+
+    @property
+    def students_group(self) -> str:
+        return self.groups[1]
+
+    @property
+    def teacher_group(self) -> str:
+        return self.groups[2]
+
+    @property
+    def member_groups(self) -> tuple:
+        """
+        Группы, в которых состоит соединение.
+        """
+        role_group = self.students_group if self.is_student else self.teacher_group
+        return (self.classroom_group, self.user_group, role_group)
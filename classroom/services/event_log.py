@@ -0,0 +1,237 @@
+"""
+Журнал событий виртуального класса для возобновления WebSocket-потока.
+
+Поток событий ведётся отдельно для каждой группы-получателя (весь класс,
+ученики, учитель, личная группа user_{id}): событие получает порядковый
+номер (seq) в потоке своей группы и записывается в ограниченный журнал:
+
+    classroom_events:{group}:seq  INCR-счётчик
+    classroom_events:{group}:log  ZSET "seq|json" последних событий со score = seq
+
+resume читает из ZSET только события после last_seq (ZRANGEBYSCORE),
+а не весь журнал.
+
+Массовые эфемерные события (UNLOGGED_ACTIONS, например chat:update)
+не нумеруются и не пишутся в журнал: потерянный кадр не нужно досылать.
+Кадр длиннее CLASSROOM_EVENT_LOG_MAX_FRAME (снимок урока) нумеруется,
+но в журнал попадает заглушка без кадра: resume через неё возвращает
+complete=false, и клиент загружает данные заново, а не получает снимок.
+
+Кадр несёт seq и имя потока (stream). Соединение состоит во всех группах
+своих потоков, поэтому дыра в номерах потока означает потерянный кадр,
+а не событие, адресованное другим. Событие, которое соединение
+отфильтровало само, закрывается кадром seq:skip.
+
+Переподключившийся клиент присылает resume({stream: last_seq}) и получает
+только пропущенные события. Если часть пропуска уже вытеснена из журнала,
+возвращается признак разрыва, и клиент делает полное обновление.
+
+Для channel layer без Redis используется процессный журнал с тем же интерфейсом.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from classroom.services.lanes import event_lane, lane_group
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_PREFIX = "classroom_events"
+
+UNLOGGED_ACTIONS = frozenset({"chat:update"})
+
+APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], seq, seq .. '|' .. ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return seq
+"""
+
+
+def get_event_log_size() -> int:
+    return getattr(settings, "CLASSROOM_EVENT_LOG_SIZE", 500)
+
+
+def get_event_log_ttl() -> int:
+    return getattr(settings, "CLASSROOM_EVENT_LOG_TTL", 3600)
+
+
+def get_event_log_max_frame() -> int:
+    return getattr(settings, "CLASSROOM_EVENT_LOG_MAX_FRAME", 16384)
+
+
+def stamp_frame(frame, stream, seq):
+    """
+    Добавляет поток и seq в уже закодированный кадр {"type": ..., "data": ...}
+    без повторной сериализации.
+    """
+    return '{"seq":%d,"stream":%s,%s' % (seq, json.dumps(stream), frame[1:])
+
+
+def _entries_after(entries, last_seq, current_seq):
+    """
+    Возвращает (события с seq > last_seq, полнота).
+
+    Пропуск полон, если журнал содержит все события после last_seq
+    и среди них нет заглушек крупных кадров.
+    """
+    if last_seq > current_seq:
+        return [], False
+    if last_seq == current_seq:
+        return [], True
+
+    missed = [(seq, entry) for seq, entry in entries if seq > last_seq]
+    complete = (
+        bool(missed) and missed[0][0] == last_seq + 1
+        and not any(entry.get("oversized") for _, entry in missed)
+    )
+    return missed, complete
+
+
+class RedisEventLog:
+    """
+    Журнал событий поверх Redis-соединений channels_redis.
+    """
+
+    def __init__(self, channel_layer, size=None, ttl=None):
+        self.channel_layer = channel_layer
+        self.size = size or get_event_log_size()
+        self.ttl = ttl or get_event_log_ttl()
+
+    def _keys(self, group):
+        return [
+            f"{EVENT_LOG_PREFIX}:{group}:seq",
+            f"{EVENT_LOG_PREFIX}:{group}:log",
+        ]
+
+    def _connection(self, group):
+        index = self.channel_layer.consistent_hash(f"{EVENT_LOG_PREFIX}:{group}")
+        return self.channel_layer.connection(index)
+
+    async def append(self, group, entry) -> int:
+        """Записывает событие в поток группы и возвращает присвоенный ему seq."""
+        connection = self._connection(group)
+        runner = connection.register_script(APPEND_SCRIPT)
+        seq = await runner(
+            keys=self._keys(group),
+            args=[json.dumps(entry, ensure_ascii=False), self.size, self.ttl],
+        )
+        return int(seq)
+
+    async def current_seqs(self, groups) -> dict:
+        """Текущие seq потоков групп: {group: seq}."""
+        values = await asyncio.gather(*(
+            self._connection(group).get(self._keys(group)[0]) for group in groups
+        ))
+        return {group: int(value or 0) for group, value in zip(groups, values)}
+
+    async def since(self, group, last_seq):
+        """Возвращает (список (seq, entry), текущий seq, полнота) потока группы."""
+        connection = self._connection(group)
+        seq_key, log_key = self._keys(group)
+        async with connection.pipeline(transaction=True) as pipe:
+            pipe.get(seq_key)
+            pipe.zrangebyscore(log_key, f"({int(last_seq)}", "+inf")
+            current, raw = await pipe.execute()
+
+        entries = []
+        for item in raw:
+            if isinstance(item, bytes):
+                item = item.decode("utf-8")
+            seq, _, payload = item.partition("|")
+            entries.append((int(seq), json.loads(payload)))
+
+        current_seq = int(current or 0)
+        missed, complete = _entries_after(entries, last_seq, current_seq)
+        return missed, current_seq, complete
+
+
+class LocalEventLog:
+    """
+    Процессный журнал событий для channel layer без Redis.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or get_event_log_size()
+        self._seq = {}
+        self._logs = {}
+        self._lock = threading.Lock()
+
+    async def append(self, group, entry) -> int:
+        with self._lock:
+            seq = self._seq.get(group, 0) + 1
+            self._seq[group] = seq
+            self._logs.setdefault(group, deque(maxlen=self.size)).append((seq, entry))
+            return seq
+
+    async def current_seqs(self, groups) -> dict:
+        with self._lock:
+            return {group: self._seq.get(group, 0) for group in groups}
+
+    async def since(self, group, last_seq):
+        with self._lock:
+            current_seq = self._seq.get(group, 0)
+            entries = list(self._logs.get(group, ()))
+        missed, complete = _entries_after(entries, last_seq, current_seq)
+        return missed, current_seq, complete
+
+
+_local_event_log = None
+
+
+def get_event_log(channel_layer):
+    """
+    Возвращает журнал событий, подходящий для данного channel layer.
+    """
+    global _local_event_log
+
+    if hasattr(channel_layer, "connection") and hasattr(channel_layer, "consistent_hash"):
+        return RedisEventLog(channel_layer)
+
+    if _local_event_log is None:
+        _local_event_log = LocalEventLog()
+    return _local_event_log
+
+
+async def publish_event(channel_layer, group, event):
+    """
+    Присваивает событию seq в потоке группы, пишет его в журнал
+    и отправляет в группу. Кадр отправляется уже с seq и stream.
+
+    Управляющие события уходят в группу-двойник полосы control,
+    но нумеруются в потоке исходной группы. События UNLOGGED_ACTIONS
+    отправляются без seq; вместо крупного кадра журнал хранит заглушку.
+    Возвращает seq или None для ненумеруемого события.
+    """
+    if event.get("action") in UNLOGGED_ACTIONS:
+        await channel_layer.group_send(lane_group(group, event_lane(event)), event)
+        return None
+
+    entry = event
+    if len(event["frame"]) > get_event_log_max_frame():
+        entry = {"type": event.get("type"), "oversized": True}
+    seq = await get_event_log(channel_layer).append(group, entry)
+    event = dict(event, seq=seq, stream=group, frame=stamp_frame(event["frame"], group, seq))
+    await channel_layer.group_send(lane_group(group, event_lane(event)), event)
+    return seq
+
+
+def publish_event_sync(group, event):
+    """
+    publish_event для синхронного кода, обычно из transaction.on_commit.
+    Данные к этому моменту уже сохранены, поэтому ошибка Redis или
+    channel layer только логируется и не превращает запрос в 500.
+    """
+    try:
+        return async_to_sync(publish_event)(get_channel_layer(), group, event)
+    except Exception:
+        logger.exception("Failed to publish %s to %s", event.get("type"), group)
+        return None
@@ -0,0 +1,43 @@
+from classroom.services.event_log import publish_event_sync
+from classroom.utils.json_codec import encode_frame
+
+
+def _broadcast(action, classroom_id, task_id, sender_id):
+    publish_event_sync(
+        f"classroom_{classroom_id}",
+        {
+            "type": "classroom_broadcast_event",
+            "action": action,
+            "task_id": task_id,
+            "student_id": "all",
+            "sender_id": sender_id,
+            "frame": encode_frame(action, {
+                "task_id": task_id,
+                "student_id": "all",
+                "sender_id": sender_id,
+                "payload": {},
+            }),
+        },
+    )
+
+
+def notify_answer_reset(*, classroom_id, task_id, sender_id) -> None:
+    """
+    Отправляет всему классу одно событие answer:reset о сбросе ответов
+    всех учеников на задание. Клиенты только очищают задание:
+    ответы на сервере уже сброшены.
+
+    Вызывается строго после commit транзакции.
+    """
+    _broadcast("answer:reset", classroom_id, task_id, sender_id)
+
+
+def notify_answers_checked(*, classroom_id, task_id, sender_id) -> None:
+    """
+    Отправляет всему классу одно событие answer:sent без данных ответа
+    после проверки ответов всех учеников: каждый клиент перезапрашивает
+    ответ, который он показывает.
+
+    Вызывается строго после commit транзакции.
+    """
+    _broadcast("answer:sent", classroom_id, task_id, sender_id)
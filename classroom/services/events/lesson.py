@@ -1,22 +1,83 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+import hashlib
+import logging
+
+from django.conf import settings
 from django.db import transaction
 
+from classroom.services.event_log import publish_event_sync
+from classroom.utils.json_codec import dumps, encode_frame
+from courses.models import Lesson, Task
+from courses.services import get_task_data
+
+logger = logging.getLogger(__name__)
+
+
+def build_lesson_snapshot(lesson_id):
+    """
+    Собирает снимок урока: разделы и задания первого раздела в тех же
+    форматах, что и lesson_sections / get_section_tasks_view.
+
+    Если снимок больше CLASSROOM_LESSON_SNAPSHOT_MAX_BYTES, задания
+    не включаются (tasks = None) и клиент загружает их сам.
+    Возвращает None, если у урока нет разделов.
+    """
+    lesson = Lesson.objects.filter(id=lesson_id).first()
+    if lesson is None:
+        return None
+
+    sections = [
+        {"id": section.id, "title": section.title, "order": section.order}
+        for section in lesson.sections.all().order_by("order")
+    ]
+    if not sections:
+        return None
+
+    first_section_id = sections[0]["id"]
+    tasks = [
+        {"task_id": task.id, "task_type": task.task_type, "data": get_task_data(task)}
+        for task in Task.objects.filter(section_id=first_section_id).order_by("order")
+    ]
+
+    snapshot = {
+        "lesson_id": lesson.id,
+        "sections": sections,
+        "section_id": first_section_id,
+        "tasks": tasks,
+    }
+    encoded = dumps(snapshot)
+    if len(encoded.encode("utf-8")) > getattr(settings, "CLASSROOM_LESSON_SNAPSHOT_MAX_BYTES", 262144):
+        snapshot["tasks"] = None
+        encoded = dumps(snapshot)
+
+    snapshot["version"] = hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:12]
+    return snapshot
+
 
 def notify_lesson_attached(*, classroom_id: str, lesson_id: int) -> None:
     """
     Отправляет websocket-уведомление всем участникам виртуального класса
     о смене / прикреплении урока.
 
+    Снимок урока собирается один раз и уходит в payload.snapshot, чтобы
+    клиенты отрисовали урок без каскада запросов разделов и заданий.
+
     Вызывается строго после commit транзакции.
     """
-    channel_layer = get_channel_layer()
+    try:
+        snapshot = build_lesson_snapshot(lesson_id)
+    except Exception as e:
+        logger.warning("Lesson snapshot for %s failed: %s", lesson_id, e)
+        snapshot = None
 
-    async_to_sync(channel_layer.group_send)(
+    publish_event_sync(
         f"classroom_{classroom_id}",
         {
             "type": "lesson_attached",
             "lesson_id": lesson_id,
+            "frame": encode_frame("lesson:attached", {
+                "lesson_id": lesson_id,
+                "payload": {"snapshot": snapshot} if snapshot else {},
+            }),
         },
     )
 
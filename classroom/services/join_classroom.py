@@ -4,6 +4,8 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.utils.crypto import constant_time_compare
 
+from .roster import get_role, ROLE_STUDENT
+
 User = get_user_model()
 
 _name_part_pattern = re.compile(r"^[A-Za-zА-Яа-яЁё\-/]+$")
@@ -65,7 +67,7 @@ def finalize_join(classroom, first_name: str, last_name: str) -> tuple[User, boo
         display_name, username = build_usernames(classroom.id, first_name, last_name)
         user, created = create_or_get_user(username, display_name)
 
-        if user not in classroom.students.all():
+        if get_role(classroom.id, user.id) != ROLE_STUDENT:
             attach_user_to_classroom(classroom, user, classroom.join_password)
 
         return user, created, ""
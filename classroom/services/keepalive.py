@@ -0,0 +1,104 @@
+"""
+Keepalive соединений виртуального класса.
+
+Один процессный цикл на все соединения вместо задачи на каждое: раз в
+CLASSROOM_PING_INTERVAL он закрывает сокеты, молчащие дольше
+CLASSROOM_IDLE_TIMEOUT, остальным шлёт ping, одним вызовом продлевает
+отметки их каналов в реестре и обновляет heartbeat присутствия учеников.
+Цикл запускается с первым соединением и завершается с последним.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+
+from classroom.services.channel_registry import get_channel_registry
+from classroom.services.lanes import control_channel
+from classroom.services.presence import get_presence
+from classroom.utils.json_codec import encode_frame
+
+# Код закрытия сокета, молчавшего дольше CLASSROOM_IDLE_TIMEOUT
+IDLE_CLOSE_CODE = 4408
+
+PING_FRAME = encode_frame("ping", {})
+
+
+def get_ping_interval():
+    """
+    Период keepalive в секундах: ping клиенту, отметка каналов в реестре,
+    heartbeat присутствия.
+    """
+    return getattr(settings, "CLASSROOM_PING_INTERVAL", 25)
+
+
+def get_idle_timeout():
+    """
+    Сколько секунд сокет может молчать (ни pong, ни действий), прежде чем сервер его закроет.
+    """
+    return getattr(settings, "CLASSROOM_IDLE_TIMEOUT", 75)
+
+
+class KeepaliveTicker:
+    """
+    Процессный цикл keepalive для соединений одного event loop.
+    """
+
+    def __init__(self):
+        self._connections = set()
+        self._task = None
+
+    def __len__(self):
+        return len(self._connections)
+
+    def add(self, consumer):
+        if self._task is not None and self._task.get_loop() is not asyncio.get_running_loop():
+            self._connections.clear()
+            self._task = None
+        self._connections.add(consumer)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, consumer):
+        self._connections.discard(consumer)
+
+    async def _run(self):
+        try:
+            while self._connections:
+                await asyncio.sleep(get_ping_interval())
+                await self.tick()
+        finally:
+            self._task = None
+
+    async def tick(self):
+        now = time.monotonic()
+        idle_timeout = get_idle_timeout()
+
+        sends = []
+        channels = {}
+        heartbeats = []
+        for consumer in list(self._connections):
+            state = consumer.state
+            if now - state.last_seen > idle_timeout:
+                self._connections.discard(consumer)
+                sends.append(consumer.close(code=IDLE_CLOSE_CODE))
+                continue
+
+            sends.append(consumer._send_frame(PING_FRAME))
+            layer = consumer.channel_layer
+            channels.setdefault(id(layer), (layer, []))[1].extend(
+                (consumer.channel_name, control_channel(consumer.channel_name))
+            )
+            if state.is_student:
+                heartbeats.append(
+                    get_presence(layer).heartbeat(state.classroom_id, state.user_id, consumer.channel_name)
+                )
+
+        await asyncio.gather(*sends, return_exceptions=True)
+        await asyncio.gather(
+            *(get_channel_registry(layer).touch(names) for layer, names in channels.values()),
+            *heartbeats,
+            return_exceptions=True,
+        )
+
+
+ticker = KeepaliveTicker()
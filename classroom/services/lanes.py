@@ -0,0 +1,70 @@
+"""
+Полосы доставки событий виртуального класса.
+
+Управляющие события (удаление ученика, смена урока и раздела, режим
+копирования) идут по отдельной полосе control:
+
+    группа     {group}.control            — двойник обычной группы
+    канал      {channel_name}.control     — второй канал соединения
+
+Канал control — локальное имя того же процесса (часть после «!»), поэтому
+channels_redis кладёт его сообщения в ту же очередь Redis процесса, что и
+массовый трафик, и выдаёт их в общем порядке FIFO: приоритета доставки
+полоса не даёт. Разделение начинается после чтения: у канала control свой
+буфер приёма и свой цикл обработки (VirtualClassConsumer._control_loop),
+поэтому кадр не ждёт, пока соединение разберёт накопленные bulk-события.
+Ёмкость по шаблону CONTROL_CAPACITY_PATTERN сравнивается с длиной той же
+общей очереди, то есть лишь позволяет отправке control не получать
+ChannelFull, пока очередь не дорастёт до этого предела.
+
+В исходящей очереди соединения кадры control отправляются без ожидания
+окна батчинга вместе с накопленными до них; кадры bulk при переполнении
+отбрасываются.
+"""
+from django.conf import settings
+
+LANE_CONTROL = "control"
+LANE_BULK = "bulk"
+
+CONTROL_SUFFIX = ".control"
+CONTROL_CAPACITY_PATTERN = "*" + CONTROL_SUFFIX
+
+CONTROL_ACTIONS = frozenset({
+    "section:change",
+    "section_list:change",
+    "copying:changed",
+})
+
+CONTROL_EVENT_TYPES = frozenset({
+    "user_deleted_event",
+    "lesson_attached",
+})
+
+
+def event_lane(event) -> str:
+    """
+    Полоса события channel layer: control или bulk.
+    """
+    if event.get("type") in CONTROL_EVENT_TYPES or event.get("action") in CONTROL_ACTIONS:
+        return LANE_CONTROL
+    return LANE_BULK
+
+
+def lane_group(group, lane) -> str:
+    """
+    Имя группы для полосы: для control — группа-двойник.
+    """
+    if lane == LANE_CONTROL:
+        return group + CONTROL_SUFFIX
+    return group
+
+
+def control_channel(channel_name) -> str:
+    return channel_name + CONTROL_SUFFIX
+
+
+def get_outbox_max_pending() -> int:
+    """
+    Предел кадров bulk в исходящей очереди соединения; старшие сверх него отбрасываются.
+    """
+    return getattr(settings, "CLASSROOM_OUTBOX_MAX_PENDING", 200)
@@ -0,0 +1,183 @@
+"""
+Реестр присутствия учеников в виртуальном классе.
+
+Состояние хранится в Redis channel layer'а, поэтому оно общее для всех
+воркеров и нод:
+
+    presence:{classroom_id}:user:{user_id}  ZSET channel_name -> время heartbeat
+    presence:{classroom_id}:online          ZSET user_id -> время heartbeat
+
+Первое подключение и последнее отключение пользователя определяются атомарно
+Lua-скриптами. Соединения, которые не присылали heartbeat дольше TTL
+(упавший воркер, оборванный сокет), считаются мёртвыми и вычищаются.
+
+Для channel layer без Redis (InMemoryChannelLayer в тестах и локальной
+разработке) используется процессный реестр с тем же интерфейсом.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+
+PRESENCE_PREFIX = "presence"
+
+CONNECT_SCRIPT = """
+local now = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+local before = redis.call('ZCARD', KEYS[1])
+redis.call('ZADD', KEYS[1], now, ARGV[1])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('ZADD', KEYS[2], now, ARGV[4])
+redis.call('EXPIRE', KEYS[2], ttl)
+if before == 0 then
+    return 1
+end
+return 0
+"""
+
+DISCONNECT_SCRIPT = """
+local now = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[1])
+    redis.call('ZREM', KEYS[2], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+HEARTBEAT_SCRIPT = """
+local now = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+redis.call('ZADD', KEYS[1], now, ARGV[1])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('ZADD', KEYS[2], now, ARGV[4])
+redis.call('EXPIRE', KEYS[2], ttl)
+return 1
+"""
+
+
+def get_presence_ttl() -> int:
+    return getattr(settings, "CLASSROOM_PRESENCE_TTL", 90)
+
+
+class RedisPresence:
+    """
+    Реестр присутствия поверх Redis-соединений channels_redis.
+    """
+
+    def __init__(self, channel_layer, ttl=None):
+        self.channel_layer = channel_layer
+        self.ttl = ttl or get_presence_ttl()
+
+    def _keys(self, classroom_id, user_id):
+        online_key = f"{PRESENCE_PREFIX}:{classroom_id}:online"
+        user_key = f"{PRESENCE_PREFIX}:{classroom_id}:user:{user_id}"
+        return [user_key, online_key]
+
+    def _connection(self, classroom_id):
+        index = self.channel_layer.consistent_hash(f"{PRESENCE_PREFIX}:{classroom_id}")
+        return self.channel_layer.connection(index)
+
+    async def _run(self, script, classroom_id, user_id, channel_name):
+        connection = self._connection(classroom_id)
+        runner = connection.register_script(script)
+        result = await runner(
+            keys=self._keys(classroom_id, user_id),
+            args=[channel_name, time.time(), self.ttl, str(user_id)],
+        )
+        return bool(result)
+
+    async def connect(self, classroom_id, user_id, channel_name) -> bool:
+        """Регистрирует соединение. True, если это первое живое соединение пользователя."""
+        return await self._run(CONNECT_SCRIPT, classroom_id, user_id, channel_name)
+
+    async def disconnect(self, classroom_id, user_id, channel_name) -> bool:
+        """Снимает соединение. True, если у пользователя не осталось живых соединений."""
+        return await self._run(DISCONNECT_SCRIPT, classroom_id, user_id, channel_name)
+
+    async def heartbeat(self, classroom_id, user_id, channel_name) -> None:
+        await self._run(HEARTBEAT_SCRIPT, classroom_id, user_id, channel_name)
+
+    async def online_users(self, classroom_id) -> list[int]:
+        """Возвращает id пользователей класса, у которых есть живые соединения."""
+        connection = self._connection(classroom_id)
+        members = await connection.zrangebyscore(
+            f"{PRESENCE_PREFIX}:{classroom_id}:online",
+            time.time() - self.ttl,
+            "+inf",
+        )
+        return [int(member) for member in members]
+
+
+class LocalPresence:
+    """
+    Процессный реестр присутствия для channel layer без Redis.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or get_presence_ttl()
+        self._connections = {}
+        self._lock = asyncio.Lock()
+
+    def _prune(self, key, now):
+        channels = self._connections.get(key, {})
+        for channel_name, seen_at in list(channels.items()):
+            if now - seen_at > self.ttl:
+                del channels[channel_name]
+        return channels
+
+    async def connect(self, classroom_id, user_id, channel_name) -> bool:
+        async with self._lock:
+            now = time.time()
+            key = (str(classroom_id), int(user_id))
+            channels = self._prune(key, now)
+            first = not channels
+            channels[channel_name] = now
+            self._connections[key] = channels
+            return first
+
+    async def disconnect(self, classroom_id, user_id, channel_name) -> bool:
+        async with self._lock:
+            key = (str(classroom_id), int(user_id))
+            channels = self._prune(key, time.time())
+            channels.pop(channel_name, None)
+            if channels:
+                return False
+            self._connections.pop(key, None)
+            return True
+
+    async def heartbeat(self, classroom_id, user_id, channel_name) -> None:
+        async with self._lock:
+            key = (str(classroom_id), int(user_id))
+            self._connections.setdefault(key, {})[channel_name] = time.time()
+
+    async def online_users(self, classroom_id) -> list[int]:
+        async with self._lock:
+            now = time.time()
+            classroom_id = str(classroom_id)
+            return [
+                user_id
+                for (cid, user_id) in list(self._connections)
+                if cid == classroom_id and self._prune((cid, user_id), now)
+            ]
+
+
+_local_presence = None
+
+
+def get_presence(channel_layer):
+    """
+    Возвращает реестр присутствия, подходящий для данного channel layer.
+    """
+    global _local_presence
+
+    if hasattr(channel_layer, "connection") and hasattr(channel_layer, "consistent_hash"):
+        return RedisPresence(channel_layer)
+
+    if _local_presence is None:
+        _local_presence = LocalPresence()
+    return _local_presence
@@ -0,0 +1,183 @@
+"""
+Кеш состава класса: id учителя и id учеников.
+
+Используется HTTP-представлениями и VirtualClassConsumer для проверок ролей
+без запросов к БД. Хранится в двухуровневом кеше (процессный LRU + Redis).
+
+Локальный уровень не инвалидируется между процессами, поэтому отрицательный
+ответ («не состоит в классе») всегда перепроверяется по общему кешу: только что
+вступивший ученик не получит отказ из-за устаревшей локальной копии.
+"""
+import asyncio
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from classroom.models import Classroom
+from classroom.utils.tiered_cache import TieredCache
+
+ROLE_TEACHER = "teacher"
+ROLE_STUDENT = "student"
+
+roster_cache = TieredCache(
+    "classroom_roster",
+    maxsize=getattr(settings, "CLASSROOM_ROSTER_LOCAL_SIZE", 2048),
+    local_ttl=getattr(settings, "CLASSROOM_ROSTER_LOCAL_TTL", 5),
+    shared_ttl=getattr(settings, "CLASSROOM_ROSTER_TTL", 3600),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Roster:
+    classroom_id: int
+    teacher_id: int
+    student_ids: tuple
+    _student_set: frozenset = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_student_set", frozenset(self.student_ids))
+
+    def role_of(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        if user_id == self.teacher_id:
+            return ROLE_TEACHER
+        if user_id in self._student_set:
+            return ROLE_STUDENT
+        return None
+
+    def is_teacher(self, user_id) -> bool:
+        return self.role_of(user_id) == ROLE_TEACHER
+
+    def is_student(self, user_id) -> bool:
+        return self.role_of(user_id) == ROLE_STUDENT
+
+
+def _load_roster(classroom_id):
+    teacher_id = (
+        Classroom.objects.filter(pk=classroom_id)
+        .values_list("teacher_id", flat=True)
+        .first()
+    )
+    if teacher_id is None:
+        return None
+
+    student_ids = tuple(
+        Classroom.students.through.objects
+        .filter(classroom_id=classroom_id)
+        .order_by("id")
+        .values_list("user_id", flat=True)
+    )
+    return (teacher_id, student_ids)
+
+
+async def _aload_roster(classroom_id):
+    teacher_id = await (
+        Classroom.objects.filter(pk=classroom_id)
+        .values_list("teacher_id", flat=True)
+        .afirst()
+    )
+    if teacher_id is None:
+        return None
+
+    student_ids = tuple([
+        user_id
+        async for user_id in Classroom.students.through.objects
+        .filter(classroom_id=classroom_id)
+        .order_by("id")
+        .values_list("user_id", flat=True)
+    ])
+    return (teacher_id, student_ids)
+
+
+def get_roster(classroom_id, use_local=True):
+    """
+    Возвращает Roster класса или None, если класса не существует.
+    """
+    try:
+        classroom_id = int(classroom_id)
+    except (TypeError, ValueError):
+        return None
+
+    data = roster_cache.get(classroom_id, lambda: _load_roster(classroom_id), use_local=use_local)
+    if data is None:
+        return None
+    teacher_id, student_ids = data
+    return Roster(classroom_id=classroom_id, teacher_id=teacher_id, student_ids=student_ids)
+
+
+def get_role(classroom_id, user_id):
+    """
+    Возвращает роль пользователя в классе: "teacher", "student" или None.
+    """
+    if user_id is None:
+        return None
+
+    roster = get_roster(classroom_id)
+    role = roster.role_of(user_id) if roster else None
+    if role is None:
+        roster = get_roster(classroom_id, use_local=False)
+        role = roster.role_of(user_id) if roster else None
+    return role
+
+
+def is_member(classroom_id, user_id) -> bool:
+    return get_role(classroom_id, user_id) is not None
+
+
+_inflight = {}
+
+
+async def aget_roster(classroom_id, use_local=True):
+    """
+    Асинхронная версия get_roster на async ORM.
+
+    Одновременные промахи по одному классу в одном event loop (весь класс
+    подключается в начале урока) разделяют одну загрузку.
+    """
+    try:
+        classroom_id = int(classroom_id)
+    except (TypeError, ValueError):
+        return None
+
+    if use_local:
+        data = roster_cache.get_local(classroom_id)
+        if data is not None:
+            return Roster(classroom_id, *data)
+
+    key = (id(asyncio.get_running_loop()), classroom_id, use_local)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            roster_cache.aget(classroom_id, lambda: _aload_roster(classroom_id), use_local=use_local)
+        )
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    data = await asyncio.shield(task)
+    if data is None:
+        return None
+    teacher_id, student_ids = data
+    return Roster(classroom_id=classroom_id, teacher_id=teacher_id, student_ids=student_ids)
+
+
+async def aget_role(classroom_id, user_id):
+    """
+    Асинхронная версия get_role: при попадании в локальный кеш
+    не покидает event loop.
+    """
+    if user_id is None:
+        return None
+
+    roster = await aget_roster(classroom_id)
+    role = roster.role_of(user_id) if roster else None
+    if role is None:
+        roster = await aget_roster(classroom_id, use_local=False)
+        role = roster.role_of(user_id) if roster else None
+    return role
+
+
+def invalidate_roster(classroom_id):
+    roster_cache.delete(int(classroom_id))
@@ -0,0 +1,105 @@
+"""
+Статистика выполнения заданий класса.
+
+Снимки раздела и задания читаются одним запросом из сводки ответов
+AnswerSummary, которую поддерживают сами модели ответов.
+Изменения отдельных ответов (сохранение, проверка, сброс) отправляются
+учителю готовыми строками статистики через WebSocket — панель не опрашивает сервер.
+"""
+from django.db import transaction
+
+from classroom.models import AnswerSummary
+from classroom.services.event_log import publish_event_sync
+from classroom.utils.json_codec import encode_frame
+
+
+def success_percentage(correct, wrong, total):
+    return min(round((correct / (total + wrong)) * 100) if total + wrong > 0 else 0, 100)
+
+
+def build_statistics_row(user, correct, wrong, total):
+    return {
+        "user": {"id": user.id, "username": user.display_name},
+        "correct_answers": correct,
+        "wrong_answers": wrong,
+        "success_percentage": success_percentage(correct, wrong, total),
+    }
+
+
+def get_section_statistics(classroom, section):
+    """
+    Возвращает список {"id", "task_type", "statistics": [...]} по всем заданиям раздела.
+    """
+    students = list(classroom.students.all())
+    tasks = list(section.tasks.all())
+
+    aggregated = {
+        (task_id, user_id): counters
+        for task_id, user_id, *counters in AnswerSummary.objects.filter(
+            classroom=classroom, task__section=section,
+        ).values_list("task_id", "user_id", "correct_answers", "wrong_answers", "total_answers")
+    }
+
+    tasks_data = []
+    for task in tasks:
+        task_stats = [
+            build_statistics_row(student, *aggregated.get((task.id, student.id), (0, 0, 0)))
+            for student in students
+        ]
+        task_stats.sort(key=lambda x: x["success_percentage"], reverse=True)
+        tasks_data.append({"id": task.id, "task_type": task.task_type, "statistics": task_stats})
+
+    return tasks_data
+
+
+def get_task_statistics(classroom, task):
+    """
+    Возвращает строки статистики задания по всем ученикам класса.
+    """
+    aggregated = {
+        user_id: counters
+        for user_id, *counters in AnswerSummary.objects.filter(classroom=classroom, task=task).values_list(
+            "user_id", "correct_answers", "wrong_answers", "total_answers",
+        )
+    }
+    statistics = [
+        build_statistics_row(student, *aggregated.get(student.id, (0, 0, 0)))
+        for student in classroom.students.all()
+    ]
+    statistics.sort(key=lambda x: x["success_percentage"], reverse=True)
+    return statistics
+
+
+def notify_statistics_changed(classroom, task, entries):
+    """
+    Отправляет учителю класса новые строки статистики задания.
+
+    entries — пары (user, answer) изменённых ответов. Строки считаются сразу
+    из уже сохранённых счётчиков ответа, а отправляются после commit транзакции.
+    Значения абсолютные, поэтому повторная или запоздалая доставка не портит панель.
+    """
+    rows = []
+    for user, answer in entries:
+        if answer is None or user.id == classroom.teacher_id:
+            continue
+        row = build_statistics_row(user, answer.correct_answers, answer.wrong_answers, answer.total_answers)
+        row["task_id"] = task.id
+        rows.append(row)
+
+    if not rows:
+        return
+
+    classroom_id = classroom.id
+    frame = encode_frame("statistics:update", {
+        "section_id": task.section_id,
+        "student_id": "all",
+        "rows": rows,
+    })
+
+    def send():
+        publish_event_sync(
+            f"classroom_{classroom_id}_teacher",
+            {"type": "statistics_event", "frame": frame},
+        )
+
+    transaction.on_commit(send)
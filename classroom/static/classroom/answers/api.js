@@ -1,8 +1,10 @@
-import { showNotification, postJSON, getLessonId } from "js/tasks/utils.js";
+import { showNotification, postJSON, getLessonId, getIsTeacher } from "js/tasks/utils.js";
 import { eventBus } from "js/tasks/events/eventBus.js";
 import { ANSWER_HANDLER_MAP, getTaskTypeFromContainer } from "classroom/answers/utils.js";
 import { getClassroomId, getViewedUserId } from 'classroom/utils.js'
 import { handleAnswer } from "classroom/answers/handleAnswer.js"
+import { requestWS } from "classroom/websocket/sendMessage.js";
+import { getBundledSectionAnswers, storeBundledAnswer } from "classroom/answers/bundle.js";
 
 const moduleCache = new Map();
 
@@ -54,7 +56,11 @@ export async function loadAnswerModule(taskType) {
 
 /**
  * Отправляет ответ пользователя на сервер и обновляет отображение задания.
- * При успешной отправке генерирует событие "answer:sent" с taskId.
+ *
+ * Основной путь — действие answer:save по WebSocket: сервер сохраняет ответ,
+ * возвращает результат и сам рассылает answer:sent с данными ответа.
+ * Если соединение недоступно, ответ сохраняется через HTTP и генерируется
+ * событие "answer:sent" с taskId.
  *
  * @param {Object} params
  * @param {number|string} params.taskId - ID задания
@@ -84,9 +90,28 @@ export async function sendAnswer({ taskId, data }) {
     };
 
     try {
+        const wsResult = await requestWS("answer:save", {
+            task_id: taskId,
+            student_id: viewedUserId,
+            data
+        });
+
+        if (wsResult) {
+            if (wsResult.success) {
+                storeBundledAnswer(viewedUserId, taskId, wsResult.answer);
+                await handleAnswer({
+                    answer: wsResult.answer,
+                    task_id: taskId,
+                    task_type: wsResult.task_type
+                });
+            }
+            return wsResult;
+        }
+
         const result = await postJSON(url, payload);
 
         if (result?.success && result.answer) {
+            storeBundledAnswer(viewedUserId, taskId, result.answer);
             const taskType = getTaskTypeFromContainer(taskId);
 
             const answerData = {
@@ -108,6 +133,10 @@ export async function sendAnswer({ taskId, data }) {
     }
 }
 
+/**
+ * Получает ответы просматриваемого ученика на задания раздела.
+ * Учитель получает их из общего кеша ответов всех учеников (bundle.js).
+ */
 export async function fetchSectionAnswers(sectionId) {
     const classroomId = getClassroomId();
     const userId = getViewedUserId();
@@ -115,6 +144,10 @@ export async function fetchSectionAnswers(sectionId) {
     if (userId === "all") {
         return;
     }
+
+    if (getIsTeacher()) {
+        return getBundledSectionAnswers(sectionId, userId);
+    }
     const url = `/classroom/get-section-answers/?section_id=${sectionId}&classroom_id=${classroomId}&user_id=${userId}`;
     const response = await fetch(url);
 
@@ -0,0 +1,134 @@
+import { getClassroomId } from "classroom/utils.js";
+
+/**
+ * Ответы всех учеников текущего раздела для панели учителя.
+ * Загружаются одним запросом, дальше переключение ученика берёт
+ * ответы из памяти, а события answer:sent / answer:reset поддерживают
+ * кеш в актуальном состоянии.
+ *
+ * @type {{sectionId: string, tasks: Array<{task_id: string, task_type: string}>, answers: Object}|null}
+ */
+let bundle = null;
+let pending = null;
+
+/**
+ * Загружает ответы раздела всех учеников, если кеш относится к другому разделу.
+ *
+ * @param {string|number} sectionId
+ * @returns {Promise<Object>}
+ */
+async function loadBundle(sectionId) {
+    sectionId = String(sectionId);
+    if (bundle?.sectionId === sectionId) return bundle;
+    if (pending?.sectionId === sectionId) return pending.promise;
+
+    const classroomId = getClassroomId();
+    const promise = fetch(`/classroom/${classroomId}/section/${sectionId}/answers/`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (pending?.promise === promise) {
+                bundle = { sectionId, tasks: data.tasks || [], answers: data.answers || {} };
+                pending = null;
+            }
+            return bundle;
+        })
+        .catch(err => {
+            if (pending?.promise === promise) pending = null;
+            throw err;
+        });
+
+    pending = { sectionId, promise };
+    return promise;
+}
+
+/**
+ * Возвращает ответы ученика на задания раздела в формате get-section-answers.
+ *
+ * @param {string|number} sectionId
+ * @param {string|number} userId
+ * @returns {Promise<{section_id: string, answers: Array}>}
+ */
+export async function getBundledSectionAnswers(sectionId, userId) {
+    const data = await loadBundle(sectionId);
+    const userAnswers = data.answers[String(userId)] || {};
+
+    return {
+        section_id: data.sectionId,
+        answers: data.tasks.map(task => ({
+            task_id: task.task_id,
+            task_type: task.task_type,
+            answer: userAnswers[task.task_id] ?? null
+        }))
+    };
+}
+
+/**
+ * Сохраняет в кеш новый ответ ученика.
+ *
+ * @param {string|number} userId
+ * @param {string|number} taskId
+ * @param {any} answer
+ */
+export function storeBundledAnswer(userId, taskId, answer) {
+    if (!bundle) return;
+    const key = String(userId);
+    bundle.answers[key] = bundle.answers[key] || {};
+    bundle.answers[key][String(taskId)] = answer;
+}
+
+/**
+ * Удаляет из кеша ответ ученика; userId "all" — ответы всех учеников.
+ *
+ * @param {string|number} userId
+ * @param {string|number} taskId
+ */
+export function resetBundledAnswer(userId, taskId) {
+    if (!bundle) return;
+    const users = String(userId) === "all" ? Object.keys(bundle.answers) : [String(userId)];
+    for (const key of users) {
+        delete bundle.answers[key]?.[String(taskId)];
+    }
+}
+
+/**
+ * Сбрасывает кеш: следующий запрос ответов загрузит раздел заново.
+ */
+export function invalidateBundle() {
+    bundle = null;
+    pending = null;
+}
+
+/**
+ * Обновляет кеш по событию WebSocket независимо от просматриваемого ученика.
+ *
+ * @param {string} type
+ * @param {Object} data
+ */
+export function trackBundleEvent(type, data) {
+    switch (type) {
+        case "answer:sent":
+            if (!data?.task_id || !data?.student_id) return;
+            if (data.payload?.answer !== undefined) {
+                storeBundledAnswer(data.student_id, data.task_id, data.payload.answer);
+            } else {
+                invalidateBundle();
+            }
+            break;
+
+        case "answer:reset":
+            if (!data?.task_id || !data?.student_id) return;
+            resetBundledAnswer(data.student_id, data.task_id);
+            break;
+
+        case "section:change":
+        case "section_list:change":
+        case "lesson:attached":
+            invalidateBundle();
+            break;
+    }
+}
@@ -8,7 +8,6 @@ import { clearAllTaskContainers } from "classroom/answers/handlers/clearAnswers.
 import { clearStatistics, loadSectionStatistics } from "classroom/answers/handlers/statistics.js";
 import { disableCopying, enableCopying } from "classroom/copyingMode.js";
 
-let statsInterval = null;
 let classroomInviteModalInstance = null;
 
 function ensureClassroomInviteModal() {
@@ -196,17 +195,11 @@ async function selectStudent(studentId, isInitial = false) {
 
     if (isInitial) return;
 
-    if (statsInterval) {
-        clearInterval(statsInterval);
-        statsInterval = null;
-    }
-
     await clearAllTaskContainers();
     clearStatistics();
 
     if (studentId === "all") {
         loadSectionStatistics();
-        statsInterval = setInterval(loadSectionStatistics, 5000);
     } else {
         try {
             handleSectionAnswers();
@@ -376,6 +369,16 @@ export function markUserOffline(userId) {
     }
 }
 
+/**
+ * Сбрасывает индикаторы присутствия всех учеников.
+ * Используется перед применением снимка users:online.
+ */
+export function markAllUsersOffline() {
+    document.querySelectorAll(".student-option[data-student-id]").forEach(option => {
+        markUserOffline(option.dataset.studentId);
+    });
+}
+
 function safeInvoke(fn, message) {
     try {
         fn();
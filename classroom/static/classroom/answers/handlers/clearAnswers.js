@@ -2,6 +2,7 @@ import { showNotification, getCsrfToken } from "js/tasks/utils.js";
 import { loadAnswerModule } from "classroom/answers/api.js";
 import { getViewedUserId, getClassroomId } from "classroom/utils.js";
 import { clearStatistics } from "classroom/answers/handlers/statistics.js"
+import { resetBundledAnswer } from "classroom/answers/bundle.js";
 
 /**
  * Очищает UI задания по taskId
@@ -54,6 +55,7 @@ export async function clearTask(taskId) {
             throw new Error(`HTTP ${response.status}`);
         }
 
+        resetBundledAnswer(userId, taskId);
         await clearTaskContainer(taskId);
     } catch (err) {
         console.error(`clearTask error (taskId=${taskId}):`, err);
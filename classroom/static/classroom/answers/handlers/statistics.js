@@ -1,6 +1,12 @@
 import { showNotification, getSectionId } from 'js/tasks/utils.js';
 import { ANSWER_HANDLER_MAP } from 'classroom/answers/utils.js';
-import { getClassroomId } from 'classroom/utils.js'
+import { getClassroomId, getViewedUserId } from 'classroom/utils.js'
+
+/**
+ * Статистика текущего раздела: taskId -> Map(userId -> строка статистики).
+ * Заполняется снимком loadSectionStatistics и обновляется кадрами statistics:update.
+ */
+let sectionStats = { sectionId: null, tasks: new Map() };
 
 /**
  * Отображает статистику по заданию
@@ -137,7 +143,12 @@ export async function loadSectionStatistics() {
         const data = await response.json();
         if (!data.tasks) return;
 
+        sectionStats = { sectionId: String(sectionId), tasks: new Map() };
         data.tasks.forEach(task => {
+            sectionStats.tasks.set(
+                String(task.id),
+                new Map(task.statistics.map(row => [String(row.user.id), row]))
+            );
             showStatistics(task.id, task.statistics);
         });
     } catch (error) {
@@ -146,6 +157,37 @@ export async function loadSectionStatistics() {
     }
 }
 
+/**
+ * Применяет push-обновление статистики раздела от сервера.
+ * Строки содержат абсолютные значения, поэтому повторное применение безопасно.
+ *
+ * @param {{section_id: number|string, rows: Array<Object>}} data
+ */
+export function applyStatisticsUpdate(data) {
+    if (!data?.rows || getViewedUserId() !== "all") return;
+    if (String(data.section_id) !== String(getSectionId())) return;
+    if (sectionStats.sectionId !== String(data.section_id)) return;
+
+    const changedTasks = new Set();
+    data.rows.forEach(row => {
+        const taskId = String(row.task_id);
+        if (!sectionStats.tasks.has(taskId)) {
+            sectionStats.tasks.set(taskId, new Map());
+        }
+        sectionStats.tasks.get(taskId).set(String(row.user.id), row);
+        changedTasks.add(taskId);
+    });
+
+    changedTasks.forEach(taskId => {
+        const rows = [...sectionStats.tasks.get(taskId).values()];
+        if (!rows.some(s => (s.correct_answers || 0) + (s.wrong_answers || 0) > 0)) {
+            document.querySelector(`[data-task-id="${taskId}"] .horizontal-cards-container`)?.remove();
+            return;
+        }
+        showStatistics(taskId, rows);
+    });
+}
+
 /**
  * Загружает статистику одного задания
  * @param {number|string} taskId
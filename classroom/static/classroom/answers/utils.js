@@ -2,6 +2,7 @@ import { showNotification, postJSON } from "js/tasks/utils.js";
 import { eventBus } from "js/tasks/events/eventBus.js";
 import { handleAnswer } from "classroom/answers/handleAnswer.js";
 import { loadAnswerModule, fetchTaskAnswer } from "classroom/answers/api.js";
+import { storeBundledAnswer } from "classroom/answers/bundle.js";
 import { getClassroomId, getViewedUserId } from 'classroom/utils.js'
 
 export const ANSWER_HANDLER_MAP = {
@@ -135,6 +136,7 @@ export async function initCheckButton(task, container) {
             if (typeof handleAnswer === "function") {
                 const taskId = task.task_id;
                 const data = await fetchTaskAnswer(taskId);
+                storeBundledAnswer(userId, taskId, data.answer);
                 handleAnswer(data, container);
 
                 eventBus.emit("answer:sent", { taskId });
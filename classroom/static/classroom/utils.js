@@ -113,6 +113,26 @@ export async function refreshSections() {
     return sections[0].id;
 }
 
+/**
+ * Отрисовывает урок из снимка события lesson:attached без запросов
+ * текущего урока, разделов и заданий первого раздела.
+ *
+ * @param {{lesson_id: number, sections: Array, section_id: number, tasks: Array|null}} snapshot
+ */
+export async function applyLessonSnapshot(snapshot) {
+    const infoEl = getInfoElement();
+    if (!infoEl || !snapshot?.sections?.length) {
+        await refreshClassroom();
+        return;
+    }
+
+    infoEl.dataset.lessonId = snapshot.lesson_id;
+    delete infoEl.dataset.sectionId;
+
+    await renderSectionsList(snapshot.sections);
+    await selectSection(snapshot.section_id, snapshot.tasks);
+}
+
 export async function refreshClassroom() {
     const infoEl = getInfoElement();
     const classroomId = getClassroomId();
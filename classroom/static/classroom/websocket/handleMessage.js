@@ -3,43 +3,285 @@
 import { showNotification, getIsTeacher, getLessonId, getSectionId, fetchSingleTask } from "js/tasks/utils.js";
 import { loadSectionTasks } from "js/tasks/display/showTasks.js";
 import { selectSection } from "js/tasks/display/renderSections.js";
-import { getViewedUserId, scrollToTask, highlightTaskRed, refreshSections, refreshClassroom } from 'classroom/utils.js';
+import { getViewedUserId, scrollToTask, highlightTaskRed, refreshSections, refreshClassroom, applyLessonSnapshot } from 'classroom/utils.js';
 import { fetchTaskAnswer } from "classroom/answers/api.js";
 import { processTaskAnswer } from "classroom/answers/utils.js";
-import { clearTask } from "classroom/answers/handlers/clearAnswers.js"
-import { markUserOnline, markUserOffline } from "classroom/answers/classroomPanel.js";
+import { clearTaskContainer } from "classroom/answers/handlers/clearAnswers.js"
+import { applyStatisticsUpdate } from "classroom/answers/handlers/statistics.js";
+import { markUserOnline, markUserOffline, markAllUsersOffline } from "classroom/answers/classroomPanel.js";
 import { createBubbleNode, refreshChat, pointNewMessage } from "classroom/integrations/chat.js"
 import { enableCopying, disableCopying } from "classroom/copyingMode.js";
-import { sendWS } from "classroom/websocket/sendMessage.js";
+import { sendWS, requestWS, resolveWSRequest, failWSRequest } from "classroom/websocket/sendMessage.js";
+import { handleAnswer } from "classroom/answers/handleAnswer.js";
+import { setPingInterval } from "classroom/websocket/init.js";
+import { decodeMsgpack } from "classroom/websocket/msgpack.js";
+import { trackBundleEvent } from "classroom/answers/bundle.js";
+
+/**
+ * Учёт событий по потокам (stream — группа-получатель на сервере). Для
+ * каждого потока lastSeq — граница, до которой все события учтены,
+ * а seen — события выше границы, уже применённые вне очереди. Соединение
+ * получает все события своих потоков, поэтому дыра в номерах — потерянный
+ * кадр. Пока идёт resume, живые события с seq откладываются, чтобы
+ * применить их после пропущенных.
+ *
+ * @type {Map<string, {lastSeq: number, seen: Set<number>}>}
+ */
+let streams = new Map();
+let resuming = false;
+let deferredDuringResume = [];
+let gapTimer = null;
+
+/**
+ * Сколько ждать опоздавшие кадры, прежде чем запросить пропуск через resume:
+ * кадры полосы control и seq:skip могут прийти позже соседних.
+ */
+const GAP_RESUME_DELAY_MS = 500;
 
 /**
  * Обрабатывает входящее сообщение WebSocket.
  *
- * Ожидает JSON вида { type, data }.
+ * Ожидает JSON вида { type, data } или пачку { type: "batch", data: [...] };
+ * бинарные сообщения (подпротокол classroom.msgpack) — MessagePack той же структуры.
  *
  * @param {MessageEvent} ev
  */
 export async function handleWSMessage(ev) {
     let msg;
     try {
-        msg = JSON.parse(ev.data);
+        msg = typeof ev.data === "string" ? JSON.parse(ev.data) : decodeMsgpack(ev.data);
     } catch {
         return;
     }
 
-    const { type, data } = msg;
+    if (msg?.type === "batch") {
+        if (!Array.isArray(msg.data)) return;
+        for (const item of msg.data) {
+            await handleFrame(item);
+        }
+        return;
+    }
+
+    await handleFrame(msg);
+}
+
+/**
+ * Пропускает кадр через учёт seq: повторы отбрасываются,
+ * во время resume события откладываются.
+ *
+ * @param {{type: string, data: any, seq?: number, stream?: string}} msg
+ */
+async function handleFrame(msg) {
+    if (typeof msg?.seq === "number") {
+        if (resuming) {
+            deferredDuringResume.push(msg);
+            return;
+        }
+        if (!acceptSeq(msg.stream, msg.seq)) return;
+    }
+    await dispatchMessage(msg);
+}
+
+/**
+ * Отмечает событие потока применённым. Возвращает false для уже учтённого seq.
+ * Кадр с номером выше границы применяется сразу, а дыра перед ним
+ * закрывается опоздавшими кадрами или запросом resume.
+ *
+ * @param {string} stream
+ * @param {number} seq
+ * @returns {boolean}
+ */
+function acceptSeq(stream, seq) {
+    const state = streams.get(stream);
+    if (!state) {
+        streams.set(stream, { lastSeq: seq, seen: new Set() });
+        return true;
+    }
+    if (seq <= state.lastSeq || state.seen.has(seq)) return false;
+
+    state.seen.add(seq);
+    advanceSeq(state, state.lastSeq);
+    if (state.seen.size) scheduleGapResume();
+    return true;
+}
+
+/**
+ * Поднимает границу потока до seq и дальше по непрерывно применённым событиям.
+ *
+ * @param {{lastSeq: number, seen: Set<number>}} state
+ * @param {number} seq
+ */
+function advanceSeq(state, seq) {
+    if (seq > state.lastSeq) state.lastSeq = seq;
+    for (const seen of state.seen) {
+        if (seen <= state.lastSeq) state.seen.delete(seen);
+    }
+    while (state.seen.delete(state.lastSeq + 1)) {
+        state.lastSeq += 1;
+    }
+}
+
+function hasGaps() {
+    for (const state of streams.values()) {
+        if (state.seen.size) return true;
+    }
+    return false;
+}
+
+function scheduleGapResume() {
+    if (gapTimer !== null) return;
+    gapTimer = setTimeout(async () => {
+        gapTimer = null;
+        if (resuming || !hasGaps()) return;
+        try {
+            if (!(await resumeStream())) {
+                await refreshClassroom();
+            }
+        } catch (e) {
+            console.error("Failed to resume event stream", e);
+        }
+    }, GAP_RESUME_DELAY_MS);
+}
+
+/**
+ * Начинает учёт потоков с текущих seq сервера.
+ *
+ * @param {Object<string, number>|undefined} seqs
+ * @param {boolean} replace - забыть уже известные потоки
+ */
+function resetStreams(seqs, replace) {
+    if (replace) streams = new Map();
+    for (const [stream, seq] of Object.entries(seqs || {})) {
+        if (typeof seq === "number" && !streams.has(stream)) {
+            streams.set(stream, { lastSeq: seq, seen: new Set() });
+        }
+    }
+}
+
+/**
+ * Запрашивает у сервера события, пропущенные с границ потоков: после
+ * разрыва соединения или при дыре в номерах. Возвращает false, если пропуск
+ * восстановить нельзя и нужна полная перезагрузка.
+ *
+ * @returns {Promise<boolean>}
+ */
+export async function resumeStream() {
+    if (!streams.size || resuming) return false;
+
+    const lastSeqs = {};
+    for (const [stream, state] of streams) {
+        lastSeqs[stream] = state.lastSeq;
+    }
+
+    resuming = true;
+    let result = null;
+    try {
+        result = await requestWS("resume", { last_seq: lastSeqs });
+    } finally {
+        resuming = false;
+    }
+
+    const deferred = deferredDuringResume;
+    deferredDuringResume = [];
+
+    if (!result?.complete) {
+        resetStreams(result?.seq, true);
+        deferred.forEach(msg => {
+            const state = streams.get(msg.stream);
+            if (!state) {
+                streams.set(msg.stream, { lastSeq: msg.seq, seen: new Set() });
+            } else if (msg.seq > state.lastSeq) {
+                state.lastSeq = msg.seq;
+            }
+        });
+        return false;
+    }
+
+    for (const msg of result.events || []) {
+        if (acceptSeq(msg.stream, msg.seq)) {
+            await dispatchMessage(msg);
+        }
+    }
+    // Всё до result.seq сервер уже отдал, отфильтровав как при живой доставке
+    for (const [stream, seq] of Object.entries(result.seq || {})) {
+        const state = streams.get(stream);
+        if (state) advanceSeq(state, seq);
+    }
+
+    for (const msg of deferred) {
+        if (acceptSeq(msg.stream, msg.seq)) {
+            await dispatchMessage(msg);
+        }
+    }
+    return true;
+}
+
+/**
+ * Применяет одно сообщение { type, data }.
+ *
+ * @param {{type: string, data: any}} msg
+ */
+async function dispatchMessage(msg) {
+    const { type, data } = msg || {};
     if (!type) return;
+
+    if (type === "answer:saved" || type === "resume:result") {
+        resolveWSRequest(data);
+        return;
+    }
+
+    if (type === "rate_limited") {
+        if (data?.request_id) {
+            failWSRequest(data.request_id);
+        } else {
+            console.warn(`Действие ${data?.action} отклонено по лимиту, повтор через ${data?.retry_after_ms} мс`);
+        }
+        return;
+    }
+
+    if (type === "connected") {
+        resetStreams(data?.seq, false);
+        setPingInterval(data?.ping_interval);
+        return;
+    }
+
+    if (type === "seq:skip") {
+        // Сервер схлопнул, отбросил или отфильтровал эти события
+        for (const [stream, seqs] of Object.entries(data || {})) {
+            if (Array.isArray(seqs)) seqs.forEach(seq => acceptSeq(stream, seq));
+        }
+        return;
+    }
+
+    if (type === "ping") {
+        sendWS("pong", {});
+        return;
+    }
+
+    if (getIsTeacher()) {
+        trackBundleEvent(type, data);
+    }
+
     if (!shouldProcessMessage(data) && !["users:online", "user:online:event", "user:offline:event", "chat:send_message", "chat:update", "lesson:attached"].includes(type)) return;
 
     switch(type) {
         case "answer:sent":
             if (!data?.task_id) return;
-            await processTaskAnswer(data.task_id);
+            if (data.payload?.answer !== undefined && data.payload?.task_type) {
+                await handleAnswer({
+                    task_id: data.task_id,
+                    task_type: data.payload.task_type,
+                    answer: data.payload.answer
+                });
+            } else {
+                await processTaskAnswer(data.task_id);
+            }
             break;
 
         case "answer:reset":
+            // Ответы уже сброшены на сервере отправителем события
             if (!data?.task_id) return;
-            await clearTask(data.task_id);
+            await clearTaskContainer(data.task_id);
             break;
 
         case "section_list:change":
@@ -72,6 +314,7 @@ export async function handleWSMessage(ev) {
 
 
         case "users:online":
+            markAllUsersOffline();
             data.forEach(student => {
                 handleUserStatusMessage(student.student_id, student.online);
             });
@@ -102,7 +345,15 @@ export async function handleWSMessage(ev) {
             break;
 
         case "lesson:attached":
-            refreshClassroom();
+            if (data?.payload?.snapshot) {
+                applyLessonSnapshot(data.payload.snapshot);
+            } else {
+                refreshClassroom();
+            }
+            break;
+
+        case "statistics:update":
+            applyStatisticsUpdate(data);
             break;
 
     }
@@ -2,8 +2,9 @@
 
 import { showNotification, getCurrentUserId } from "js/tasks/utils.js";
 import { getClassroomId, refreshClassroom } from 'classroom/utils.js'
-import { handleWSMessage } from "classroom/websocket/handleMessage.js";
+import { handleWSMessage, resumeStream } from "classroom/websocket/handleMessage.js";
 import { eventBus } from "js/tasks/events/eventBus.js";
+import { MSGPACK_SUBPROTOCOL } from "classroom/websocket/msgpack.js";
 
 export let virtualClassWS = null;
 
@@ -13,6 +14,29 @@ let baseReconnectDelay = 1000;
 
 let hasEverConnected = false;
 
+/**
+ * Сторожевой таймер тишины: сервер шлёт ping раз в ping_interval секунд.
+ * Если за 2.5 интервала не пришло ни одного кадра, соединение считается
+ * полуоткрытым и закрывается, чтобы сработало переподключение.
+ */
+let silenceLimitMs = 75000;
+let silenceTimer = null;
+
+export function setPingInterval(seconds) {
+    if (!seconds) return;
+    silenceLimitMs = seconds * 2500;
+    armSilenceWatchdog();
+}
+
+function armSilenceWatchdog() {
+    clearTimeout(silenceTimer);
+    const ws = virtualClassWS;
+    if (!ws) return;
+    silenceTimer = setTimeout(() => {
+        if (virtualClassWS === ws) ws.close();
+    }, silenceLimitMs);
+}
+
 /**
  * Инициализирует WebSocket для виртуального класса и настраивает обработчики.
  */
@@ -26,17 +50,24 @@ export function initVirtualClassWebSocket() {
     }
 
     const proto = location.protocol === "https:" ? "wss" : "ws";
+    // Предлагаем бинарный подпротокол; сервер без него ответит обычным JSON
     virtualClassWS = new WebSocket(
-        `${proto}://${location.host}/ws/virtual-class/${classroomId}/`
+        `${proto}://${location.host}/ws/virtual-class/${classroomId}/`,
+        [MSGPACK_SUBPROTOCOL]
     );
+    virtualClassWS.binaryType = "arraybuffer";
 
     virtualClassWS.onopen = async () => {
         console.log("WS connected");
         reconnectDelay = baseReconnectDelay;
+        armSilenceWatchdog();
 
         if (hasEverConnected) {
             try {
-                await refreshClassroom();
+                const resumed = await resumeStream();
+                if (!resumed) {
+                    await refreshClassroom();
+                }
                 showNotification("Соединение восстановлено");
             } catch (e) {
                 console.error("Failed to restore data after reconnect", e);
@@ -49,6 +80,7 @@ export function initVirtualClassWebSocket() {
 
     virtualClassWS.onclose = () => {
         virtualClassWS = null;
+        clearTimeout(silenceTimer);
 
         const jitter = Math.random() * 1000;
         const delayWithJitter = reconnectDelay + jitter;
@@ -61,5 +93,8 @@ export function initVirtualClassWebSocket() {
         console.error("WS error", e);
     };
 
-    virtualClassWS.onmessage = handleWSMessage;
+    virtualClassWS.onmessage = (ev) => {
+        armSilenceWatchdog();
+        return handleWSMessage(ev);
+    };
 }
\ No newline at end of file
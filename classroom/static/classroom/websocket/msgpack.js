@@ -0,0 +1,113 @@
+"use strict";
+
+/**
+ * Подпротокол бинарных кадров виртуального класса.
+ * Сервер отвечает кадрами MessagePack той же структуры { type, data },
+ * что и JSON-кадры; клиент по-прежнему отправляет JSON-текст.
+ */
+export const MSGPACK_SUBPROTOCOL = "classroom.msgpack";
+
+const textDecoder = new TextDecoder();
+
+/**
+ * Декодирует одно сообщение MessagePack.
+ *
+ * @param {ArrayBuffer|Uint8Array} buffer
+ * @returns {any}
+ */
+export function decodeMsgpack(buffer) {
+    const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    const reader = {
+        bytes,
+        view: new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength),
+        pos: 0,
+    };
+    const value = readValue(reader);
+    if (reader.pos !== bytes.length) {
+        throw new Error("msgpack: trailing bytes");
+    }
+    return value;
+}
+
+function readValue(r) {
+    const byte = r.bytes[r.pos++];
+    if (byte === undefined) throw new Error("msgpack: unexpected end");
+
+    if (byte <= 0x7f) return byte;
+    if (byte <= 0x8f) return readMap(r, byte & 0x0f);
+    if (byte <= 0x9f) return readArray(r, byte & 0x0f);
+    if (byte <= 0xbf) return readString(r, byte & 0x1f);
+    if (byte >= 0xe0) return byte - 0x100;
+
+    const view = r.view;
+    let value;
+    switch (byte) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: return readBinary(r, readLength(r, 1));
+        case 0xc5: return readBinary(r, readLength(r, 2));
+        case 0xc6: return readBinary(r, readLength(r, 4));
+        case 0xca: value = view.getFloat32(r.pos); r.pos += 4; return value;
+        case 0xcb: value = view.getFloat64(r.pos); r.pos += 8; return value;
+        case 0xcc: value = view.getUint8(r.pos); r.pos += 1; return value;
+        case 0xcd: value = view.getUint16(r.pos); r.pos += 2; return value;
+        case 0xce: value = view.getUint32(r.pos); r.pos += 4; return value;
+        case 0xcf: value = Number(view.getBigUint64(r.pos)); r.pos += 8; return value;
+        case 0xd0: value = view.getInt8(r.pos); r.pos += 1; return value;
+        case 0xd1: value = view.getInt16(r.pos); r.pos += 2; return value;
+        case 0xd2: value = view.getInt32(r.pos); r.pos += 4; return value;
+        case 0xd3: value = Number(view.getBigInt64(r.pos)); r.pos += 8; return value;
+        case 0xd9: return readString(r, readLength(r, 1));
+        case 0xda: return readString(r, readLength(r, 2));
+        case 0xdb: return readString(r, readLength(r, 4));
+        case 0xdc: return readArray(r, readLength(r, 2));
+        case 0xdd: return readArray(r, readLength(r, 4));
+        case 0xde: return readMap(r, readLength(r, 2));
+        case 0xdf: return readMap(r, readLength(r, 4));
+        default:
+            throw new Error(`msgpack: unsupported type 0x${byte.toString(16)}`);
+    }
+}
+
+function readLength(r, size) {
+    const view = r.view;
+    const length = size === 1 ? view.getUint8(r.pos) : size === 2 ? view.getUint16(r.pos) : view.getUint32(r.pos);
+    r.pos += size;
+    return length;
+}
+
+function readString(r, length) {
+    const value = textDecoder.decode(r.bytes.subarray(r.pos, r.pos + length));
+    r.pos += length;
+    return value;
+}
+
+function readBinary(r, length) {
+    const value = r.bytes.slice(r.pos, r.pos + length);
+    r.pos += length;
+    return value;
+}
+
+function readArray(r, length) {
+    const value = new Array(length);
+    for (let i = 0; i < length; i++) {
+        value[i] = readValue(r);
+    }
+    return value;
+}
+
+function readMap(r, length) {
+    const value = {};
+    for (let i = 0; i < length; i++) {
+        const key = readValue(r);
+        const item = readValue(r);
+        if (key === "__proto__") {
+            // Как JSON.parse: собственное свойство, а не подмена прототипа
+            Object.defineProperty(value, key, { value: item, enumerable: true, configurable: true, writable: true });
+        } else {
+            value[key] = item;
+        }
+    }
+    return value;
+}
@@ -17,6 +17,65 @@ export function sendWS(type, payload) {
     virtualClassWS.send(JSON.stringify({ type, data: payload }));
 }
 
+const pendingRequests = new Map();
+let requestCounter = 0;
+
+/**
+ * Отправляет действие, на которое сервер отвечает кадром с тем же request_id.
+ * Возвращает null, если соединение закрыто или ответ не пришёл за timeoutMs —
+ * вызывающий код в этом случае использует HTTP.
+ *
+ * @param {string} type
+ * @param {Object} payload
+ * @param {number} timeoutMs
+ * @returns {Promise<Object|null>}
+ */
+export function requestWS(type, payload, timeoutMs = 5000) {
+    if (!virtualClassWS || virtualClassWS.readyState !== WebSocket.OPEN) {
+        return Promise.resolve(null);
+    }
+
+    const requestId = `${Date.now()}-${++requestCounter}`;
+    return new Promise((resolve) => {
+        const timer = setTimeout(() => {
+            pendingRequests.delete(requestId);
+            resolve(null);
+        }, timeoutMs);
+
+        pendingRequests.set(requestId, (data) => {
+            clearTimeout(timer);
+            resolve(data);
+        });
+
+        sendWS(type, { ...payload, request_id: requestId });
+    });
+}
+
+/**
+ * Завершает ожидающий requestWS по ответу сервера.
+ *
+ * @param {{request_id: string}} data
+ */
+export function resolveWSRequest(data) {
+    const resolve = pendingRequests.get(data?.request_id);
+    if (!resolve) return;
+    pendingRequests.delete(data.request_id);
+    resolve(data);
+}
+
+/**
+ * Завершает ожидающий requestWS без результата (например, сервер отклонил
+ * действие по лимиту): вызывающий код переходит на HTTP.
+ *
+ * @param {string} requestId
+ */
+export function failWSRequest(requestId) {
+    const resolve = pendingRequests.get(requestId);
+    if (!resolve) return;
+    pendingRequests.delete(requestId);
+    resolve(null);
+}
+
 /**
  * Регистрирует обработчики локальных событий.
  */
@@ -0,0 +1,101 @@
+"""
+Тесты проверки ответов всего класса на задание.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+
+from classroom.answer_keys import get_answer_key
+from classroom.models import AnswerSummary, TrueFalseTaskAnswer
+from classroom.services.answers import check_task_answers, save_user_answer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task, create_true_false_task
+from classroom.views import mark_task_answers_as_checked
+
+User = get_user_model()
+
+ANSWERS = {"answers": [
+    {"statement_index": 0, "selected_value": True},
+    {"statement_index": 1, "selected_value": True},
+]}
+
+
+class CheckTaskAnswersTests(ClassroomTestCase):
+    """
+    Тесты проверки всех ответов одним bulk_update.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = create_true_false_task(self.section)
+        self.factory = RequestFactory()
+
+    def _answer_all(self, students=None):
+        for student in students or self.students:
+            save_user_answer(self.classroom, self.task, student, ANSWERS)
+
+    def _post(self, user, task):
+        request = self.factory.post("/", data=json.dumps({"task_id": task.id}), content_type="application/json")
+        request.user = user
+        return mark_task_answers_as_checked(request, self.classroom.id)
+
+    def test_query_count_does_not_grow_with_students(self):
+        self._answer_all()
+        get_answer_key(self.task)
+        # SAVEPOINT, SELECT ответов, bulk_update, upsert сводки, RELEASE
+        with self.assertNumQueries(5):
+            self.assertEqual(len(check_task_answers(self.classroom, self.task)), 2)
+
+        more = [User.objects.create_user(username=f"extra{i}", password="x") for i in range(4)]
+        self.classroom.students.add(*more)
+        self._answer_all(more)
+        with self.assertNumQueries(5):
+            self.assertEqual(len(check_task_answers(self.classroom, self.task)), 4)
+
+        self.assertEqual(
+            set(TrueFalseTaskAnswer.objects.values_list("correct_answers", "wrong_answers", "is_checked")),
+            {(1, 1, True)},
+        )
+        self.assertEqual(
+            set(AnswerSummary.objects.filter(task=self.task).values_list("correct_answers", "is_checked")),
+            {(1, True)},
+        )
+
+    def test_checked_answers_are_skipped(self):
+        self._answer_all()
+        answer = TrueFalseTaskAnswer.objects.get(user=self.students[0])
+        answer.task = self.task
+        answer.mark_as_checked()
+
+        checked = check_task_answers(self.classroom, self.task)
+        self.assertEqual([a.user_id for a in checked], [self.students[1].id])
+
+    def test_view_sends_one_statistics_update_and_one_event(self):
+        self._answer_all()
+        layer = get_channel_layer()
+        class_channel = async_to_sync(layer.new_channel)()
+        teacher_channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"classroom_{self.classroom.id}", class_channel)
+        async_to_sync(layer.group_add)(f"classroom_{self.classroom.id}_teacher", teacher_channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(self.teacher, self.task)
+        data = json.loads(response.content)
+        self.assertEqual(data["checked"], 2)
+        self.assertTrue(data["answers"][str(self.students[0].id)]["is_checked"])
+
+        statistics = json.loads(async_to_sync(layer.receive)(teacher_channel)["frame"])
+        self.assertEqual(len(statistics["data"]["rows"]), 2)
+        self.assertEqual({row["success_percentage"] for row in statistics["data"]["rows"]}, {33})
+
+        frame = json.loads(async_to_sync(layer.receive)(class_channel)["frame"])
+        self.assertEqual(frame["type"], "answer:sent")
+        self.assertEqual(frame["data"]["student_id"], "all")
+        self.assertEqual(frame["data"]["task_id"], self.task.id)
+
+    def test_rejects_unsupported_task_and_students(self):
+        fill_gaps = create_fill_gaps_task(self.section)
+        self.assertEqual(self._post(self.teacher, fill_gaps).status_code, 400)
+        self.assertEqual(self._post(self.students[0], self.task).status_code, 403)
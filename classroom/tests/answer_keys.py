@@ -0,0 +1,118 @@
+"""
+Тесты скомпилированных ключей ответов заданий.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase
+
+from classroom.answer_keys import compile_answer_key, get_answer_key
+from classroom.models import FillGapsTaskAnswer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task
+from courses.models import FillGapsTask, MatchCardsTask, Task, TestTask, TextInputTask
+from courses.services import CloneService, TaskProcessor
+
+
+class CompileAnswerKeyTests(SimpleTestCase):
+    """
+    Тесты сборки ключа из specific-объекта задания.
+    """
+
+    def test_fill_gaps_answers_are_cleaned_and_normalized(self):
+        key = compile_answer_key("fill_gaps", FillGapsTask(answers=["<b>Do not</b>", "  Cat "], total_answers=2))
+        self.assertEqual(key.gaps, ("don't", "cat"))
+        self.assertEqual(key.total_answers, 2)
+
+    def test_test_options(self):
+        specific = TestTask(questions=[
+            {"options": [{"option": "a", "is_correct": False}, {"option": "b", "is_correct": True}]},
+            {"options": []},
+        ])
+        self.assertEqual(compile_answer_key("test", specific).options, ((False, True), ()))
+
+    def test_match_cards_first_pair_wins(self):
+        specific = MatchCardsTask(cards=[
+            {"card_left": "a", "card_right": "1"},
+            {"card_left": "a", "card_right": "2"},
+        ])
+        self.assertEqual(compile_answer_key("match_cards", specific).cards, {"a": "1"})
+
+    def test_text_input_default_text_is_sanitized(self):
+        key = compile_answer_key("text_input", TextInputTask(default_text='<b onclick="x()">Hi</b><script>1</script>'))
+        self.assertEqual(key.default_text, "<b>Hi</b>1")
+
+
+class AnswerKeyCacheTests(ClassroomTestCase):
+    """
+    Тесты кеширования и инвалидации ключей.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = create_fill_gaps_task(self.section, answers=["cat", "dog"])
+
+    def test_repeated_saves_do_not_load_specific(self):
+        answer = FillGapsTaskAnswer.objects.create(task=self.task, classroom=self.classroom, user=self.students[0])
+        answer.save_answer_data({"gap-0": "cat"})
+
+        # UPDATE ответа, перечитывание счётчиков и upsert сводки
+        with self.assertNumQueries(3):
+            answer.save_answer_data({"gap-1": "dog"})
+        self.assertEqual(answer.correct_answers, 2)
+
+    def test_task_processor_update_invalidates_key(self):
+        self.assertEqual(get_answer_key(self.task).gaps, ("cat", "dog"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = TaskProcessor(
+                self.teacher, self.section.id, "fill_gaps", task_id=self.task.id,
+                raw_data={"text": "[fox] and [owl]", "answers": ["fox", "owl"]},
+            ).process()
+        self.assertEqual(response.status_code, 200)
+
+        self.task.refresh_from_db()
+        self.assertEqual(get_answer_key(self.task).gaps, ("fox", "owl"))
+
+    def test_clone_sync_swaps_key(self):
+        course = self.section.lesson.course
+        with self.captureOnCommitCallbacks(execute=True):
+            clone = CloneService.create_clone(course, self.teacher)
+        clone_task = Task.objects.get(section__lesson__course=clone)
+        old_object_id = clone_task.object_id
+        self.assertEqual(get_answer_key(clone_task).gaps, ("cat", "dog"))
+
+        specific = FillGapsTask.objects.get(pk=self.task.object_id)
+        specific.answers = ["fox", "owl"]
+        specific.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            CloneService.sync_clone_with_original(clone)
+
+        clone_task.refresh_from_db()
+        self.assertNotEqual(clone_task.object_id, old_object_id)
+        self.assertEqual(get_answer_key(clone_task).gaps, ("fox", "owl"))
+
+    def test_copies_share_key_of_common_specific(self):
+        copy_task = Task.objects.create(
+            section=self.section,
+            task_type="fill_gaps",
+            root_type="copy",
+            linked_to=self.task,
+            content_type=self.task.content_type,
+            object_id=self.task.object_id,
+        )
+        self.assertEqual(get_answer_key(copy_task).gaps, ("cat", "dog"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskProcessor(
+                self.teacher, self.section.id, "fill_gaps", task_id=self.task.id,
+                raw_data={"text": "[fox] and [owl]", "answers": ["fox", "owl"]},
+            ).process()
+
+        self.assertEqual(get_answer_key(copy_task).gaps, ("fox", "owl"))
+
+    def test_missing_specific(self):
+        task = Task.objects.create(
+            section=self.section,
+            task_type="fill_gaps",
+            content_type=ContentType.objects.get_for_model(FillGapsTask),
+            object_id="00000000-0000-0000-0000-000000000000",
+        )
+        self.assertIsNone(get_answer_key(task))
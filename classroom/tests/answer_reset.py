@@ -0,0 +1,105 @@
+"""
+Тесты массового сброса ответов задания.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory
+
+from classroom.models import AnswerSummary, FillGapsTaskAnswer, TextInputTaskAnswer
+from classroom.services.answers import reset_task_answers, save_user_answer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task
+from classroom.views import delete_classroom_task_answers
+from courses.models import Task, TextInputTask
+
+User = get_user_model()
+
+
+class ResetTaskAnswersTests(ClassroomTestCase):
+    """
+    Тесты сброса ответов всего класса одним UPDATE на модель.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = create_fill_gaps_task(self.section)
+
+    def _answer_all(self):
+        for student in self.students:
+            save_user_answer(self.classroom, self.task, student, {"gap-0": "cat", "gap-1": "cow"})
+
+    def test_query_count_does_not_grow_with_students(self):
+        self._answer_all()
+        # SAVEPOINT, UPDATE ответов, SELECT и UPDATE сводки, RELEASE
+        with self.assertNumQueries(5):
+            self.assertEqual(reset_task_answers(self.classroom, self.task), 2)
+
+        more = [User.objects.create_user(username=f"extra{i}", password="x") for i in range(4)]
+        self.classroom.students.add(*more)
+        self.students += more
+        self._answer_all()
+        with self.assertNumQueries(5):
+            self.assertEqual(reset_task_answers(self.classroom, self.task), 6)
+
+        self.assertFalse(FillGapsTaskAnswer.objects.exclude(answers={}).exists())
+        self.assertEqual(
+            set(AnswerSummary.objects.filter(task=self.task).values_list("correct_answers", "wrong_answers")),
+            {(0, 0)},
+        )
+
+    def test_without_answers_nothing_is_sent(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(reset_task_answers(self.classroom, self.task), 0)
+        self.assertEqual(callbacks, [])
+
+    def test_view_sends_one_reset_to_class(self):
+        self._answer_all()
+        layer = get_channel_layer()
+        class_channel = async_to_sync(layer.new_channel)()
+        teacher_channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"classroom_{self.classroom.id}", class_channel)
+        async_to_sync(layer.group_add)(f"classroom_{self.classroom.id}_teacher", teacher_channel)
+
+        request = RequestFactory().delete("/")
+        request.user = self.teacher
+        with self.captureOnCommitCallbacks(execute=True):
+            response = delete_classroom_task_answers(request, self.classroom.id, self.task.id)
+        self.assertEqual(json.loads(response.content)["deleted_users"], 2)
+
+        message = async_to_sync(layer.receive)(class_channel)
+        self.assertEqual(message["type"], "classroom_broadcast_event")
+        frame = json.loads(message["frame"])
+        self.assertEqual(frame["type"], "answer:reset")
+        self.assertEqual(frame["data"]["student_id"], "all")
+        self.assertEqual(frame["data"]["task_id"], self.task.id)
+
+        statistics = json.loads(async_to_sync(layer.receive)(teacher_channel)["frame"])
+        self.assertEqual(
+            {(row["user"]["id"], row["correct_answers"]) for row in statistics["data"]["rows"]},
+            {(student.id, 0) for student in self.students},
+        )
+
+    def test_student_cannot_reset_class(self):
+        self._answer_all()
+        request = RequestFactory().delete("/")
+        request.user = self.students[0]
+        response = delete_classroom_task_answers(request, self.classroom.id, self.task.id)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(FillGapsTaskAnswer.objects.exclude(answers={}).count(), 2)
+
+    def test_text_input_returns_to_default_text(self):
+        specific = TextInputTask.objects.create(default_text="<b>Черновик</b>")
+        task = Task.objects.create(
+            section=self.section,
+            task_type="text_input",
+            content_type=ContentType.objects.get_for_model(TextInputTask),
+            object_id=specific.id,
+        )
+        save_user_answer(self.classroom, task, self.students[0], {"current_text": "Мой ответ"})
+
+        reset_task_answers(self.classroom, task)
+        answer = TextInputTaskAnswer.objects.get(task=task)
+        self.assertEqual(answer.current_text, "<b>Черновик</b>")
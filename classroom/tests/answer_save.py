@@ -0,0 +1,81 @@
+"""
+Тесты сохранения ответа через WebSocket (действие answer:save).
+"""
+
+from classroom.models import TrueFalseTaskAnswer
+from classroom.tests.fixtures import ClassroomConsumerTestCase, create_true_false_task
+
+
+class AnswerSaveConsumerTests(ClassroomConsumerTestCase):
+    """
+    Тесты действия answer:save в VirtualClassConsumer.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = create_true_false_task(self.section)
+
+    async def test_student_save_replies_and_notifies_teacher_with_answer(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+        student = self._communicator(self.students[0])
+        await student.connect()
+        await self._receive_type(teacher, "user:online:event")
+
+        await student.send_json_to({"type": "answer:save", "data": {
+            "request_id": "r1",
+            "task_id": self.task.id,
+            "data": {"answers": [{"statement_index": 0, "selected_value": True}]},
+        }})
+
+        reply = await self._receive_type(student, "answer:saved")
+        self.assertEqual(reply["data"]["request_id"], "r1")
+        self.assertTrue(reply["data"]["success"])
+        self.assertEqual(reply["data"]["task_type"], "true_false")
+        self.assertIs(reply["data"]["answer"]["answers"][0]["selected_value"], True)
+
+        event = await self._receive_type(teacher, "answer:sent")
+        self.assertEqual(event["data"]["student_id"], str(self.students[0].id))
+        self.assertEqual(event["data"]["payload"]["answer"], reply["data"]["answer"])
+
+        self.assertTrue(await TrueFalseTaskAnswer.objects.filter(
+            task=self.task, user=self.students[0]
+        ).aexists())
+
+        await student.disconnect()
+        await teacher.disconnect()
+
+    async def test_student_cannot_save_for_another_student(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+
+        await student.send_json_to({"type": "answer:save", "data": {
+            "request_id": "r2",
+            "task_id": self.task.id,
+            "student_id": self.students[1].id,
+            "data": {"answers": [{"statement_index": 0, "selected_value": True}]},
+        }})
+
+        reply = await self._receive_type(student, "answer:saved")
+        self.assertTrue(reply["data"]["success"])
+        self.assertFalse(await TrueFalseTaskAnswer.objects.filter(user=self.students[1]).aexists())
+        self.assertTrue(await TrueFalseTaskAnswer.objects.filter(user=self.students[0]).aexists())
+
+        await student.disconnect()
+
+    async def test_unknown_task_returns_error(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+
+        await teacher.send_json_to({"type": "answer:save", "data": {
+            "request_id": "r3",
+            "task_id": 999999,
+            "student_id": self.students[0].id,
+            "data": {},
+        }})
+
+        reply = await self._receive_type(teacher, "answer:saved")
+        self.assertFalse(reply["data"]["success"])
+        self.assertEqual(reply["data"]["request_id"], "r3")
+
+        await teacher.disconnect()
@@ -0,0 +1,125 @@
+"""
+Тесты сводки ответов AnswerSummary.
+"""
+import json
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory
+
+from classroom.models import AnswerSummary, FillGapsTaskAnswer, TrueFalseTaskAnswer
+from classroom.services.statistics import get_task_statistics
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task, create_true_false_task
+from classroom.views import delete_classroom_task_answers, get_classroom_task_statistics, mark_answer_as_checked, save_answer
+
+
+class AnswerSummaryTests(ClassroomTestCase):
+    """
+    Тесты поддержки сводки при сохранении, проверке и сбросе ответов.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+        self.factory = RequestFactory()
+
+    def _post(self, view, user, body):
+        request = self.factory.post("/", data=json.dumps(body), content_type="application/json")
+        request.user = user
+        return view(request, self.classroom.id)
+
+    def _summary(self, task):
+        return AnswerSummary.objects.get(classroom=self.classroom, task=task, user=self.student)
+
+    def test_save_and_check_update_summary(self):
+        task = create_true_false_task(self.section)
+        self._post(save_answer, self.student, {
+            "task_id": task.id,
+            "user_id": self.student.id,
+            "data": {"answers": [{"statement_index": 0, "selected_value": True}]},
+        })
+        summary = self._summary(task)
+        self.assertEqual((summary.correct_answers, summary.total_answers, summary.is_checked), (0, 1, False))
+
+        self._post(mark_answer_as_checked, self.teacher, {"task_id": task.id, "user_id": self.student.id})
+        summary = self._summary(task)
+        self.assertEqual((summary.correct_answers, summary.wrong_answers, summary.is_checked), (1, 0, True))
+
+    def test_increment_and_reset_update_summary(self):
+        task = create_fill_gaps_task(self.section)
+        self._post(save_answer, self.student, {
+            "task_id": task.id, "user_id": self.student.id, "data": {"gap-0": "cat", "gap-1": "cow"},
+        })
+        summary = self._summary(task)
+        self.assertEqual((summary.correct_answers, summary.wrong_answers), (1, 1))
+
+        request = self.factory.delete("/")
+        request.user = self.teacher
+        delete_classroom_task_answers(request, self.classroom.id, task.id)
+        summary = self._summary(task)
+        self.assertEqual((summary.correct_answers, summary.wrong_answers), (0, 0))
+
+    def test_task_statistics_view_reads_summary(self):
+        task = create_fill_gaps_task(self.section)
+        self._post(save_answer, self.student, {
+            "task_id": task.id, "user_id": self.student.id, "data": {"gap-0": "cat", "gap-1": "dog"},
+        })
+        request = self.factory.get("/")
+        request.user = self.teacher
+        # класс, учитель, задание, сводка, ученики
+        with self.assertNumQueries(5):
+            response = get_classroom_task_statistics(request, self.classroom.id, task.id)
+        rows = json.loads(response.content)["statistics"]
+        self.assertEqual(rows[0]["user"]["id"], self.student.id)
+        self.assertEqual(rows[0]["success_percentage"], 100)
+
+    def test_removing_student_drops_summary(self):
+        task = create_fill_gaps_task(self.section)
+        self._post(save_answer, self.student, {
+            "task_id": task.id, "user_id": self.student.id, "data": {"gap-0": "cat"},
+        })
+        self.classroom._delete_student_answers(self.student)
+        self.assertFalse(AnswerSummary.objects.filter(user=self.student).exists())
+
+    def test_backfill_restores_summary(self):
+        fill_gaps = create_fill_gaps_task(self.section)
+        true_false = create_true_false_task(self.section)
+        FillGapsTaskAnswer.objects.bulk_create([FillGapsTaskAnswer(
+            task=fill_gaps, classroom=self.classroom, user=self.student, correct_answers=2, wrong_answers=1,
+        )])
+        TrueFalseTaskAnswer.objects.bulk_create([TrueFalseTaskAnswer(
+            task=true_false, classroom=self.classroom, user=self.student, correct_answers=1, is_checked=True,
+        )])
+        self.assertFalse(AnswerSummary.objects.exists())
+
+        call_command("backfill_answer_summary", batch_size=1, stdout=StringIO())
+        call_command("backfill_answer_summary", stdout=StringIO())
+
+        self.assertEqual(AnswerSummary.objects.count(), 2)
+        self.assertEqual(self._summary(fill_gaps).wrong_answers, 1)
+        self.assertTrue(self._summary(true_false).is_checked)
+        self.assertEqual(
+            [row["correct_answers"] for row in get_task_statistics(self.classroom, fill_gaps)][0], 2,
+        )
+
+    def test_migration_backfill_keeps_live_rows(self):
+        migration = import_module("classroom.migrations.0004_backfill_answersummary")
+        fill_gaps = create_fill_gaps_task(self.section)
+        true_false = create_true_false_task(self.section)
+        FillGapsTaskAnswer.objects.bulk_create([FillGapsTaskAnswer(
+            task=fill_gaps, classroom=self.classroom, user=self.student, correct_answers=2,
+        )])
+        TrueFalseTaskAnswer.objects.bulk_create([TrueFalseTaskAnswer(
+            task=true_false, classroom=self.classroom, user=self.student, correct_answers=1,
+        )])
+        AnswerSummary.objects.create(classroom=self.classroom, task=fill_gaps, user=self.student, correct_answers=3)
+
+        migration.backfill_answer_summary(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(self._summary(fill_gaps).correct_answers, 3)
+        self.assertEqual(self._summary(true_false).correct_answers, 1)
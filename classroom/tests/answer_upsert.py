@@ -0,0 +1,104 @@
+"""
+Тесты сохранения ответа через upsert.
+"""
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from classroom.answer_keys import get_answer_key
+from classroom.models import AnswerSummary, Classroom, FillGapsTaskAnswer, TextInputTaskAnswer
+from classroom.services.answers import save_user_answer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task
+from courses.models import Task, TextInputTask
+
+
+def data_queries(context):
+    """Запросы без служебных SAVEPOINT / RELEASE тестовой транзакции."""
+    return [
+        query["sql"] for query in context.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+
+
+class AnswerUpsertTests(ClassroomTestCase):
+    """
+    Тесты пути INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+        self.task = create_fill_gaps_task(self.section)
+        get_answer_key(self.task)
+
+    def test_new_and_existing_answer_take_three_statements(self):
+        # upsert ответа, UPDATE с результатом проверки, upsert сводки
+        with CaptureQueriesContext(connection) as context:
+            answer, created = save_user_answer(self.classroom, self.task, self.student, {"gap-0": "cat"})
+        self.assertTrue(created)
+        self.assertEqual(len(data_queries(context)), 3)
+        self.assertIn("ON CONFLICT", data_queries(context)[0])
+
+        # Вне PostgreSQL существующая строка читается отдельным SELECT
+        with CaptureQueriesContext(connection) as context:
+            answer, created = save_user_answer(self.classroom, self.task, self.student, {"gap-1": "cow"})
+        self.assertFalse(created)
+        self.assertEqual(len(data_queries(context)), 3 if connection.vendor == "postgresql" else 4)
+
+        self.assertEqual((answer.correct_answers, answer.wrong_answers), (1, 1))
+        stored = FillGapsTaskAnswer.objects.get(pk=answer.pk)
+        self.assertEqual((stored.correct_answers, stored.wrong_answers), (1, 1))
+        self.assertEqual(stored.answers, {
+            "0": {"value": "cat", "is_correct": True},
+            "1": {"value": "cow", "is_correct": False},
+        })
+        summary = AnswerSummary.objects.get(task=self.task, user=self.student)
+        self.assertEqual((summary.correct_answers, summary.wrong_answers), (1, 1))
+
+    def test_returned_row_is_converted(self):
+        save_user_answer(self.classroom, self.task, self.student, {"gap-0": "cat"})
+        with self.captureOnCommitCallbacks():
+            answer, created = FillGapsTaskAnswer.upsert(self.task, self.classroom, self.student)
+        self.assertFalse(created)
+        self.assertEqual(answer.answers, {"0": {"value": "cat", "is_correct": True}})
+        self.assertIsNotNone(answer.answered_at.tzinfo)
+        self.assertEqual(answer.correct_answers, 1)
+
+    def test_created_does_not_depend_on_timestamp(self):
+        now = timezone.now()
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            _, created = FillGapsTaskAnswer.upsert(self.task, self.classroom, self.student)
+            self.assertTrue(created)
+            _, created = FillGapsTaskAnswer.upsert(self.task, self.classroom, self.student)
+        self.assertFalse(created)
+
+    def test_text_input_starts_with_default_text(self):
+        specific = TextInputTask.objects.create(default_text="<i>Черновик</i>")
+        task = Task.objects.create(
+            section=self.section,
+            task_type="text_input",
+            content_type=ContentType.objects.get_for_model(TextInputTask),
+            object_id=specific.id,
+        )
+        answer, created = TextInputTaskAnswer.upsert(task, self.classroom, self.student)
+        self.assertTrue(created)
+        self.assertEqual(answer.current_text, "<i>Черновик</i>")
+
+    def test_answer_from_another_classroom_is_not_returned(self):
+        save_user_answer(self.classroom, self.task, self.student, {"gap-0": "cat"})
+        other = Classroom.objects.create(title="Другой", teacher=self.teacher, join_password="pw2")
+        with self.assertRaises(IntegrityError):
+            FillGapsTaskAnswer.upsert(self.task, other, self.student)
+
+    def test_fallback_without_returning(self):
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert",
+            new_callable=mock.PropertyMock, return_value=False,
+        ):
+            save_user_answer(self.classroom, self.task, self.student, {"gap-0": "cat"})
+            answer, created = save_user_answer(self.classroom, self.task, self.student, {"gap-1": "dog"})
+        self.assertFalse(created)
+        self.assertEqual(answer.correct_answers, 2)
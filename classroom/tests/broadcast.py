@@ -0,0 +1,75 @@
+"""
+Тесты рассылки заранее закодированных кадров виртуального класса.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.services.connection_state import ConnectionState
+from classroom.services.roster import ROLE_STUDENT, ROLE_TEACHER
+from classroom.utils.json_codec import encode_frame, get_encoder
+
+
+def _consumer(user_id, is_teacher=False):
+    consumer = VirtualClassConsumer()
+    consumer.state = ConnectionState(
+        classroom_id="1",
+        user_id=user_id,
+        role=ROLE_TEACHER if is_teacher else ROLE_STUDENT,
+        username=f"user_{user_id}",
+    )
+    consumer.sent = []
+
+    async def send(text_data=None, bytes_data=None, close=False):
+        consumer.sent.append(text_data)
+
+    consumer.send = send
+    return consumer
+
+
+class BroadcastFrameTests(SimpleTestCase):
+    """
+    Тесты формата кадров и фильтрации получателей.
+    """
+
+    def test_frame_is_forwarded_unchanged(self):
+        teacher = _consumer(1, is_teacher=True)
+        students = [_consumer(2), _consumer(3)]
+        event = teacher._format_event("classroom_broadcast", "section:change", None, "all", {"section_id": 5})
+
+        for student in students:
+            async_to_sync(student.classroom_broadcast_event)(event)
+
+        for student in students:
+            self.assertEqual(student.sent, [event["frame"]])
+
+        frame = json.loads(event["frame"])
+        self.assertEqual(frame["type"], "section:change")
+        self.assertEqual(frame["data"]["sender_id"], 1)
+        self.assertEqual(frame["data"]["payload"], {"section_id": 5})
+
+    def test_answer_sender_is_skipped(self):
+        sender = _consumer(2)
+        other = _consumer(3)
+        event = sender._format_event("classroom_broadcast", "answer:sent", 7, 2, {})
+
+        async_to_sync(sender.classroom_broadcast_event)(event)
+        async_to_sync(other.classroom_broadcast_event)(event)
+
+        self.assertEqual(sender.sent, [])
+        self.assertEqual(len(other.sent), 1)
+
+    def test_encoders_produce_same_document(self):
+        data = {"text": "Привет", "items": [1, 2, 3]}
+        for name in ("json", "auto"):
+            with override_settings(CLASSROOM_JSON_ENCODER=name):
+                self.assertEqual(
+                    json.loads(encode_frame("chat:update", data)),
+                    {"type": "chat:update", "data": data},
+                )
+
+    def test_unknown_encoder_raises(self):
+        with self.assertRaises(ValueError):
+            get_encoder("yaml")
@@ -0,0 +1,57 @@
+"""
+Тесты компактного состояния соединения виртуального класса.
+"""
+from django.test import SimpleTestCase
+
+from classroom.services.connection_state import ConnectionState
+from classroom.services.keepalive import ticker
+from classroom.services.roster import ROLE_STUDENT, ROLE_TEACHER
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+
+
+class ConnectionStateTests(SimpleTestCase):
+    """
+    Тесты записи ConnectionState.
+    """
+
+    def test_state_has_no_instance_dict(self):
+        state = ConnectionState(classroom_id="7", user_id=3, role=ROLE_STUDENT)
+        self.assertFalse(hasattr(state, "__dict__"))
+        with self.assertRaises(AttributeError):
+            state.user = object()
+
+    def test_group_names_are_shared_between_connections(self):
+        first = ConnectionState(classroom_id="7", user_id=3, role=ROLE_STUDENT)
+        second = ConnectionState(classroom_id="7", user_id=4, role=ROLE_STUDENT)
+        self.assertIs(first.groups, second.groups)
+        self.assertIs(first.students_group, second.students_group)
+
+    def test_member_groups_follow_role(self):
+        student = ConnectionState(classroom_id="7", user_id=3, role=ROLE_STUDENT)
+        teacher = ConnectionState(classroom_id="7", user_id=1, role=ROLE_TEACHER)
+
+        self.assertEqual(student.member_groups, ("classroom_7", "user_3", "classroom_7_students"))
+        self.assertEqual(teacher.member_groups, ("classroom_7", "user_1", "classroom_7_teacher"))
+        self.assertTrue(teacher.is_teacher)
+        self.assertFalse(teacher.is_student)
+
+
+class ConsumerStateTests(ClassroomConsumerTestCase):
+    """
+    Тесты состояния, которое VirtualClassConsumer держит после подключения.
+    """
+
+    async def test_consumer_keeps_only_compact_state(self):
+        communicator = self._communicator(self.students[0])
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        consumer = next(iter(ticker._connections))
+        self.assertIsInstance(consumer.state, ConnectionState)
+        self.assertIs(consumer.scope["user"], consumer.state)
+        self.assertEqual(consumer.state.user_id, self.students[0].id)
+        self.assertTrue(consumer.is_student)
+        self.assertNotIn("user", vars(consumer))
+
+        await communicator.disconnect()
+        self.assertEqual(len(ticker), 0)
@@ -0,0 +1,164 @@
+"""
+Тесты журнала событий класса и возобновления WebSocket-потока.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.test import SimpleTestCase, override_settings
+
+from classroom.services import event_log
+from classroom.services.event_log import LocalEventLog, stamp_frame
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+
+
+class LocalEventLogTests(SimpleTestCase):
+    """
+    Тесты процессного журнала событий.
+    """
+
+    def setUp(self):
+        self.log = LocalEventLog(size=3)
+        self.addCleanup(setattr, event_log, "_local_event_log", None)
+
+    def _append(self, n):
+        for i in range(n):
+            async_to_sync(self.log.append)("classroom_1", {"n": i})
+
+    def test_since_returns_missed_events_in_order(self):
+        self._append(3)
+        missed, current, complete = async_to_sync(self.log.since)("classroom_1", 1)
+
+        self.assertTrue(complete)
+        self.assertEqual(current, 3)
+        self.assertEqual([seq for seq, _ in missed], [2, 3])
+
+    def test_evicted_gap_is_incomplete(self):
+        self._append(5)
+        missed, current, complete = async_to_sync(self.log.since)("classroom_1", 1)
+
+        self.assertFalse(complete)
+        self.assertEqual(current, 5)
+
+    def test_up_to_date_and_future_seq(self):
+        self._append(2)
+        self.assertEqual(async_to_sync(self.log.since)("classroom_1", 2), ([], 2, True))
+        self.assertFalse(async_to_sync(self.log.since)("classroom_1", 10)[2])
+
+    def test_streams_are_numbered_separately(self):
+        self._append(2)
+        async_to_sync(self.log.append)("user_5", {"n": 0})
+
+        self.assertEqual(
+            async_to_sync(self.log.current_seqs)(["classroom_1", "user_5", "user_6"]),
+            {"classroom_1": 2, "user_5": 1, "user_6": 0},
+        )
+
+    def test_chat_update_is_not_numbered(self):
+        layer = InMemoryChannelLayer()
+        event_log._local_event_log = self.log
+
+        seq = async_to_sync(event_log.publish_event)(layer, "classroom_1", {
+            "type": "chat_update_event", "action": "chat:update", "frame": '{"type":"chat:update","data":{}}',
+        })
+
+        self.assertIsNone(seq)
+        self.assertEqual(async_to_sync(self.log.current_seqs)(["classroom_1"]), {"classroom_1": 0})
+
+    @override_settings(CLASSROOM_EVENT_LOG_MAX_FRAME=32)
+    def test_oversized_frame_is_logged_as_stub(self):
+        layer = InMemoryChannelLayer()
+        event_log._local_event_log = self.log
+        self._append(1)
+
+        async_to_sync(event_log.publish_event)(layer, "classroom_1", {
+            "type": "lesson_attached", "frame": '{"type":"lesson:attached","data":{"snapshot":"%s"}}' % ("x" * 64),
+        })
+        missed, current, complete = async_to_sync(self.log.since)("classroom_1", 1)
+
+        self.assertEqual(current, 2)
+        self.assertFalse(complete)
+        self.assertNotIn("frame", missed[0][1])
+
+    def test_stamp_frame(self):
+        frame = stamp_frame('{"type":"a","data":{}}', "classroom_1", 7)
+        self.assertEqual(json.loads(frame), {"seq": 7, "stream": "classroom_1", "type": "a", "data": {}})
+
+
+class ResumeConsumerTests(ClassroomConsumerTestCase):
+    """
+    Тесты действия resume в VirtualClassConsumer.
+    """
+
+    async def _broadcast_section(self, teacher, section_id):
+        await teacher.send_json_to({"type": "section:change", "data": {
+            "student_id": "all", "section_id": section_id,
+        }})
+
+    async def test_reconnect_receives_only_missed_events(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+        student = self._communicator(self.students[0])
+        await student.connect()
+        connected = await self._receive_type(student, "connected")
+        last_seqs = connected["data"]["seq"]
+        self.assertEqual(set(last_seqs.values()), {0})
+
+        await self._broadcast_section(teacher, 1)
+        live = await self._receive_type(student, "section:change")
+        last_seqs[live["stream"]] = live["seq"]
+        await student.disconnect()
+
+        await self._broadcast_section(teacher, 2)
+        await self._broadcast_section(teacher, 3)
+
+        student = self._communicator(self.students[0])
+        await student.connect()
+        await student.send_json_to({"type": "resume", "data": {"last_seq": last_seqs, "request_id": "r"}})
+        result = await self._receive_type(student, "resume:result")
+
+        self.assertTrue(result["data"]["complete"])
+        self.assertEqual(result["data"]["request_id"], "r")
+        sections = [
+            e["data"]["payload"]["section_id"]
+            for e in result["data"]["events"] if e["type"] == "section:change"
+        ]
+        self.assertEqual(sections, [2, 3])
+        self.assertTrue(all(e["seq"] > last_seqs[e["stream"]] for e in result["data"]["events"]))
+        self.assertEqual(result["data"]["seq"][live["stream"]], live["seq"] + 2)
+
+        await student.disconnect()
+        await teacher.disconnect()
+
+    async def test_evicted_gap_requests_full_refresh(self):
+        event_log._local_event_log = LocalEventLog(size=1)
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+
+        for section_id in range(3):
+            await self._broadcast_section(teacher, section_id)
+
+        student = self._communicator(self.students[0])
+        await student.connect()
+        connected = await self._receive_type(student, "connected")
+        last_seqs = dict.fromkeys(connected["data"]["seq"], 0)
+        await student.send_json_to({"type": "resume", "data": {"last_seq": last_seqs}})
+        result = await self._receive_type(student, "resume:result")
+
+        self.assertFalse(result["data"]["complete"])
+        self.assertEqual(result["data"]["events"], [])
+
+        await student.disconnect()
+        await teacher.disconnect()
+
+    async def test_filtered_event_is_closed_with_skip(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+        await self._receive_type(student, "connected")
+
+        await student.send_json_to({"type": "chat:send_message", "data": {"text": "Привет"}})
+        skip = await self._receive_type(student, "seq:skip")
+
+        self.assertEqual(skip["data"], {f"classroom_{self.classroom.id}": [1]})
+
+        await student.disconnect()
@@ -0,0 +1,115 @@
+"""
+Общие данные для тестов виртуального класса.
+"""
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from classroom.answer_keys import answer_key_cache
+from classroom.consumers import VirtualClassConsumer
+from classroom.models import Classroom
+from classroom.services import channel_registry, event_log, presence
+from classroom.services.roster import roster_cache
+from courses.models import Course, Lesson, Section, Task, TrueFalseTask, FillGapsTask
+
+User = get_user_model()
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+IN_MEMORY_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+def create_classroom(students=2):
+    """
+    Создаёт учителя, класс с учениками и пустой раздел урока класса.
+    """
+    teacher = User.objects.create_user(username="teacher", password="testpass")
+    course = Course.objects.create(title="Курс", creator=teacher)
+    lesson = Lesson.objects.create(title="Урок", course=course)
+    section = Section.objects.create(title="Раздел", lesson=lesson, order=1)
+
+    classroom = Classroom.objects.create(title="Класс", teacher=teacher, join_password="pw", lesson=lesson)
+    student_list = [
+        User.objects.create_user(username=f"student{i}", password="testpass", first_name=f"Ученик{i}")
+        for i in range(1, students + 1)
+    ]
+    classroom.students.add(*student_list)
+    return teacher, classroom, student_list, section
+
+
+def create_true_false_task(section, statements=None):
+    specific = TrueFalseTask.objects.create(statements=statements or [
+        {"statement": "A", "is_true": True},
+        {"statement": "B", "is_true": False},
+    ])
+    return Task.objects.create(
+        section=section,
+        task_type="true_false",
+        content_type=ContentType.objects.get_for_model(TrueFalseTask),
+        object_id=specific.id,
+    )
+
+
+def create_fill_gaps_task(section, answers=None):
+    specific = FillGapsTask.objects.create(text="[cat] and [dog]", answers=answers or ["cat", "dog"])
+    return Task.objects.create(
+        section=section,
+        task_type="fill_gaps",
+        content_type=ContentType.objects.get_for_model(FillGapsTask),
+        object_id=specific.id,
+    )
+
+
+def reset_classroom_state():
+    """
+    Сбрасывает процессные кеши и реестры, которые иначе переживают тест.
+    """
+    roster_cache.clear_local()
+    answer_key_cache.clear_local()
+    event_log._local_event_log = None
+    channel_registry._local_registry = None
+    presence._local_presence = None
+
+
+class ClassroomFixtureMixin:
+    """
+    Перед каждым тестом — чистые процессные кеши и класс из create_classroom:
+    self.teacher, self.classroom, self.students, self.section.
+    """
+    students_count = 2
+
+    def setUp(self):
+        super().setUp()
+        reset_classroom_state()
+        self.teacher, self.classroom, self.students, self.section = create_classroom(self.students_count)
+
+    def _communicator(self, user, subprotocols=None):
+        communicator = WebsocketCommunicator(
+            VirtualClassConsumer.as_asgi(),
+            f"/ws/virtual-class/{self.classroom.id}/",
+            subprotocols=subprotocols,
+        )
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"classroom_id": str(self.classroom.id)}}
+        return communicator
+
+    async def _receive_type(self, communicator, frame_type):
+        while True:
+            frame = await communicator.receive_json_from()
+            if frame["type"] == frame_type:
+                return frame
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, CACHES=LOCMEM_CACHES)
+class ClassroomTestCase(ClassroomFixtureMixin, TestCase):
+    """
+    Тесты сервисов и представлений класса на in-memory channel layer и LocMem-кеше.
+    """
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, CACHES=LOCMEM_CACHES)
+class ClassroomConsumerTestCase(ClassroomFixtureMixin, TransactionTestCase):
+    """
+    Тесты VirtualClassConsumer через WebsocketCommunicator: соединения
+    работают в своём потоке, поэтому данные нужны в закоммиченной БД.
+    """
@@ -0,0 +1,127 @@
+"""
+Тесты нормализации ответов: совпадение с исходной реализацией.
+"""
+import random
+import re
+import unicodedata
+from fractions import Fraction
+
+from django.test import SimpleTestCase
+
+from classroom.utils.format_string import _normalize, compare_normalized_answers, normalize_answer_string
+
+
+def legacy_normalize_answer_string(text):
+    """
+    Исходная реализация нормализатора — эталон поведения.
+    """
+    if not isinstance(text, str):
+        return ""
+
+    text = text.lower()
+
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+
+    for src in '—–−―':
+        text = text.replace(src, '-')
+    for src in '’‘´`"“”«»':
+        text = text.replace(src, "'")
+
+    def fraction_replacer(match):
+        frac = match.group(0)
+        try:
+            if '/' in frac:
+                num, den = frac.split('/')
+                num = num.strip()
+                den = den.strip()
+                if num and den:
+                    return str(float(Fraction(num, den)))
+        except:
+            pass
+        return frac
+
+    text = re.sub(r'\b\d+\s*/\s*\d+\b', fraction_replacer, text)
+    text = re.sub(r'\b\d+,\d+\b', lambda m: m.group(0).replace(',', '.'), text)
+
+    def number_evaluator(match):
+        num_str = match.group(0)
+        try:
+            if '.' in num_str:
+                return str(float(num_str))
+            elif num_str.isdigit():
+                return num_str
+        except:
+            pass
+        return num_str
+
+    text = re.sub(r'\b\d+\.?\d*\.?\d*\b', number_evaluator, text)
+    text = re.sub(r'[^\w\s\'.+-]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    for words, contraction in (
+        (r'i\s+am', "i'm"), (r'was\s+not', "wasn't"), (r'were\s+not', "weren't"),
+        (r'do\s+not', "don't"), (r'does\s+not', "doesn't"), (r'did\s+not', "didn't"),
+        (r'have\s+not', "haven't"), (r'has\s+not', "hasn't"), (r'had\s+not', "hadn't"),
+        (r'will\s+not', "won't"), (r'would\s+not', "wouldn't"), (r'should\s+not', "shouldn't"),
+        (r'could\s+not', "couldn't"), (r'can\s+not', "can't"), (r'cannot', "can't"),
+        (r'must\s+not', "mustn't"),
+    ):
+        text = re.sub(r'\b' + words + r'\b', contraction, text)
+
+    return re.sub(r'\s*-\s*', '-', text)
+
+
+PIECES = [
+    "I am", "i  AM", "was not", "Were\tnot", "do not", "Does  not", "did not", "have not", "has not",
+    "had not", "will not", "would not", "should not", "could not", "can not", "cannot", "must not",
+    "1/2", "3,5", "2.50", "1.2.3", "007", "10,000,5", "٣.٥", "½", "²",
+    "«", "»", "—", "–", "−", "―", '"', "`", "’", "‘", "´", "“", "”",
+    "café", "naïve", "ümlaut", "ß", "İ", "ﬁ", "Ⅻ", "x - y", "-", "+", ".", ",", "!", "?", "..",
+    "don't", "abc", "  ", "\t", "\n",
+]
+
+SAMPLES = [
+    "She does  not   want to go — it's 3,5 km «away»",
+    "I AM   here",
+    "Cannot",
+    "well-known",
+    "  Привет,  мир!  ",
+]
+
+
+def random_answers(count, seed=1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield "".join(
+            rnd.choice(PIECES) + rnd.choice(("", " ", "  "))
+            for _ in range(rnd.randint(0, 6))
+        )
+
+
+class NormalizeAnswerStringTests(SimpleTestCase):
+    """
+    Тесты совпадения с исходной реализацией и кеширования.
+    """
+
+    def test_matches_legacy_on_samples(self):
+        for text in SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(normalize_answer_string(text), legacy_normalize_answer_string(text))
+
+    def test_matches_legacy_on_random_answers(self):
+        for text in random_answers(5000):
+            self.assertEqual(
+                _normalize.__wrapped__(text), legacy_normalize_answer_string(text), repr(text),
+            )
+
+    def test_non_string(self):
+        self.assertEqual(normalize_answer_string(None), "")
+        self.assertEqual(normalize_answer_string(5), "")
+
+    def test_repeated_string_hits_cache(self):
+        text = "Unique answer for cache test"
+        normalize_answer_string(text)
+        hits = _normalize.cache_info().hits
+        self.assertTrue(compare_normalized_answers(text, "unique  ANSWER for cache test"))
+        self.assertEqual(_normalize.cache_info().hits, hits + 1)
@@ -0,0 +1,40 @@
+"""
+Бенчмарки нормализации ответов (pytest-benchmark).
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from classroom.tests.format_string import SAMPLES, legacy_normalize_answer_string, random_answers  # noqa: E402
+from classroom.utils.format_string import _normalize, normalize_answer_string  # noqa: E402
+
+ANSWERS = list(random_answers(200, seed=2)) + SAMPLES
+
+
+def _run(normalize):
+    for text in ANSWERS:
+        normalize(text)
+
+
+@pytest.mark.benchmark(group="normalize")
+def test_legacy(benchmark):
+    benchmark(_run, legacy_normalize_answer_string)
+
+
+@pytest.mark.benchmark(group="normalize")
+def test_compiled_uncached(benchmark):
+    benchmark(_run, _normalize.__wrapped__)
+
+
+@pytest.mark.benchmark(group="normalize")
+def test_compiled_cached(benchmark):
+    _run(normalize_answer_string)
+    benchmark(_run, normalize_answer_string)
+
+
+def test_compiled_is_faster_than_legacy():
+    import timeit
+
+    legacy = min(timeit.repeat(lambda: _run(legacy_normalize_answer_string), number=5, repeat=3))
+    compiled = min(timeit.repeat(lambda: _run(_normalize.__wrapped__), number=5, repeat=3))
+    assert compiled < legacy
@@ -0,0 +1,105 @@
+"""
+Тесты проверки ответов в памяти и их сохранения одним UPDATE.
+"""
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from classroom.grading import grade_gaps, grade_options, grade_pair, grade_statements
+from classroom.models import FillGapsTaskAnswer, TrueFalseTaskAnswer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task, create_true_false_task
+
+
+class GradingTests(SimpleTestCase):
+    """
+    Тесты функций classroom.grading.
+    """
+
+    def test_gaps_count_only_changed_values(self):
+        current = {"0": {"value": "cat", "is_correct": True}}
+        grade = grade_gaps(("cat", "dog", "fox"), current, {"gap-0": "cat", "gap-1": "Dog", "gap-2": "owl", "x": 1})
+
+        self.assertEqual((grade.correct, grade.wrong), (1, 1))
+        self.assertEqual(grade.answers["1"], {"value": "Dog", "is_correct": True})
+        self.assertIs(grade.answers["2"]["is_correct"], False)
+        self.assertNotIn("1", current)
+
+    def test_gap_without_key_is_not_graded(self):
+        grade = grade_gaps(("cat",), {}, {"gap-5": "cat"})
+        self.assertEqual((grade.correct, grade.wrong), (0, 0))
+        self.assertIsNone(grade.answers["5"]["is_correct"])
+
+    def test_pair(self):
+        cards = {"a": "1", "b": "2"}
+        grade = grade_pair(cards, {}, "a", "2")
+        self.assertEqual((grade.correct, grade.wrong), (0, 1))
+
+        repeat = grade_pair(cards, grade.answers, "a", "2")
+        self.assertEqual((repeat.correct, repeat.wrong), (0, 0))
+
+    def test_options_treat_unanswered_as_wrong(self):
+        options = ((False, True),) * 3
+        answers = [{"selected_option": 1}, {"selected_option": 0}, {"selected_option": None}]
+        grade = grade_options(options, answers)
+
+        self.assertEqual((grade.correct, grade.wrong), (1, 2))
+        self.assertEqual([a["is_correct"] for a in grade.answers], [True, False, False])
+
+    def test_statements_skip_unanswered(self):
+        statements = (True, False, True)
+        answers = [{"selected_value": True}, {"selected_value": True}, {"selected_value": None}]
+        grade = grade_statements(statements, answers)
+
+        self.assertEqual((grade.correct, grade.wrong), (1, 1))
+        self.assertEqual([a["is_correct"] for a in grade.answers], [True, False, None])
+
+
+class ApplyGradeTests(ClassroomTestCase):
+    """
+    Тесты записи результата проверки в базу.
+    """
+
+    def _updates(self, queries):
+        return [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+
+    def test_fill_gaps_save_is_one_update(self):
+        task = create_fill_gaps_task(self.section, answers=["cat", "dog", "owl", "fox"])
+        answer = FillGapsTaskAnswer.objects.create(task=task, classroom=self.classroom, user=self.students[0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            answer.save_answer_data({"gap-0": "cat", "gap-1": "cow", "gap-2": "owl", "gap-3": "fox"})
+
+        self.assertEqual(len(self._updates(ctx.captured_queries)), 1)
+        self.assertEqual((answer.correct_answers, answer.wrong_answers), (3, 1))
+
+        answer.refresh_from_db()
+        self.assertEqual((answer.correct_answers, answer.wrong_answers), (3, 1))
+        self.assertIs(answer.answers["1"]["is_correct"], False)
+
+    def test_counters_from_stale_instances_add_up(self):
+        task = create_fill_gaps_task(self.section)
+        answer = FillGapsTaskAnswer.objects.create(task=task, classroom=self.classroom, user=self.students[0])
+        stale = FillGapsTaskAnswer.objects.get(pk=answer.pk)
+
+        answer.save_answer_data({"gap-0": "cat"})
+        stale.save_answer_data({"gap-1": "cow"})
+
+        self.assertEqual((stale.correct_answers, stale.wrong_answers), (1, 1))
+
+    def test_mark_as_checked_writes_absolute_counters(self):
+        task = create_true_false_task(self.section)
+        answer = TrueFalseTaskAnswer.objects.create(
+            task=task, classroom=self.classroom, user=self.students[0], correct_answers=7,
+        )
+        answer.save_answer_data({"answers": [
+            {"statement_index": 0, "selected_value": True},
+            {"statement_index": 1, "selected_value": True},
+        ]})
+
+        with CaptureQueriesContext(connection) as ctx:
+            answer.mark_as_checked()
+
+        self.assertEqual(len(self._updates(ctx.captured_queries)), 1)
+        answer.refresh_from_db()
+        self.assertTrue(answer.is_checked)
+        self.assertEqual((answer.correct_answers, answer.wrong_answers), (1, 1))
@@ -0,0 +1,99 @@
+"""
+Тесты keepalive соединений и чистки групп от мёртвых каналов.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.test import SimpleTestCase, override_settings
+
+from classroom.consumers import IDLE_CLOSE_CODE
+from classroom.services.channel_registry import LocalChannelRegistry, get_channel_registry
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+
+
+class LocalChannelRegistryTests(SimpleTestCase):
+    """
+    Тесты процессного реестра каналов.
+    """
+
+    def test_sweep_removes_only_unregistered_channels_from_classroom_groups(self):
+        layer = InMemoryChannelLayer()
+        registry = LocalChannelRegistry(layer, ttl=60)
+
+        async def scenario():
+            await registry.touch(["alive!1"])
+            for group in ("classroom_1", "classroom_1_students", "user_5.control", "other"):
+                await layer.group_add(group, "alive!1")
+                await layer.group_add(group, "dead!2")
+            return await registry.sweep()
+
+        removed = async_to_sync(scenario)()
+
+        self.assertEqual(removed, 3)
+        self.assertEqual(set(layer.groups["classroom_1"]), {"alive!1"})
+        self.assertEqual(set(layer.groups["user_5.control"]), {"alive!1"})
+        self.assertEqual(set(layer.groups["other"]), {"alive!1", "dead!2"})
+
+    def test_expired_mark_is_swept(self):
+        layer = InMemoryChannelLayer()
+        registry = LocalChannelRegistry(layer, ttl=60)
+
+        async def scenario():
+            await registry.touch(["stale!1"])
+            registry._alive["stale!1"] -= 120
+            await layer.group_add("classroom_1", "stale!1")
+            return await registry.sweep()
+
+        self.assertEqual(async_to_sync(scenario)(), 1)
+
+
+@override_settings(CLASSROOM_PING_INTERVAL=0.05, CLASSROOM_IDLE_TIMEOUT=0.3)
+class KeepaliveConsumerTests(ClassroomConsumerTestCase):
+    """
+    Тесты ping/pong и закрытия молчащих сокетов в VirtualClassConsumer.
+    """
+
+    async def test_silent_socket_is_closed(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+        connected = await self._receive_type(student, "connected")
+        self.assertEqual(connected["data"]["ping_interval"], 0.05)
+
+        await self._receive_type(student, "ping")
+        while True:
+            output = await student.receive_output(timeout=2)
+            if output["type"] == "websocket.close":
+                break
+        self.assertEqual(output["code"], IDLE_CLOSE_CODE)
+        await student.disconnect()
+
+    async def test_pong_keeps_socket_open(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 0.6
+        while loop.time() < deadline:
+            await self._receive_type(student, "ping")
+            await student.send_json_to({"type": "pong", "data": {}})
+
+        await student.send_json_to({"type": "ping", "data": {}})
+        await self._receive_type(student, "pong")
+        await student.disconnect()
+
+    async def test_sweep_removes_channel_of_dead_connection(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+        layer = get_channel_layer()
+        registry = get_channel_registry(layer)
+        group = f"classroom_{self.classroom.id}"
+        # Канал воркера, убитого без disconnect
+        await layer.group_add(group, "specific.inmemory!ghost")
+
+        self.assertEqual(await registry.sweep(), 1)
+        self.assertEqual(len(layer.groups[group]), 1)
+        self.assertNotIn("specific.inmemory!ghost", layer.groups[group])
+
+        await student.disconnect()
+        self.assertEqual(registry._alive, {})
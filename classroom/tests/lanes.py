@@ -0,0 +1,80 @@
+"""
+Тесты полос доставки событий класса.
+"""
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase, override_settings
+
+from classroom.services import event_log
+from classroom.services.lanes import LANE_BULK, LANE_CONTROL, event_lane, lane_group
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+
+SMALL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "CONFIG": {"capacity": 5},
+    },
+}
+
+
+class EventLaneTests(SimpleTestCase):
+    """
+    Тесты классификации событий по полосам.
+    """
+
+    def test_control_events(self):
+        self.assertEqual(event_lane({"type": "lesson_attached"}), LANE_CONTROL)
+        self.assertEqual(event_lane({"type": "user_deleted_event"}), LANE_CONTROL)
+        self.assertEqual(event_lane({"type": "classroom_broadcast_event", "action": "section:change"}), LANE_CONTROL)
+        self.assertEqual(event_lane({"type": "classroom_broadcast_event", "action": "copying:changed"}), LANE_CONTROL)
+
+    def test_bulk_events(self):
+        self.assertEqual(event_lane({"type": "chat_update_event", "action": "chat:update"}), LANE_BULK)
+        self.assertEqual(event_lane({"type": "student_to_teacher_event", "action": "answer:sent"}), LANE_BULK)
+        self.assertEqual(lane_group("classroom_1", LANE_BULK), "classroom_1")
+        self.assertEqual(lane_group("classroom_1", LANE_CONTROL), "classroom_1.control")
+
+
+@override_settings(CHANNEL_LAYERS=SMALL_LAYERS)
+class ControlLaneConsumerTests(ClassroomConsumerTestCase):
+    """
+    Управляющее событие доходит, даже когда канал массового трафика переполнен.
+    """
+
+    students_count = 1
+
+    async def test_section_change_survives_full_bulk_channel(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+        await student.receive_json_from()
+
+        layer = get_channel_layer()
+        group = f"classroom_{self.classroom.id}"
+        # Без передачи управления event loop: канал ученика переполняется
+        for n in range(20):
+            await event_log.publish_event(layer, group, {
+                "type": "chat_update_event",
+                "action": "chat:update",
+                "sender_id": self.teacher.id,
+                "frame": '{"type":"chat:update","data":{"n":%d}}' % n,
+            })
+        await event_log.publish_event(layer, f"{group}_students", {
+            "type": "classroom_broadcast_event",
+            "action": "section:change",
+            "student_id": "all",
+            "sender_id": self.teacher.id,
+            "frame": '{"type":"section:change","data":{"section_id":42}}',
+        })
+
+        received = []
+        while True:
+            frame = await student.receive_json_from()
+            received.append(frame["type"])
+            if frame["type"] == "section:change":
+                break
+
+        self.assertLess(received.count("chat:update"), 20)
+        self.assertEqual(frame["data"]["section_id"], 42)
+        self.assertEqual(frame["stream"], f"{group}_students")
+        self.assertEqual(frame["seq"], 1)
+
+        await student.disconnect()
@@ -0,0 +1,55 @@
+"""
+Тесты снимка урока в событии lesson:attached.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.test import override_settings
+
+from classroom.services.events.lesson import build_lesson_snapshot, notify_lesson_attached
+from classroom.services.lanes import LANE_CONTROL, lane_group
+from classroom.tests.fixtures import ClassroomTestCase, create_true_false_task
+from courses.models import Section
+
+
+class LessonSnapshotTests(ClassroomTestCase):
+    """
+    Тесты сборки и рассылки снимка урока.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.lesson = self.section.lesson
+        Section.objects.create(title="Второй", lesson=self.lesson, order=2)
+        self.task = create_true_false_task(self.section)
+
+    def test_snapshot_contains_sections_and_first_section_tasks(self):
+        snapshot = build_lesson_snapshot(self.lesson.id)
+
+        self.assertEqual([s["title"] for s in snapshot["sections"]], ["Раздел", "Второй"])
+        self.assertEqual(snapshot["section_id"], self.section.id)
+        self.assertEqual([t["task_id"] for t in snapshot["tasks"]], [self.task.id])
+        self.assertIn("statements", snapshot["tasks"][0]["data"])
+        self.assertEqual(snapshot["version"], build_lesson_snapshot(self.lesson.id)["version"])
+
+    @override_settings(CLASSROOM_LESSON_SNAPSHOT_MAX_BYTES=10)
+    def test_oversized_snapshot_drops_tasks(self):
+        snapshot = build_lesson_snapshot(self.lesson.id)
+
+        self.assertIsNone(snapshot["tasks"])
+        self.assertEqual(len(snapshot["sections"]), 2)
+
+    def test_notify_includes_snapshot_in_frame(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(lane_group(f"classroom_{self.classroom.id}", LANE_CONTROL), channel)
+
+        notify_lesson_attached(classroom_id=str(self.classroom.id), lesson_id=self.lesson.id)
+        message = async_to_sync(layer.receive)(channel)
+
+        frame = json.loads(message["frame"])
+        self.assertEqual(frame["type"], "lesson:attached")
+        self.assertEqual(frame["data"]["payload"]["snapshot"]["lesson_id"], self.lesson.id)
+        self.assertEqual(frame["seq"], 1)
+        self.assertEqual(frame["stream"], f"classroom_{self.classroom.id}")
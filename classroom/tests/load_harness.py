@@ -0,0 +1,79 @@
+"""
+Тесты нагрузочного стенда VirtualClassConsumer.
+"""
+import asyncio
+from unittest import mock
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from classroom.management.commands._load_harness import (
+    BENCH_ACTIONS, BenchFixture, ensure_bench_database, percentile, run_load, summarize,
+)
+from classroom.tests.fixtures import IN_MEMORY_LAYERS, LOCMEM_CACHES, reset_classroom_state
+
+
+class SummaryTests(SimpleTestCase):
+    """
+    Тесты сводки задержек.
+    """
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize_in_milliseconds(self):
+        summary = summarize([0.003, 0.001, 0.002])
+        self.assertEqual(summary["count"], 3)
+        self.assertAlmostEqual(summary["p50_ms"], 2.0)
+        self.assertAlmostEqual(summary["max_ms"], 3.0)
+
+
+class BenchDatabaseTests(SimpleTestCase):
+    """
+    Тесты защиты рабочей БД от временных данных стенда.
+    """
+
+    def _check(self, name):
+        with mock.patch.dict(connection.settings_dict, {"NAME": name}), \
+                mock.patch.object(connection, "vendor", "postgresql"):
+            ensure_bench_database()
+
+    def test_test_and_bench_databases_are_allowed(self):
+        self._check("test_fastlesson")
+        self._check("/var/lib/bench_fastlesson.sqlite3")
+
+    def test_working_database_is_refused(self):
+        with self.assertRaises(CommandError):
+            self._check("fastlesson")
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, CACHES=LOCMEM_CACHES)
+class RunLoadTests(TransactionTestCase):
+    """
+    Короткий прогон стенда: все сообщения доходят и попадают в отчёт.
+    """
+
+    def setUp(self):
+        reset_classroom_state()
+        self.fixture = BenchFixture(classrooms=2, students=3)
+        self.fixture.cold_roster()
+
+    def test_report_counts_every_delivery(self):
+        report = asyncio.run(run_load(self.fixture, rounds=2, interval=0.01, typing=1, settle_timeout=5))
+
+        self.assertEqual(report["connections"], 8)
+        self.assertEqual(report["failed_connections"], 0)
+        self.assertEqual(report["connect"]["count"], 8)
+        self.assertEqual(report["expected"], {
+            "section:change": 2 * 2 * 3,
+            "answer:sent": 2 * 2 * 3,
+            "chat:update": 2 * 2 * 3,
+        })
+        self.assertEqual(report["delivered"], report["expected"])
+        for action in BENCH_ACTIONS:
+            self.assertGreater(report["fanout"][action]["p99_ms"], 0)
+        self.assertIn("per_connection_bytes", report["rss"])
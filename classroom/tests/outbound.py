@@ -0,0 +1,188 @@
+"""
+Тесты исходящей очереди с микробатчингом.
+"""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from classroom.consumers import VirtualClassConsumer
+from classroom.services.connection_state import ConnectionState
+from classroom.services.roster import ROLE_STUDENT, ROLE_TEACHER
+from classroom.utils.json_codec import encode_frame
+from classroom.utils.outbound_queue import OutboundQueue
+
+
+class OutboundQueueTests(SimpleTestCase):
+    """
+    Тесты коалесцирования и сборки batch-кадров.
+    """
+
+    def _run(self, pushes, window=0.01):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        async def scenario():
+            queue = OutboundQueue(send, window)
+            for frame, key in pushes:
+                queue.push(frame, key)
+            await asyncio.sleep(window * 5)
+            queue.close()
+
+        async_to_sync(scenario)()
+        return sent
+
+    def test_burst_is_sent_as_single_batch(self):
+        frames = [encode_frame("chat:send_message", {"text": str(i)}) for i in range(3)]
+        sent = self._run([(frame, None) for frame in frames])
+
+        self.assertEqual(len(sent), 1)
+        batch = json.loads(sent[0])
+        self.assertEqual(batch["type"], "batch")
+        self.assertEqual([item["data"]["text"] for item in batch["data"]], ["0", "1", "2"])
+
+    def test_single_frame_is_sent_unwrapped(self):
+        frame = encode_frame("answer:sent", {"task_id": 1})
+        self.assertEqual(self._run([(frame, ("answer:sent", 1, "2"))]), [frame])
+
+    def test_repeated_key_keeps_latest_at_the_end(self):
+        sent_a = encode_frame("answer:sent", {"task_id": 1, "n": 1})
+        reset_a = encode_frame("answer:reset", {"task_id": 1})
+        sent_b = encode_frame("answer:sent", {"task_id": 1, "n": 2})
+        sent = self._run([
+            (sent_a, ("answer:sent", 1, "2")),
+            (reset_a, ("answer:reset", 1, "2")),
+            (sent_b, ("answer:sent", 1, "2")),
+        ])
+
+        items = json.loads(sent[0])["data"]
+        self.assertEqual([item["type"] for item in items], ["answer:reset", "answer:sent"])
+        self.assertEqual(items[1]["data"]["n"], 2)
+
+    def test_close_drops_pending_frames(self):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        async def scenario():
+            queue = OutboundQueue(send, 0.01)
+            queue.push("{}")
+            queue.close()
+            await asyncio.sleep(0.05)
+
+        async_to_sync(scenario)()
+        self.assertEqual(sent, [])
+
+
+class OutboundLaneTests(SimpleTestCase):
+    """
+    Тесты полосы управляющих кадров и отбрасывания обычных при переполнении.
+    """
+
+    def test_control_frame_is_sent_in_order_without_waiting_window(self):
+        sent = []
+
+        async def send(frame):
+            sent.append((frame, asyncio.get_running_loop().time()))
+
+        async def scenario():
+            queue = OutboundQueue(send, 10)
+            started = asyncio.get_running_loop().time()
+            queue.push(encode_frame("chat:update", {"n": 1}))
+            queue.push(encode_frame("section:change", {"section_id": 5}), control=True)
+            await asyncio.sleep(0.05)
+            queue.close()
+            return started
+
+        started = async_to_sync(scenario)()
+
+        self.assertEqual(len(sent), 1)
+        frame, sent_at = sent[0]
+        self.assertLess(sent_at - started, 1)
+        items = json.loads(frame)["data"]
+        self.assertEqual([item["type"] for item in items], ["chat:update", "section:change"])
+
+    def test_coalesced_and_dropped_seqs_are_reported(self):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        async def scenario():
+            queue = OutboundQueue(send, 0.01, max_pending=2)
+            key = ("answer:sent", 1, "2")
+            queue.push(encode_frame("answer:sent", {"n": 1}), key, seq=1, stream="classroom_1")
+            queue.push(encode_frame("answer:sent", {"n": 2}), key, seq=2, stream="classroom_1")
+            for seq in (3, 4, 5):
+                queue.push(encode_frame("chat:update", {"n": seq}), seq=seq, stream="classroom_1")
+            queue.skip("user_2", 7)
+            await asyncio.sleep(0.05)
+            queue.close()
+
+        async_to_sync(scenario)()
+
+        items = json.loads(sent[0])["data"]
+        self.assertEqual(items[0], {"type": "seq:skip", "data": {"classroom_1": [1, 2, 3], "user_2": [7]}})
+        self.assertEqual([item["data"]["n"] for item in items[1:]], [4, 5])
+
+    def test_overflow_drops_oldest_bulk_frames_only(self):
+        sent = []
+
+        async def send(frame):
+            sent.append(frame)
+
+        async def scenario():
+            queue = OutboundQueue(send, 0.01, max_pending=2)
+            queue.push(encode_frame("lesson:attached", {"lesson_id": 1}), control=True)
+            for n in range(5):
+                queue.push(encode_frame("chat:update", {"n": n}))
+            await asyncio.sleep(0.05)
+            queue.close()
+            return queue.dropped
+
+        dropped = async_to_sync(scenario)()
+
+        self.assertEqual(dropped, 3)
+        items = [json.loads(frame) for frame in sent]
+        items = [item for frame in items for item in (frame["data"] if frame["type"] == "batch" else [frame])]
+        self.assertEqual(items[0]["type"], "lesson:attached")
+        self.assertEqual([item["data"]["n"] for item in items[1:]], [3, 4])
+
+
+class ConsumerBatchingTests(SimpleTestCase):
+    """
+    Тесты коалесцирования answer:sent у учителя.
+    """
+
+    def test_teacher_receives_one_frame_per_student_task(self):
+        sent = []
+
+        async def scenario():
+            teacher = VirtualClassConsumer()
+            teacher.state = ConnectionState(classroom_id="1", user_id=1, role=ROLE_TEACHER)
+
+            async def send(text_data=None, bytes_data=None, close=False):
+                sent.append(text_data)
+
+            teacher.send = send
+            teacher.outbox = OutboundQueue(teacher._send_frame, 0.01)
+
+            for student_id in (2, 3):
+                student = VirtualClassConsumer()
+                student.state = ConnectionState(classroom_id="1", user_id=student_id, role=ROLE_STUDENT)
+                for _ in range(5):
+                    event = student._format_event("student_to_teacher", "answer:sent", 7, str(student_id), {})
+                    await teacher.student_to_teacher_event(event)
+
+            await asyncio.sleep(0.05)
+            teacher.outbox.close()
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(len(sent), 1)
+        items = json.loads(sent[0])["data"]
+        self.assertEqual([item["data"]["student_id"] for item in items], ["2", "3"])
@@ -0,0 +1,87 @@
+"""
+Тесты реестра присутствия учеников в виртуальном классе.
+"""
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from classroom.services.presence import LocalPresence
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+
+
+class LocalPresenceTests(SimpleTestCase):
+    """
+    Тесты процессного реестра присутствия.
+    """
+
+    def setUp(self):
+        self.presence = LocalPresence(ttl=60)
+
+    def test_first_connect_and_last_disconnect(self):
+        """
+        Онлайн-событие — только на первое соединение, офлайн — только на последнее.
+        """
+        self.assertTrue(async_to_sync(self.presence.connect)(1, 10, "chan-a"))
+        self.assertFalse(async_to_sync(self.presence.connect)(1, 10, "chan-b"))
+
+        self.assertFalse(async_to_sync(self.presence.disconnect)(1, 10, "chan-a"))
+        self.assertTrue(async_to_sync(self.presence.disconnect)(1, 10, "chan-b"))
+
+    def test_online_users_scoped_by_classroom(self):
+        async_to_sync(self.presence.connect)(1, 10, "chan-a")
+        async_to_sync(self.presence.connect)(2, 11, "chan-b")
+
+        self.assertEqual(async_to_sync(self.presence.online_users)(1), [10])
+        self.assertEqual(async_to_sync(self.presence.online_users)(2), [11])
+
+    def test_stale_connection_is_reaped(self):
+        """
+        Соединение без heartbeat дольше TTL не удерживает пользователя онлайн.
+        """
+        async_to_sync(self.presence.connect)(1, 10, "dead-chan")
+        self.presence._connections[("1", 10)]["dead-chan"] = time.time() - 120
+
+        self.assertEqual(async_to_sync(self.presence.online_users)(1), [])
+        self.assertTrue(async_to_sync(self.presence.connect)(1, 10, "chan-new"))
+
+
+class ConsumerPresenceTests(ClassroomConsumerTestCase):
+    """
+    Тесты событий присутствия в VirtualClassConsumer.
+    """
+
+    students_count = 1
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+
+    async def test_two_tabs_emit_single_online_and_offline(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+        await teacher.receive_json_from()
+
+        tab_a = self._communicator(self.student)
+        tab_b = self._communicator(self.student)
+        await tab_a.connect()
+        await tab_a.receive_json_from()
+        event = await teacher.receive_json_from()
+        self.assertEqual(event["type"], "user:online:event")
+
+        await tab_b.connect()
+        await tab_b.receive_json_from()
+        self.assertTrue(await teacher.receive_nothing())
+
+        await teacher.send_json_to({"type": "users:online"})
+        response = await teacher.receive_json_from()
+        self.assertEqual(response["data"], [{"student_id": self.student.id, "online": True}])
+
+        await tab_a.disconnect()
+        self.assertTrue(await teacher.receive_nothing())
+
+        await tab_b.disconnect()
+        event = await teacher.receive_json_from()
+        self.assertEqual(event["type"], "user:offline:event")
+
+        await teacher.disconnect()
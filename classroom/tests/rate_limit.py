@@ -0,0 +1,114 @@
+"""
+Тесты ограничения входящих WebSocket-действий.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+from classroom.utils import metrics
+from classroom.utils.rate_limit import InboundLimiter, TokenBucket, reset_classroom_buckets
+
+LIMITS = {
+    "chat:update": {"rate": 10, "burst": 1, "policy": "merge"},
+    "chat:send_message": {"rate": 0.01, "burst": 1, "policy": "reject"},
+    "answer:sent": {"rate": 1, "burst": 2, "policy": "drop", "classroom": {"rate": 1, "burst": 3}},
+}
+
+
+class TokenBucketTests(SimpleTestCase):
+    """
+    Тесты токен-бакета и лимитера соединения.
+    """
+
+    def setUp(self):
+        reset_classroom_buckets()
+
+    def test_bucket_refills_at_rate(self):
+        bucket = TokenBucket(rate=2, burst=2, now=0)
+        for _ in range(2):
+            self.assertEqual(bucket.wait_time(0), 0)
+            bucket.consume()
+        self.assertAlmostEqual(bucket.wait_time(0), 0.5)
+        self.assertEqual(bucket.wait_time(0.5), 0)
+
+    def test_unconfigured_action_is_not_limited(self):
+        limiter = InboundLimiter(1, LIMITS)
+        self.assertTrue(all(limiter.acquire("resume", now=0) == 0 for _ in range(100)))
+
+    def test_classroom_bucket_is_shared_between_connections(self):
+        first = InboundLimiter(1, LIMITS)
+        second = InboundLimiter(1, LIMITS)
+        other_class = InboundLimiter(2, LIMITS)
+
+        self.assertEqual(first.acquire("answer:sent", now=0), 0)
+        self.assertEqual(first.acquire("answer:sent", now=0), 0)
+        self.assertEqual(second.acquire("answer:sent", now=0), 0)
+        self.assertGreater(second.acquire("answer:sent", now=0), 0)
+        self.assertEqual(other_class.acquire("answer:sent", now=0), 0)
+
+
+@override_settings(CLASSROOM_RATE_LIMITS=LIMITS)
+class ConsumerRateLimitTests(ClassroomConsumerTestCase):
+    """
+    Тесты политик reject, drop и merge в VirtualClassConsumer.
+    """
+
+    def setUp(self):
+        super().setUp()
+        reset_classroom_buckets()
+        metrics.reset()
+
+    async def test_reject_replies_rate_limited(self):
+        student = self._communicator(self.students[0])
+        await student.connect()
+
+        for n in range(2):
+            await student.send_json_to({"type": "chat:send_message", "data": {"text": "hi", "request_id": n}})
+        frame = await self._receive_type(student, "rate_limited")
+
+        self.assertEqual(frame["data"]["action"], "chat:send_message")
+        self.assertEqual(frame["data"]["request_id"], 1)
+        self.assertGreater(frame["data"]["retry_after_ms"], 0)
+        self.assertEqual(metrics.snapshot()["ws_inbound_rejected:chat:send_message"], 1)
+
+        await student.disconnect()
+
+    async def test_merge_delivers_only_latest_typing_update(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+        student = self._communicator(self.students[0])
+        await student.connect()
+
+        for n in range(4):
+            await student.send_json_to({"type": "chat:update", "data": {"n": n}})
+
+        first = await self._receive_type(teacher, "chat:update")
+        merged = await self._receive_type(teacher, "chat:update")
+
+        self.assertEqual(first["data"]["payload"]["n"], 0)
+        self.assertEqual(merged["data"]["payload"]["n"], 3)
+        self.assertTrue(await teacher.receive_nothing(0.2))
+        counters = metrics.snapshot()
+        self.assertEqual(counters["ws_inbound_deferred:chat:update"], 1)
+        self.assertEqual(counters["ws_inbound_merged:chat:update"], 2)
+
+        await student.disconnect()
+        await teacher.disconnect()
+
+    async def test_drop_discards_silently(self):
+        teacher = self._communicator(self.teacher)
+        await teacher.connect()
+        student = self._communicator(self.students[0])
+        await student.connect()
+        await self._receive_type(student, "connected")
+
+        for n in range(3):
+            await student.send_json_to({"type": "answer:sent", "data": {"task_id": n}})
+
+        received = [(await self._receive_type(teacher, "answer:sent"))["data"]["task_id"] for _ in range(2)]
+        self.assertEqual(received, [0, 1])
+        self.assertTrue(await teacher.receive_nothing(0.2))
+        self.assertTrue(await student.receive_nothing(0.1))
+        self.assertEqual(metrics.snapshot()["ws_inbound_dropped:answer:sent"], 1)
+
+        await student.disconnect()
+        await teacher.disconnect()
@@ -0,0 +1,105 @@
+"""
+Тесты кеша состава класса.
+"""
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from classroom.models import Classroom
+from classroom.services import check_user_access
+from classroom.services import roster as roster_service
+from classroom.services.roster import (
+    aget_role, aget_roster, get_roster, get_role, roster_cache, ROLE_TEACHER, ROLE_STUDENT,
+)
+from classroom.tests.fixtures import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RosterCacheTests(TestCase):
+    """
+    Тесты сервиса состава класса.
+    """
+
+    def setUp(self):
+        cache.clear()
+        roster_cache.clear_local()
+        self.teacher = User.objects.create_user(username="teacher", password="testpass")
+        self.student = User.objects.create_user(username="student", password="testpass")
+        self.outsider = User.objects.create_user(username="outsider", password="testpass")
+        self.classroom = Classroom.objects.create(title="Класс", teacher=self.teacher, join_password="pw")
+        self.classroom.students.add(self.student)
+
+    def test_roles(self):
+        self.assertEqual(get_role(self.classroom.id, self.teacher.id), ROLE_TEACHER)
+        self.assertEqual(get_role(self.classroom.id, self.student.id), ROLE_STUDENT)
+        self.assertIsNone(get_role(self.classroom.id, self.outsider.id))
+        self.assertIsNone(get_roster(999999))
+
+    def test_cached_roster_skips_database(self):
+        get_roster(self.classroom.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(self.classroom.id, self.student.id), ROLE_STUDENT)
+            self.assertTrue(check_user_access(self.teacher, self.classroom, self.student))
+
+    async def test_async_roles(self):
+        self.assertEqual(await aget_role(self.classroom.id, self.teacher.id), ROLE_TEACHER)
+        self.assertEqual(await aget_role(self.classroom.id, self.student.id), ROLE_STUDENT)
+        self.assertIsNone(await aget_role(self.classroom.id, self.outsider.id))
+        self.assertIsNone(await aget_roster(999999))
+
+    async def test_concurrent_async_misses_share_one_load(self):
+        """
+        Одновременное подключение всего класса загружает состав один раз.
+        """
+        loads = []
+        original = roster_service._aload_roster
+
+        async def counting_load(classroom_id):
+            loads.append(classroom_id)
+            await asyncio.sleep(0.01)
+            return await original(classroom_id)
+
+        with mock.patch.object(roster_service, "_aload_roster", counting_load):
+            rosters = await asyncio.gather(*(aget_roster(self.classroom.id) for _ in range(20)))
+
+        self.assertEqual(loads, [self.classroom.id])
+        self.assertTrue(all(r.is_student(self.student.id) for r in rosters))
+        self.assertEqual(roster_service._inflight, {})
+
+    def test_join_invalidates_roster(self):
+        """
+        После вступления ученик сразу получает доступ,
+        даже если локальная копия состава устарела.
+        """
+        get_roster(self.classroom.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.join(self.outsider, "pw")
+
+        self.assertEqual(get_role(self.classroom.id, self.outsider.id), ROLE_STUDENT)
+
+    def test_remove_student_invalidates_roster(self):
+        get_roster(self.classroom.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.remove_student(self.student)
+
+        self.assertIsNone(get_role(self.classroom.id, self.student.id))
+
+    def test_delete_invalidates_roster(self):
+        classroom_id = self.classroom.id
+        get_roster(classroom_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.delete()
+
+        self.assertIsNone(get_roster(classroom_id))
+
+    def test_check_user_access(self):
+        self.assertTrue(check_user_access(self.teacher, self.classroom, self.student))
+        self.assertTrue(check_user_access(self.teacher, self.classroom, self.teacher))
+        self.assertTrue(check_user_access(self.student, self.classroom, self.student))
+        self.assertFalse(check_user_access(self.student, self.classroom, self.teacher))
+        self.assertFalse(check_user_access(self.outsider, self.classroom, self.student))
@@ -0,0 +1,121 @@
+"""
+Тесты загрузки ответов раздела.
+"""
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+
+from classroom.services.answers import get_section_answer_payloads, save_user_answer
+from classroom.tests.fixtures import ClassroomTestCase, create_fill_gaps_task, create_true_false_task
+from classroom.views import get_section_answers, get_section_answers_bundle
+from courses.models import Lesson, Section
+
+
+class SectionAnswersTests(ClassroomTestCase):
+    """
+    Тесты выборки ответов раздела одним запросом на тип задания.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.students[0]
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        create_fill_gaps_task(self.section)
+        create_true_false_task(self.section)
+        # задания раздела и по запросу на каждый из двух типов
+        with self.assertNumQueries(3):
+            get_section_answer_payloads(self.classroom, self.section, self.student)
+
+        for _ in range(3):
+            task = create_fill_gaps_task(self.section)
+            save_user_answer(self.classroom, task, self.student, {"gap-0": "cat"})
+            create_true_false_task(self.section)
+        with self.assertNumQueries(3):
+            payloads = get_section_answer_payloads(self.classroom, self.section, self.student)
+        self.assertEqual(len(payloads), 8)
+
+    def test_view_keeps_response_shape(self):
+        fill_gaps = create_fill_gaps_task(self.section)
+        true_false = create_true_false_task(self.section)
+        save_user_answer(self.classroom, fill_gaps, self.student, {"gap-0": "cat"})
+        save_user_answer(self.classroom, fill_gaps, self.students[1], {"gap-0": "dog"})
+
+        request = RequestFactory().get("/", {
+            "section_id": self.section.id, "classroom_id": self.classroom.id, "user_id": self.student.id,
+        })
+        request.user = self.teacher
+        data = json.loads(get_section_answers(request).content)
+
+        self.assertEqual(data["section_id"], str(self.section.id))
+        self.assertEqual(data["answers"], [
+            {
+                "task_id": str(fill_gaps.id),
+                "task_type": "fill_gaps",
+                "answer": {"answers": {"0": {"value": "cat", "is_correct": True}}},
+            },
+            {"task_id": str(true_false.id), "task_type": "true_false", "answer": None},
+        ])
+
+
+class SectionAnswersBundleTests(ClassroomTestCase):
+    """
+    Тесты ответов раздела всех учеников для панели учителя.
+    """
+
+    students_count = 3
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def _get(self, user, section=None):
+        request = self.factory.get("/")
+        request.user = user
+        return get_section_answers_bundle(request, self.classroom.id, (section or self.section).id)
+
+    def test_bundle_is_keyed_by_user_and_task(self):
+        fill_gaps = create_fill_gaps_task(self.section)
+        true_false = create_true_false_task(self.section)
+        for student, word in zip(self.students, ("cat", "dog", "cow")):
+            save_user_answer(self.classroom, fill_gaps, student, {"gap-0": word})
+        save_user_answer(self.classroom, true_false, self.students[0], {"answers": [
+            {"statement_index": 0, "selected_value": True},
+        ]})
+
+        # класс, раздел, задания и по запросу на каждый из двух типов
+        with self.assertNumQueries(5):
+            response = self._get(self.teacher)
+            data = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(data["section_id"], str(self.section.id))
+        self.assertEqual(data["tasks"], [
+            {"task_id": str(fill_gaps.id), "task_type": "fill_gaps"},
+            {"task_id": str(true_false.id), "task_type": "true_false"},
+        ])
+        first, second = (str(student.id) for student in self.students[:2])
+        self.assertEqual(set(data["answers"][first]), {str(fill_gaps.id), str(true_false.id)})
+        self.assertEqual(
+            data["answers"][second][str(fill_gaps.id)],
+            {"answers": {"0": {"value": "dog", "is_correct": False}}},
+        )
+        self.assertEqual(len(data["answers"]), 3)
+
+    def test_empty_section(self):
+        data = json.loads(b"".join(self._get(self.teacher).streaming_content))
+        self.assertEqual(data, {"section_id": str(self.section.id), "tasks": [], "answers": {}})
+
+    def test_student_is_denied(self):
+        self.assertEqual(self._get(self.students[0]).status_code, 403)
+
+    @override_settings(ROOT_URLCONF="classroom.urls")
+    def test_anonymous_is_redirected_to_login(self):
+        self.assertEqual(self._get(AnonymousUser()).status_code, 302)
+
+    def test_section_of_another_lesson_is_not_found(self):
+        lesson = Lesson.objects.create(course=self.section.lesson.course, title="Другой урок")
+        section = Section.objects.create(lesson=lesson, title="Чужой раздел", order=1)
+        with self.assertRaises(Http404):
+            self._get(self.teacher, section)
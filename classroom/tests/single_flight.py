@@ -0,0 +1,188 @@
+"""
+Тесты схлопывания одинаковых одновременных запросов.
+"""
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from classroom.tests.fixtures import LOCMEM_CACHES
+from classroom.utils.single_flight import SingleFlight, _request_key, single_flight
+
+
+class SingleFlightTests(SimpleTestCase):
+    """
+    Тесты процессного схлопывания.
+    """
+
+    def test_concurrent_calls_share_one_computation(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        def worker():
+            results.append(flight.do("key", compute))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_error_is_not_shared_and_key_is_released(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+
+    def test_unshareable_result_is_recomputed_by_followers(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def leader_compute():
+            started.set()
+            release.wait(5)
+            return 500
+
+        leader = threading.Thread(target=lambda: results.append(
+            flight.do("key", leader_compute, shareable=lambda status: status == 200)
+        ))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(
+            flight.do("key", lambda: 200, shareable=lambda status: status == 200)
+        ))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in (leader, follower):
+            thread.join(5)
+
+        self.assertEqual(sorted(results), [200, 500])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingleFlightDecoratorTests(SimpleTestCase):
+    """
+    Тесты декоратора представлений.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+
+    def _view(self, **options):
+        @single_flight(vary_on_user=None, **options)
+        def view(request, item_id):
+            self.calls += 1
+            return JsonResponse({"item": item_id, "calls": self.calls})
+        return view
+
+    def test_headers_and_cookies_are_kept(self):
+        @single_flight(vary_on_user=None)
+        def view(request):
+            response = JsonResponse({"ok": True})
+            response["Cache-Control"] = "no-store"
+            response.set_cookie("hint", "1", max_age=60)
+            return response
+
+        response = view(self.factory.get("/items/"))
+
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.cookies["hint"].value, "1")
+        self.assertEqual(response.cookies["hint"]["max-age"], 60)
+
+    def test_error_response_is_not_stored_for_followers(self):
+        @single_flight(vary_on_user=None, shared=True, result_ttl=30)
+        def view(request):
+            return JsonResponse({"error": "boom"}, status=500)
+
+        request = self.factory.get("/items/")
+        key = _request_key(f"{view.__module__}.{view.__name__}", request, None)
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            response = view(request)
+
+        self.assertEqual(response.status_code, 500)
+        stored = [call.args[0] for call in cache_set.call_args_list]
+        self.assertFalse(any(name.startswith(f"single_flight:result:{key}") for name in stored))
+
+    def test_each_caller_gets_own_response(self):
+        view = self._view()
+        first = view(self.factory.get("/items/1/"), item_id=1)
+        second = view(self.factory.get("/items/1/"), item_id=1)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first["Content-Type"], "application/json")
+        self.assertEqual(self.calls, 2)
+
+    def _lock_key(self, view, item_id):
+        request = self.factory.get(f"/items/{item_id}/")
+        key = _request_key(f"{view.__module__}.{view.__name__}", request, None)
+        return key, f"single_flight:lock:{key}"
+
+    def test_shared_mode_does_not_reuse_finished_result(self):
+        view = self._view(shared=True, result_ttl=30)
+        first = view(self.factory.get("/items/1/"), item_id=1)
+        second = view(self.factory.get("/items/1/"), item_id=1)
+
+        self.assertNotEqual(first.content, second.content)
+        self.assertEqual(self.calls, 2)
+
+    def test_follower_gets_result_of_running_leader(self):
+        view = self._view(shared=True, lock_ttl=5)
+        key, lock_key = self._lock_key(view, 1)
+        cache.set(lock_key, "leader", 5)
+        cache.set(f"single_flight:result:{key}:leader", (200, b'{"item": 1}', [("Content-Type", "application/json")], []), 5)
+
+        response = view(self.factory.get("/items/1/"), item_id=1)
+
+        self.assertEqual(response.content, b'{"item": 1}')
+        self.assertEqual(self.calls, 0)
+
+    def test_follower_computes_when_lock_released_without_result(self):
+        view = self._view(shared=True, lock_ttl=5)
+        _, lock_key = self._lock_key(view, 1)
+        cache.set(lock_key, "leader", 5)
+        timer = threading.Timer(0.1, cache.delete, args=(lock_key,))
+        timer.start()
+
+        started = time.monotonic()
+        response = view(self.factory.get("/items/1/"), item_id=1)
+        timer.join()
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.calls, 1)
+        self.assertIn(b'"item": 1', response.content)
+
+    def test_post_is_not_coalesced(self):
+        view = self._view(shared=True, result_ttl=30)
+        view(self.factory.post("/items/1/"), item_id=1)
+        view(self.factory.post("/items/1/"), item_id=1)
+
+        self.assertEqual(self.calls, 2)
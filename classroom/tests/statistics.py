@@ -0,0 +1,93 @@
+"""
+Тесты статистики класса: снимок раздела и push-обновления учителю.
+"""
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.test import RequestFactory
+
+from classroom.services.statistics import get_section_statistics
+from classroom.tests.fixtures import ClassroomTestCase, create_true_false_task
+from classroom.views import save_answer, mark_answer_as_checked
+
+
+class SectionStatisticsTests(ClassroomTestCase):
+    """
+    Тесты сервиса статистики раздела.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def _post(self, view, user, body):
+        request = self.factory.post("/", data=json.dumps(body), content_type="application/json")
+        request.user = user
+        return view(request, self.classroom.id)
+
+    def test_snapshot_query_count_does_not_grow_with_tasks(self):
+        create_true_false_task(self.section)
+        with self.assertNumQueries(3):
+            get_section_statistics(self.classroom, self.section)
+
+        for _ in range(4):
+            create_true_false_task(self.section)
+        with self.assertNumQueries(3):
+            tasks = get_section_statistics(self.classroom, self.section)
+        self.assertEqual(len(tasks), 5)
+
+    def test_checked_answer_is_pushed_to_teacher(self):
+        task = create_true_false_task(self.section)
+        student = self.students[0]
+
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"classroom_{self.classroom.id}_teacher", channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post(save_answer, student, {
+                "task_id": task.id,
+                "user_id": student.id,
+                "data": {"answers": [
+                    {"statement_index": 0, "selected_value": True},
+                    {"statement_index": 1, "selected_value": True},
+                ]},
+            })
+        async_to_sync(layer.receive)(channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post(mark_answer_as_checked, self.teacher, {"task_id": task.id, "user_id": student.id})
+        message = async_to_sync(layer.receive)(channel)
+
+        self.assertEqual(message["type"], "statistics_event")
+        frame = json.loads(message["frame"])
+        self.assertEqual(frame["type"], "statistics:update")
+        self.assertEqual(frame["data"]["section_id"], self.section.id)
+        self.assertEqual(frame["data"]["rows"], [{
+            "user": {"id": student.id, "username": student.display_name},
+            "correct_answers": 1,
+            "wrong_answers": 1,
+            "success_percentage": 33,
+            "task_id": task.id,
+        }])
+
+        snapshot = get_section_statistics(self.classroom, self.section)[0]["statistics"]
+        row = next(r for r in snapshot if r["user"]["id"] == student.id)
+        self.assertEqual(row["success_percentage"], 33)
+
+    def test_publish_failure_after_commit_does_not_fail_save(self):
+        task = create_true_false_task(self.section)
+        student = self.students[0]
+
+        with mock.patch("classroom.services.event_log.get_event_log", side_effect=ConnectionError("redis down")):
+            with self.assertLogs("classroom.services.event_log", level="ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self._post(save_answer, student, {
+                        "task_id": task.id,
+                        "user_id": student.id,
+                        "data": {"answers": [{"statement_index": 0, "selected_value": True}]},
+                    })
+
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,75 @@
+"""
+Тесты формата исходящих кадров: JSON и подпротокол MessagePack.
+"""
+import json
+
+import msgpack
+from django.test import SimpleTestCase, override_settings
+
+from classroom.tests.fixtures import ClassroomConsumerTestCase
+from classroom.utils.json_codec import encode_frame
+from classroom.utils.outbound_queue import build_batch
+from classroom.utils.wire_format import (
+    PACK_CACHE_MAX_FRAME, SUBPROTOCOL_MSGPACK, _pack_cached, negotiate, pack_batch, pack_frame,
+)
+
+
+class WireFormatTests(SimpleTestCase):
+    """
+    Тесты перекодирования кадров в MessagePack.
+    """
+
+    def test_frame_keeps_structure(self):
+        frame = encode_frame("answer:sent", {"task_id": 7, "payload": {"text": "Привет", "ok": True}})
+        self.assertEqual(msgpack.unpackb(pack_frame(frame)), json.loads(frame))
+
+    def test_batch_matches_json_batch(self):
+        frames = [encode_frame("chat:update", {"n": n}) for n in range(3)]
+        self.assertEqual(msgpack.unpackb(pack_batch(frames)), json.loads(build_batch(frames)))
+        self.assertEqual(pack_batch(frames[:1]), pack_frame(frames[0]))
+
+    def test_large_frames_are_not_cached(self):
+        small = encode_frame("chat:update", {"text": "x"})
+        large = encode_frame("lesson:attached", {"snapshot": "x" * PACK_CACHE_MAX_FRAME})
+        _pack_cached.cache_clear()
+
+        pack_frame(small)
+        self.assertEqual(msgpack.unpackb(pack_frame(large)), json.loads(large))
+        self.assertEqual(_pack_cached.cache_info().currsize, 1)
+
+    def test_negotiate(self):
+        self.assertEqual(negotiate(["other", SUBPROTOCOL_MSGPACK]), SUBPROTOCOL_MSGPACK)
+        self.assertIsNone(negotiate([]))
+        self.assertIsNone(negotiate(None))
+        with override_settings(CLASSROOM_WS_MSGPACK=False):
+            self.assertIsNone(negotiate([SUBPROTOCOL_MSGPACK]))
+
+
+class ConsumerWireTests(ClassroomConsumerTestCase):
+    """
+    Тесты согласования подпротокола в VirtualClassConsumer.
+    """
+
+    async def test_msgpack_client_receives_binary_frames(self):
+        teacher = self._communicator(self.teacher, [SUBPROTOCOL_MSGPACK])
+        connected, subprotocol = await teacher.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, SUBPROTOCOL_MSGPACK)
+        frame = msgpack.unpackb(await teacher.receive_from())
+        self.assertEqual(frame["type"], "connected")
+
+        student = self._communicator(self.students[0])
+        await student.connect()
+        self.assertEqual(json.loads(await student.receive_from())["type"], "connected")
+
+        frame = msgpack.unpackb(await teacher.receive_from())
+        self.assertEqual(frame["type"], "user:online:event")
+        self.assertEqual(frame["data"]["student_id"], str(self.students[0].id))
+
+        await student.send_json_to({"type": "chat:update", "data": {"student_id": "all"}})
+        frame = msgpack.unpackb(await teacher.receive_from())
+        self.assertEqual(frame["type"], "chat:update")
+        self.assertEqual(frame["data"]["payload"], {"student_id": "all"})
+
+        await student.disconnect()
+        await teacher.disconnect()
@@ -20,8 +20,10 @@ urlpatterns = [
 
     path("<int:classroom_id>/save-answer/", views.save_answer, name="save_answer"),
     path("<int:classroom_id>/mark-answer-as-checked/", views.mark_answer_as_checked, name="mark_answer_as_checked"),
+    path("<int:classroom_id>/mark-task-answers-as-checked/", views.mark_task_answers_as_checked, name="mark_task_answers_as_checked"),
     path("get-section-answers/", views.get_section_answers, name="get_section_answers"),
     path("get-task-answer/", views.get_task_answer, name="get_task_answer"),
+    path("<int:classroom_id>/section/<int:section_id>/answers/", views.get_section_answers_bundle, name="section_answers_bundle"),
     path("<int:classroom_id>/task/<int:task_id>/user/<int:user_id>/delete-answers/", views.delete_user_task_answers, name="delete_user_task_answers"),
     path("<int:classroom_id>/task/<int:task_id>/delete-all-answers/", views.delete_classroom_task_answers, name="delete_classroom_task_answers"),
     path("<int:classroom_id>/section/<int:section_id>/statistics/", views.get_classroom_section_statistics, name="classroom_section_statistics"),
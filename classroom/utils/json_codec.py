@@ -0,0 +1,61 @@
+"""
+JSON-кодек для WebSocket-кадров виртуального класса.
+
+Кодировщик выбирается настройкой CLASSROOM_JSON_ENCODER:
+    "auto"   — orjson, если установлен, иначе стандартный json
+    "orjson" — только orjson
+    "json"   — только стандартный json
+"""
+import json
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode("utf-8")
+
+
+ENCODERS = {
+    "json": _json_dumps,
+}
+if orjson is not None:
+    ENCODERS["orjson"] = _orjson_dumps
+
+
+def get_encoder(name=None):
+    """
+    Возвращает функцию obj -> str для указанного (или настроенного) кодировщика.
+    """
+    name = name or getattr(settings, "CLASSROOM_JSON_ENCODER", "auto")
+    if name == "auto":
+        return ENCODERS.get("orjson", _json_dumps)
+    if name not in ENCODERS:
+        raise ValueError(f"JSON encoder '{name}' is not available")
+    return ENCODERS[name]
+
+
+def dumps(obj) -> str:
+    return get_encoder()(obj)
+
+
+def loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def encode_frame(frame_type, data) -> str:
+    """
+    Кодирует клиентский кадр {"type": ..., "data": ...} один раз,
+    чтобы получатели group_send отправляли его без повторной сериализации.
+    """
+    return dumps({"type": frame_type, "data": data})
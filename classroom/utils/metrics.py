@@ -0,0 +1,29 @@
+"""
+Процессные счётчики виртуального класса.
+
+Лёгкий реестр без внешних зависимостей: consumer и очереди увеличивают
+счётчики, snapshot() читают только тесты и стенды (bench_load), которые
+гоняют соединения в своём же процессе. Счётчики не покидают процесс и
+никуда не экспортируются, поэтому по боевым воркерам их не собрать. Имена
+вида "ws_inbound_rejected:chat:update".
+"""
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot() -> dict:
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
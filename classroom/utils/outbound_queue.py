@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+
+from classroom.utils import metrics
+from classroom.utils.json_codec import encode_frame
+
+
+class OutboundQueue:
+    """
+    Исходящая очередь одного WebSocket-соединения с микробатчингом.
+
+    Кадры (уже закодированные JSON-строки) копятся в течение окна window
+    и отправляются одним кадром {"type": "batch", "data": [...]}.
+    Кадры с одинаковым ключом коалесцируются: остаётся последний,
+    и он переносится в конец, чтобы сохранить порядок итогового состояния.
+    Кадр без ключа никогда не схлопывается.
+
+    Управляющие кадры (control=True) отправляются без ожидания окна
+    вместе с уже накопленными, в порядке поступления: кадры несут seq,
+    и обгон более ранних событий клиент принял бы за пропуск.
+    Обычных кадров хранится не больше max_pending: при переполнении
+    старшие отбрасываются (счётчик dropped), управляющие — никогда.
+    Номера seq схлопнутых, отброшенных и отфильтрованных соединением
+    кадров уходят в начале ближайшей отправки кадром seq:skip
+    {stream: [seq, ...]}, чтобы клиент не запрашивал их через resume.
+    """
+
+    __slots__ = (
+        "_send", "window", "max_pending", "dropped", "_control", "_frames",
+        "_counter", "_flush_task", "_flush_urgent", "_closed", "_batch",
+        "_seqs", "_skipped",
+    )
+
+    def __init__(self, send, window, max_pending=None, batch=None):
+        self._send = send
+        self._batch = batch or build_batch
+        self.window = window
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._control = set()
+        self._frames = OrderedDict()
+        self._seqs = {}
+        self._skipped = {}
+        self._counter = itertools.count()
+        self._flush_task = None
+        self._flush_urgent = False
+        self._closed = False
+
+    def __len__(self):
+        return len(self._frames)
+
+    def push(self, frame, key=None, control=False, seq=None, stream=None):
+        if self._closed:
+            return
+        if key is None:
+            key = ("_", next(self._counter))
+        else:
+            key = (control, key)
+            if self._frames.pop(key, None) is not None:
+                self._skip(key)
+        self._frames[key] = frame
+        if seq is not None:
+            self._seqs[key] = (stream, seq)
+        if control:
+            self._control.add(key)
+
+        if not control and self.max_pending and len(self._frames) - len(self._control) > self.max_pending:
+            oldest = next(k for k in self._frames if k not in self._control)
+            del self._frames[oldest]
+            self._skip(oldest)
+            self.dropped += 1
+            metrics.incr("ws_outbox_dropped")
+
+        self._schedule(urgent=control)
+
+    def skip(self, stream, seq):
+        """
+        Отмечает seq потока, который соединение не отправит клиенту.
+        """
+        if self._closed:
+            return
+        self._skipped.setdefault(stream, []).append(seq)
+        self._schedule(urgent=False)
+
+    def _skip(self, key):
+        stamp = self._seqs.pop(key, None)
+        if stamp is not None:
+            self._skipped.setdefault(stamp[0], []).append(stamp[1])
+
+    def _schedule(self, urgent):
+        if self._flush_task is not None:
+            if not urgent or self._flush_urgent:
+                return
+            self._flush_task.cancel()
+        self._flush_urgent = urgent
+        self._flush_task = asyncio.create_task(self._flush_later(0 if urgent else self.window))
+
+    async def _flush_later(self, delay):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._flush_task = None
+        self._flush_urgent = False
+        await self.flush()
+
+    async def flush(self):
+        if not self._frames and not self._skipped:
+            return
+        frames = list(self._frames.values())
+        if self._skipped:
+            frames.insert(0, encode_frame("seq:skip", {
+                stream: sorted(seqs) for stream, seqs in self._skipped.items()
+            }))
+            self._skipped.clear()
+        self._control.clear()
+        self._frames.clear()
+        self._seqs.clear()
+        await self._send(self._batch(frames))
+
+    def close(self):
+        self._closed = True
+        self._control.clear()
+        self._frames.clear()
+        self._seqs.clear()
+        self._skipped.clear()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+
+def build_batch(frames):
+    """
+    Склеивает закодированные кадры в batch-кадр без повторной сериализации.
+    Один кадр отправляется как есть.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    return '{"type":"batch","data":[' + ",".join(frames) + "]}"
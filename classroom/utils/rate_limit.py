@@ -0,0 +1,142 @@
+"""
+Ограничение входящих WebSocket-действий токен-бакетами.
+
+Правила задаются настройкой CLASSROOM_RATE_LIMITS по типу действия;
+ключ "*" — общий бакет соединения для всех остальных действий:
+
+    "chat:update": {
+        "rate": 5, "burst": 5,          # токенов в секунду и ёмкость бакета
+        "policy": "merge",              # reject | drop | merge
+        "classroom": {"rate": 50, "burst": 100},  # общий бакет класса
+    }
+
+Политики при исчерпании бакета:
+    reject — действие отклоняется, клиент получает кадр rate_limited
+    drop   — действие молча отбрасывается
+    merge  — сохраняется только последнее действие с тем же ключом
+             (task_id, student_id) и выполняется, когда появится токен
+
+Бакеты класса живут в памяти воркера: лимит класса действует в пределах
+процесса, а не всего развёртывания.
+"""
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+POLICY_REJECT = "reject"
+POLICY_DROP = "drop"
+POLICY_MERGE = "merge"
+
+DEFAULT_RULE_KEY = "*"
+
+DEFAULT_RATE_LIMITS = {
+    "chat:update": {"rate": 5, "burst": 5, "policy": POLICY_MERGE, "classroom": {"rate": 50, "burst": 100}},
+    "answer:sent": {"rate": 5, "burst": 10, "policy": POLICY_MERGE, "classroom": {"rate": 100, "burst": 200}},
+    "chat:send_message": {"rate": 1, "burst": 5, "policy": POLICY_REJECT},
+    DEFAULT_RULE_KEY: {"rate": 10, "burst": 30, "policy": POLICY_REJECT},
+}
+
+CLASSROOM_BUCKETS_MAX = 10000
+
+
+def get_rate_limits() -> dict:
+    return getattr(settings, "CLASSROOM_RATE_LIMITS", DEFAULT_RATE_LIMITS)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def wait_time(self, now) -> float:
+        """
+        Секунд до появления токена; 0 — токен есть сейчас.
+        """
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+_classroom_buckets = OrderedDict()
+
+
+def _classroom_bucket(classroom_id, rule_key, rule, now):
+    key = (str(classroom_id), rule_key)
+    bucket = _classroom_buckets.get(key)
+    if bucket is None:
+        bucket = TokenBucket(rule["rate"], rule["burst"], now)
+        _classroom_buckets[key] = bucket
+        if len(_classroom_buckets) > CLASSROOM_BUCKETS_MAX:
+            _classroom_buckets.popitem(last=False)
+    else:
+        _classroom_buckets.move_to_end(key)
+    return bucket
+
+
+def reset_classroom_buckets():
+    _classroom_buckets.clear()
+
+
+class InboundLimiter:
+    """
+    Бакеты одного соединения плюс общие бакеты его класса.
+    """
+
+    __slots__ = ("classroom_id", "limits", "_buckets")
+
+    def __init__(self, classroom_id, limits=None):
+        self.classroom_id = classroom_id
+        self.limits = get_rate_limits() if limits is None else limits
+        self._buckets = {}
+
+    def _rule_key(self, action):
+        if action in self.limits:
+            return action
+        if DEFAULT_RULE_KEY in self.limits:
+            return DEFAULT_RULE_KEY
+        return None
+
+    def policy(self, action) -> str:
+        rule_key = self._rule_key(action)
+        if rule_key is None:
+            return POLICY_REJECT
+        return self.limits[rule_key].get("policy", POLICY_REJECT)
+
+    def acquire(self, action, now=None) -> float:
+        """
+        Списывает токен за действие. Возвращает 0, если действие разрешено,
+        иначе число секунд до следующего токена (ничего не списывается).
+        """
+        rule_key = self._rule_key(action)
+        if rule_key is None:
+            return 0.0
+        rule = self.limits[rule_key]
+        now = time.monotonic() if now is None else now
+
+        bucket = self._buckets.get(rule_key)
+        if bucket is None:
+            bucket = self._buckets[rule_key] = TokenBucket(rule["rate"], rule["burst"], now)
+        wait = bucket.wait_time(now)
+
+        classroom_bucket = None
+        if "classroom" in rule:
+            classroom_bucket = _classroom_bucket(self.classroom_id, rule_key, rule["classroom"], now)
+            wait = max(wait, classroom_bucket.wait_time(now))
+
+        if wait > 0:
+            return wait
+        bucket.consume()
+        if classroom_bucket is not None:
+            classroom_bucket.consume()
+        return 0.0
@@ -0,0 +1,209 @@
+import functools
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("event", "result", "shared")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.shared = False
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых одновременных вычислений внутри процесса:
+    первый вызов с ключом выполняет fn(), остальные ждут и получают его результат.
+
+    Результат, для которого shareable(result) ложно, и ошибка ведущего
+    ожидающим не передаются: каждый из них выполняет fn() сам.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=10, shareable=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.event.wait(timeout) or not call.shared:
+                return fn()
+            return call.result
+
+        try:
+            call.result = fn()
+            call.shared = shareable is None or shareable(call.result)
+            return call.result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+_flight = SingleFlight()
+
+
+def _freeze(response):
+    """
+    Снимок ответа для передачи другим вызывающим: статус, тело, заголовки и cookies.
+    """
+    return (
+        response.status_code,
+        response.content,
+        list(response.items()),
+        [morsel.copy() for morsel in response.cookies.values()],
+    )
+
+
+def _thaw(result):
+    status, content, headers, cookies = result
+    response = HttpResponse(content, status=status)
+    for name, value in headers:
+        response[name] = value
+    for morsel in cookies:
+        response.cookies[morsel.key] = morsel.copy()
+    return response
+
+
+def _shareable(result):
+    """
+    Делиться можно только успешным ответом без cookies: ошибку ведомые
+    получают заново, а cookies относятся к запросу ведущего.
+    """
+    status, _, _, cookies = result
+    return status == 200 and not cookies
+
+
+def _shared_cache():
+    return caches[getattr(settings, "SINGLE_FLIGHT_CACHE_ALIAS", "default")]
+
+
+def _run_shared(key, compute, lock_ttl, result_ttl):
+    """
+    Межпроцессное схлопывание через общий кеш: короткая блокировка
+    (cache.add) с токеном ведущего. Результат ведущего хранится под ключом
+    его токена и достаётся только тем, кто ждал эту блокировку; запрос,
+    пришедший после снятия блокировки, вычисляет ответ заново.
+    Ведомые следят и за блокировкой: если она снята без результата
+    (ответ не для общего доступа или ошибка), вычисляют сами, не дожидаясь lock_ttl.
+    Ошибки кеша не мешают ответу: вычисление выполняется локально.
+    """
+    lock_key = f"single_flight:lock:{key}"
+
+    try:
+        cache = _shared_cache()
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, lock_ttl):
+            return _wait_leader(cache, key, lock_key, compute, lock_ttl)
+    except Exception as e:
+        logger.warning("Single-flight shared cache failed for %s: %s", key, e)
+        return compute()
+
+    try:
+        result = compute()
+        if _shareable(result):
+            cache.set(f"single_flight:result:{key}:{token}", result, result_ttl)
+        return result
+    finally:
+        try:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception:
+            pass
+
+
+def _wait_leader(cache, key, lock_key, compute, lock_ttl):
+    leader = cache.get(lock_key)
+    if leader is None:
+        return compute()
+
+    result_key = f"single_flight:result:{key}:{leader}"
+    deadline = time.monotonic() + lock_ttl
+    while time.monotonic() < deadline:
+        time.sleep(0.02)
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached
+        if cache.get(lock_key) != leader:
+            return cache.get(result_key) or compute()
+    return compute()
+
+
+def _request_key(view_name, request, vary_on_user):
+    parts = [view_name, request.path, request.GET.urlencode()]
+    user = getattr(request, "user", None)
+    if vary_on_user == "user":
+        parts.append(str(getattr(user, "id", None)))
+    elif vary_on_user == "auth":
+        parts.append(str(bool(user and user.is_authenticated)))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def single_flight(vary_on_user="user", shared=False, lock_ttl=None, result_ttl=None):
+    """
+    Декоратор для GET-представлений: одновременные одинаковые запросы
+    разделяют одно вычисление ответа.
+
+    vary_on_user:
+        "user" — ключ включает id пользователя (ответ зависит от прав)
+        "auth" — ключ включает только признак аутентификации
+        None   — ответ одинаков для всех
+    shared:
+        True — схлопывание и между воркерами через короткую блокировку в Redis;
+        успешный ответ ведущего доступен ждавшим его запросам result_ttl
+        секунд, но не служит кешем для новых запросов.
+
+    Ведомым передаётся только ответ 200 без cookies; при ошибке или другом
+    статусе каждый запрос вычисляет ответ сам. Не подходит для представлений,
+    ответ которых различается от вызова к вызову (например, перемешивание).
+
+    Каждый вызывающий получает собственный HttpResponse с тем же телом,
+    статусом, заголовками и cookies, поэтому middleware не делят объект
+    ответа между запросами.
+    """
+    def decorator(view):
+        view_name = f"{view.__module__}.{view.__name__}"
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+
+            key = _request_key(view_name, request, vary_on_user)
+
+            def compute():
+                return _freeze(view(request, *args, **kwargs))
+
+            def run():
+                if shared:
+                    return _run_shared(
+                        key,
+                        compute,
+                        lock_ttl or getattr(settings, "SINGLE_FLIGHT_LOCK_TTL", 5),
+                        result_ttl or getattr(settings, "SINGLE_FLIGHT_RESULT_TTL", 1),
+                    )
+                return compute()
+
+            return _thaw(_flight.do(key, run, shareable=_shareable))
+
+        return wrapper
+
+    return decorator
+
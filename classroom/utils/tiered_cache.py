@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """
+    Двухуровневый кеш: процессный LRU + общий Django-кеш (Redis).
+
+    Локальный уровень живёт недолго (local_ttl) и не инвалидируется между
+    процессами, поэтому ему доверяют только там, где краткая устарелость
+    допустима. Общий уровень инвалидируется явно через delete().
+
+    Ошибки общего кеша не пробрасываются: значение просто загружается заново.
+    """
+
+    def __init__(self, prefix, maxsize=1024, local_ttl=5, shared_ttl=300, cache_alias="default"):
+        self.prefix = prefix
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.cache_alias = cache_alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, key):
+        return f"{self.prefix}:{key}"
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def get_shared(self, key):
+        try:
+            return self.shared.get(self._key(key))
+        except Exception as e:
+            logger.warning("Shared cache read failed for %s: %s", self._key(key), e)
+            return None
+
+    def set_shared(self, key, value):
+        try:
+            self.shared.set(self._key(key), value, self.shared_ttl)
+        except Exception as e:
+            logger.warning("Shared cache write failed for %s: %s", self._key(key), e)
+
+    def get(self, key, loader, use_local=True):
+        """
+        Возвращает значение по ключу, при промахе вызывает loader().
+        None из loader() не кешируется.
+        """
+        if use_local:
+            value = self.get_local(key)
+            if value is not None:
+                return value
+
+        value = self.get_shared(key)
+        if value is None:
+            value = loader()
+            if value is None:
+                return None
+            self.set_shared(key, value)
+
+        self.set_local(key, value)
+        return value
+
+    async def aget_shared(self, key):
+        try:
+            return await self.shared.aget(self._key(key))
+        except Exception as e:
+            logger.warning("Shared cache read failed for %s: %s", self._key(key), e)
+            return None
+
+    async def aset_shared(self, key, value):
+        try:
+            await self.shared.aset(self._key(key), value, self.shared_ttl)
+        except Exception as e:
+            logger.warning("Shared cache write failed for %s: %s", self._key(key), e)
+
+    async def aget(self, key, aloader, use_local=True):
+        """
+        Асинхронная версия get(): aloader — корутинная функция.
+        """
+        if use_local:
+            value = self.get_local(key)
+            if value is not None:
+                return value
+
+        value = await self.aget_shared(key)
+        if value is None:
+            value = await aloader()
+            if value is None:
+                return None
+            await self.aset_shared(key, value)
+
+        self.set_local(key, value)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+        try:
+            self.shared.delete(self._key(key))
+        except Exception as e:
+            logger.warning("Shared cache delete failed for %s: %s", self._key(key), e)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
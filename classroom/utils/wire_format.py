@@ -0,0 +1,114 @@
+"""
+Формат исходящих WebSocket-кадров виртуального класса на проводе.
+
+Кадры готовятся один раз как JSON-строки (json_codec.encode_frame) и
+рассылаются без повторной сериализации. Клиент может предложить
+подпротокол SUBPROTOCOL_MSGPACK; тогда соединение отправляет те же кадры
+бинарными сообщениями MessagePack:
+
+    JSON_WIRE     — текстовые JSON-кадры (без подпротокола)
+    MSGPACK_WIRE  — бинарные кадры MessagePack той же структуры
+
+Перекодирование JSON -> MessagePack кешируется по строке кадра, поэтому
+при рассылке на класс кадр пакуется один раз на процесс, а batch
+собирается из уже упакованных кадров. Кешируются только кадры не длиннее
+PACK_CACHE_MAX_FRAME символов: крупные (снимки урока, ответы resume)
+пакуются каждый раз, чтобы кеш не держал их в памяти. Входящие сообщения клиента остаются
+JSON-текстом: они короткие и редкие.
+
+Сжатие permessage-deflate согласует ASGI-сервер (uvicorn с websockets
+включает его по умолчанию) и работает поверх любого из форматов.
+"""
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+
+from classroom.utils.json_codec import loads
+from classroom.utils.outbound_queue import build_batch
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SUBPROTOCOL_MSGPACK = "classroom.msgpack"
+
+PACK_CACHE_MAX_FRAME = 4096
+
+
+def msgpack_enabled() -> bool:
+    return msgpack is not None and getattr(settings, "CLASSROOM_WS_MSGPACK", True)
+
+
+def negotiate(subprotocols) -> Optional[str]:
+    """
+    Выбирает подпротокол из предложенных клиентом; None — обычный JSON.
+    """
+    if SUBPROTOCOL_MSGPACK in (subprotocols or ()) and msgpack_enabled():
+        return SUBPROTOCOL_MSGPACK
+    return None
+
+
+def _pack(frame: str) -> bytes:
+    return msgpack.packb(loads(frame), use_bin_type=True)
+
+
+_pack_cached = lru_cache(maxsize=2048)(_pack)
+
+
+def pack_frame(frame: str) -> bytes:
+    """
+    Перекодирует JSON-кадр в MessagePack.
+    """
+    if len(frame) > PACK_CACHE_MAX_FRAME:
+        return _pack(frame)
+    return _pack_cached(frame)
+
+
+@lru_cache(maxsize=1)
+def _batch_prefix() -> bytes:
+    return msgpack.packb({"type": "batch", "data": []})[:-1]
+
+
+def pack_batch(frames) -> bytes:
+    """
+    Склеивает кадры в batch-кадр {"type": "batch", "data": [...]} из кешированных упаковок.
+    """
+    if len(frames) == 1:
+        return pack_frame(frames[0])
+    packer = msgpack.Packer()
+    return b"".join((_batch_prefix(), packer.pack_array_header(len(frames)), *map(pack_frame, frames)))
+
+
+class JsonWire:
+    subprotocol = None
+
+    @staticmethod
+    def message(frame) -> dict:
+        """
+        Аргументы send() для JSON-кадра или готового batch.
+        """
+        return {"text_data": frame}
+
+    batch = staticmethod(build_batch)
+
+
+class MsgpackWire:
+    subprotocol = SUBPROTOCOL_MSGPACK
+
+    @staticmethod
+    def message(frame) -> dict:
+        if isinstance(frame, str):
+            frame = pack_frame(frame)
+        return {"bytes_data": frame}
+
+    batch = staticmethod(pack_batch)
+
+
+JSON_WIRE = JsonWire()
+MSGPACK_WIRE = MsgpackWire()
+
+
+def get_wire(subprotocol):
+    return MSGPACK_WIRE if subprotocol == SUBPROTOCOL_MSGPACK else JSON_WIRE
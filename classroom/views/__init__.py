@@ -2,7 +2,8 @@ from .room import classroom_view, set_copying_enabled, change_classroom_password
     create_classroom_view, attach_lesson_view, classroom_edit_title_view, delete_classroom_view, get_classroom_students_list, \
     get_jitsi_token
 from .join import join_classroom_view, verify_classroom_password_view, join_classroom_finalize_view
-from .answers.answers import get_task_answer, get_section_answers, save_answer, mark_answer_as_checked
+from .answers.answers import get_task_answer, get_section_answers, get_section_answers_bundle, save_answer, \
+    mark_answer_as_checked, mark_task_answers_as_checked
 from .answers.moderation import delete_user_task_answers, delete_classroom_task_answers
 from .answers.statistics import get_classroom_task_statistics, get_classroom_section_statistics
 from .chat import chat_messages, chat_send, chat_edit, chat_delete
\ No newline at end of file
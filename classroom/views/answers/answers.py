@@ -1,8 +1,9 @@
 import json
+import logging
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_POST
 
@@ -11,12 +12,21 @@ from rest_framework.exceptions import ValidationError
 from courses.models import Section, Task
 from classroom.models import Classroom
 from classroom.services import check_user_access
+from classroom.services.answers import (
+    check_task_answers, get_section_answer_payloads, iter_section_answers_bundle, save_user_answer,
+    TaskNotFound, UnsupportedTaskType,
+)
+from classroom.services.statistics import notify_statistics_changed
 
 from classroom.registry import get_answer_model_by_task_type, get_all_answer_models
+from classroom.utils.single_flight import single_flight
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
 
+
+@single_flight(vary_on_user="user")
 def get_task_answer(request):
     """
     Возвращает ответ конкретного пользователя на конкретное задание в классе.
@@ -80,33 +90,39 @@ def get_section_answers(request):
     if not check_user_access(request.user, classroom, target_user):
         return JsonResponse({"error": "Access denied"}, status=403)
 
-    tasks = Task.objects.filter(section=section)
-    answers = []
-
-    for task in tasks:
-        answer_model = get_answer_model_by_task_type(task.task_type)
-        if not answer_model:
-            continue
-
-        answer = answer_model.objects.filter(
-            task=task,
-            classroom=classroom,
-            user=target_user,
-        ).first()
-
-        answers.append({
-            "task_id": str(task.id),
-            "task_type": task.task_type,
-            "answer": answer.get_answer_data() if answer else None,
-        })
-
     return JsonResponse({
         "section_id": str(section.id),
         "section_title": section.title,
-        "answers": answers,
+        "answers": get_section_answer_payloads(classroom, section, target_user),
     })
 
 
+@login_required
+def get_section_answers_bundle(request, classroom_id, section_id):
+    """
+    Возвращает ответы всех участников класса на задания раздела одним ответом.
+    Используется учителем: переключение просматриваемого ученика
+    берёт ответы из памяти клиента без запросов на сервер.
+
+    Формат выдачи:
+    {
+        "section_id": str,
+        "tasks": [{"task_id": str, "task_type": str}, ...],
+        "answers": {user_id: {task_id: {...данные ответа...}}}
+    }
+    """
+    classroom = get_object_or_404(Classroom, id=classroom_id)
+    if request.user.id != classroom.teacher_id:
+        return JsonResponse({"error": "Access denied"}, status=403)
+
+    # Раздел другого урока не раскрывает ответы класса на чужие задания
+    section = get_object_or_404(Section, id=section_id, lesson_id=classroom.lesson_id)
+    return StreamingHttpResponse(
+        iter_section_answers_bundle(classroom, section),
+        content_type="application/json",
+    )
+
+
 @require_POST
 @login_required
 def save_answer(request, classroom_id):
@@ -139,19 +155,8 @@ def save_answer(request, classroom_id):
     if not check_user_access(request.user, classroom, target_user):
         return JsonResponse({"error": "Access denied"}, status=403)
 
-    answer_model = get_answer_model_by_task_type(task.task_type)
-    if not answer_model:
-        return JsonResponse({"success": False, "errors": "Unsupported task type"}, status=400)
-
     try:
-        answer, created = answer_model.objects.get_or_create(
-            task=task,
-            classroom=classroom,
-            user=target_user,
-        )
-
-        answer.save_answer_data(data)
-        answer.refresh_from_db()
+        answer, created = save_user_answer(classroom, task, target_user, data)
 
         return JsonResponse({
             "success": True,
@@ -159,6 +164,8 @@ def save_answer(request, classroom_id):
             "answer": answer.get_answer_data(),
         })
 
+    except UnsupportedTaskType:
+        return JsonResponse({"success": False, "errors": "Unsupported task type"}, status=400)
     except ValidationError as exc:
         return JsonResponse({"success": False, "errors": str(exc)}, status=400)
     except Exception as e:
@@ -204,12 +211,60 @@ def mark_answer_as_checked(request, classroom_id):
         classroom=classroom,
         user=target_user,
     )
+    answer.task = task
 
     try:
         answer.mark_as_checked()
+        notify_statistics_changed(classroom, task, [(target_user, answer)])
         return JsonResponse({
             "success": True,
             "answer": answer.get_answer_data(),
         })
     except Exception:
         return JsonResponse({"success": False, "errors": "Internal server error"}, status=500)
+
+
+
+@require_POST
+@login_required
+def mark_task_answers_as_checked(request, classroom_id):
+    """
+    Проверяет ответы всех учеников класса на задание (test, true_false).
+    Используется учителем.
+
+    JSON body:
+        {"task_id": "..."}
+    """
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"success": False, "errors": "Invalid JSON"}, status=400)
+
+    task_id = payload.get("task_id")
+    if not task_id:
+        return JsonResponse({"success": False, "errors": "task_id required"}, status=400)
+
+    task = get_object_or_404(Task, id=task_id)
+    classroom = get_object_or_404(Classroom, id=classroom_id)
+
+    if request.user.id != classroom.teacher_id:
+        return JsonResponse({"error": "Access denied"}, status=403)
+
+    try:
+        answers = check_task_answers(classroom, task, sender_id=request.user.id)
+    except UnsupportedTaskType:
+        return JsonResponse(
+            {"success": False, "errors": "Task type does not support checking"},
+            status=400,
+        )
+    except TaskNotFound:
+        return JsonResponse({"success": False, "errors": "Task not found"}, status=404)
+    except Exception:
+        logger.exception("Failed to check answers for task %s in classroom %s", task_id, classroom_id)
+        return JsonResponse({"success": False, "errors": "Internal server error"}, status=500)
+
+    return JsonResponse({
+        "success": True,
+        "checked": len(answers),
+        "answers": {str(answer.user_id): answer.get_answer_data() for answer in answers},
+    })
@@ -6,6 +6,8 @@ from django.views.decorators.http import require_http_methods
 from courses.models import Task
 from classroom.models import Classroom
 from classroom.services import check_user_access
+from classroom.services.answers import reset_task_answers, UnsupportedTaskType
+from classroom.services.statistics import notify_statistics_changed
 
 from classroom.registry import get_all_answer_models
 
@@ -38,7 +40,9 @@ def delete_user_task_answers(request, classroom_id, task_id, user_id):
                 ).first()
 
                 if answer:
+                    answer.task = task
                     answer.delete_answers()
+                    notify_statistics_changed(classroom, task, [(user, answer)])
                     deleted_count += 1
 
             except answer_model.DoesNotExist:
@@ -70,37 +74,15 @@ def delete_classroom_task_answers(request, classroom_id, task_id):
         classroom = get_object_or_404(Classroom, id=classroom_id)
         task = get_object_or_404(Task, id=task_id)
 
-        deleted_users = 0
-        total_deleted_types = 0
-
-        students = classroom.students.all()
-        teacher = classroom.teacher
-
-        answer_models = get_all_answer_models()
+        if request.user.id != classroom.teacher_id:
+            return JsonResponse({"error": "Доступ запрещен"}, status=403)
 
-        for student in list(students) + [teacher]:
-            user_deleted_types = 0
-
-            for answer_model in answer_models:
-                try:
-                    answer = answer_model.objects.filter(
-                        classroom=classroom,
-                        task=task,
-                        user=student
-                    ).first()
-
-                    if answer:
-                        answer.delete_answers()
-                        user_deleted_types += 1
-                        total_deleted_types += 1
-
-                except answer_model.DoesNotExist:
-                    continue
-                except Exception as e:
-                    pass
-
-            if user_deleted_types > 0:
-                deleted_users += 1
+        try:
+            deleted_users = reset_task_answers(classroom, task, sender_id=request.user.id)
+        except UnsupportedTaskType:
+            deleted_users = 0
+        # У задания одна модель ответа: на пользователя сбрасывается один тип
+        total_deleted_types = deleted_users
 
         return JsonResponse({
             'success': True,
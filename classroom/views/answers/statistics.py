@@ -1,11 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
 from django.http import JsonResponse
 
 from courses.models import Section, Task
 from classroom.models import Classroom
 
-from classroom.registry import get_all_answer_models
+from classroom.services.statistics import get_section_statistics, get_task_statistics
 
 User = get_user_model()
 
@@ -13,6 +12,8 @@ User = get_user_model()
 def get_classroom_section_statistics(request, classroom_id, section_id):
     """
     Возвращает статистику выполнения всех заданий раздела для всех студентов класса.
+    Используется для начальной загрузки и ресинхронизации панели, дальше
+    изменения приходят по WebSocket кадрами statistics:update.
 
     Формат выдачи:
     {
@@ -40,44 +41,7 @@ def get_classroom_section_statistics(request, classroom_id, section_id):
             return JsonResponse({'error': 'Access denied'}, status=403)
 
         section = Section.objects.get(id=section_id)
-        students = classroom.students.all()
-        tasks = Task.objects.filter(section=section)
-
-        answer_models = get_all_answer_models()
-
-        tasks_data = []
-
-        for task in tasks:
-            aggregated = {}
-            for model in answer_models:
-                for item in model.objects.filter(task=task, classroom=classroom).values('user').annotate(
-                        total_correct=Sum('correct_answers'),
-                        total_wrong=Sum('wrong_answers'),
-                        total_answers=Sum('total_answers')
-                ):
-                    aggregated[item['user']] = {
-                        'correct': item['total_correct'] or 0,
-                        'wrong': item['total_wrong'] or 0,
-                        'total': item['total_answers'] or 0
-                    }
-
-            task_stats = []
-            for student in students:
-                data = aggregated.get(student.id, {'correct': 0, 'wrong': 0, 'total': 0})
-                correct = data['correct']
-                wrong = data['wrong']
-                total = data['total']
-                success_percentage = min(round((correct / (total + wrong)) * 100) if total + wrong > 0 else 0, 100)
-
-                task_stats.append({
-                    'user': {'id': student.id, 'username': student.display_name},
-                    'correct_answers': correct,
-                    'wrong_answers': wrong,
-                    'success_percentage': success_percentage
-                })
-
-            task_stats.sort(key=lambda x: x['success_percentage'], reverse=True)
-            tasks_data.append({'id': task.id, 'task_type': task.task_type, 'statistics': task_stats})
+        tasks_data = get_section_statistics(classroom, section)
 
         return JsonResponse({
             'classroom': {'id': classroom.id, 'title': classroom.title},
@@ -99,7 +63,7 @@ def get_classroom_task_statistics(request, classroom_id, task_id):
     Формат выдачи:
     {
         "classroom": {"id": str, "title": str},
-        "task": {"id": str, "title": str, "task_type": str},
+        "task": {"id": str, "task_type": str},
         "statistics": [
             {
                 "user": {"id": int, "username": str},
@@ -116,43 +80,11 @@ def get_classroom_task_statistics(request, classroom_id, task_id):
             return JsonResponse({'error': 'Access denied'}, status=403)
 
         task = Task.objects.get(id=task_id)
-        students = classroom.students.all()
-
-        answer_models = get_all_answer_models()
-
-        aggregated = {}
-        for model in answer_models:
-            for item in model.objects.filter(task=task, classroom=classroom).values('user').annotate(
-                    total_correct=Sum('correct_answers'),
-                    total_wrong=Sum('wrong_answers'),
-                    total_answers=Sum('total_answers')
-            ):
-                aggregated[item['user']] = {
-                    'correct': item['total_correct'] or 0,
-                    'wrong': item['total_wrong'] or 0,
-                    'total': item['total_answers'] or 0
-                }
-
-        statistics = []
-        for student in students:
-            data = aggregated.get(student.id, {'correct': 0, 'wrong': 0, 'total': 0})
-            correct = data['correct']
-            wrong = data['wrong']
-            total = data['total']
-            success_percentage = round((correct / (total + wrong)) * 100) if total + wrong > 0 else 0
-
-            statistics.append({
-                'user': {'id': student.id, 'username': student.display_name},
-                'correct_answers': correct,
-                'wrong_answers': wrong,
-                'success_percentage': success_percentage
-            })
-
-        statistics.sort(key=lambda x: x['success_percentage'], reverse=True)
+        statistics = get_task_statistics(classroom, task)
 
         return JsonResponse({
             'classroom': {'id': classroom.id, 'title': classroom.title},
-            'task': {'id': task.id, 'title': task.title, 'task_type': task.task_type},
+            'task': {'id': task.id, 'task_type': task.task_type},
             'statistics': statistics
         })
 
@@ -13,7 +13,7 @@ from django.contrib.auth import get_user_model
 
 from courses.models import Lesson
 from classroom.models import Classroom
-from classroom.services import set_copying, attach_lesson_and_notify
+from classroom.services import set_copying, attach_lesson_and_notify, get_roster, get_role, ROLE_TEACHER
 from .sessions import clear_verified_in_session
 
 User = get_user_model()
@@ -164,18 +164,18 @@ def classroom_view(request, classroom_id):
 
     classroom = get_object_or_404(Classroom, pk=classroom_id)
 
-    is_teacher = request.user == classroom.teacher
+    role = get_role(classroom.id, request.user.id)
+    is_teacher = role == ROLE_TEACHER
 
-    if request.user not in classroom.students.all() and not is_teacher:
+    if role is None:
         join_url = reverse("join_classroom_view", args=[classroom_id])
         if classroom.join_password:
             join_url += f"?pw={classroom.join_password}"
         return redirect(join_url)
 
-    students_qs = classroom.students.all().values_list("id", flat=True)
-
     if is_teacher:
-        viewed_user_id = students_qs[0] if students_qs else request.user.id
+        student_ids = get_roster(classroom.id).student_ids
+        viewed_user_id = student_ids[0] if student_ids else request.user.id
     else:
         viewed_user_id = request.user.id
 
@@ -210,7 +210,7 @@ def classroom_view(request, classroom_id):
 def get_current_lesson_id(request, classroom_id):
     classroom = get_object_or_404(Classroom, pk=classroom_id)
 
-    if request.user != classroom.teacher and request.user not in classroom.students.all():
+    if get_role(classroom.id, request.user.id) is None:
         return JsonResponse({"error": "Доступ запрещен."}, status=403)
 
     return JsonResponse({
@@ -316,10 +316,10 @@ def get_jitsi_token(request, classroom_id):
 
         classroom = get_object_or_404(Classroom, id=classroom_id)
 
-        is_teacher = request.user == classroom.teacher
-        is_student = request.user in classroom.students.all()
+        role = get_role(classroom.id, request.user.id)
+        is_teacher = role == ROLE_TEACHER
 
-        if not (is_teacher or is_student):
+        if role is None:
             return JsonResponse({
                 "error": "Вы не состоите в этом классе"
             }, status=403)
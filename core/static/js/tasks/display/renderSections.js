@@ -88,7 +88,7 @@ function highlightSelectedSection(sectionId) {
     });
 }
 
-export async function selectSection(sectionId) {
+export async function selectSection(sectionId, preloadedTasks = null) {
     if (!sectionId) return;
 
     const sectionList = document.querySelectorAll('#section-list li[data-section-id]');
@@ -103,7 +103,7 @@ export async function selectSection(sectionId) {
 
     if (sectionId) infoEl.dataset.sectionId = sectionId;
 
-    await loadSectionTasks(sectionId);
+    await loadSectionTasks(sectionId, preloadedTasks);
 }
 
 /**
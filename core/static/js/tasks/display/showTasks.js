@@ -135,8 +135,9 @@ let activeSectionRequestId = 0;
 /**
  * Загружает задания выбранного раздела
  * @param {string} sectionId
+ * @param {Array|null} preloadedTasks - задания, уже полученные вместе со снимком урока
  */
-export async function loadSectionTasks(sectionId) {
+export async function loadSectionTasks(sectionId, preloadedTasks = null) {
     if (!taskListContainer || !sectionId) return;
 
     const requestId = ++activeSectionRequestId;
@@ -145,7 +146,7 @@ export async function loadSectionTasks(sectionId) {
     loader.style.display = "flex";
 
     try {
-        const tasks = await fetchSectionTasks(sectionId);
+        const tasks = Array.isArray(preloadedTasks) ? preloadedTasks : await fetchSectionTasks(sectionId);
         if (requestId !== activeSectionRequestId) return;
 
         if (!Array.isArray(tasks) || tasks.length === 0) return;
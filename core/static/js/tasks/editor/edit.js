@@ -508,7 +508,10 @@ export function attachControlsToTaskCard(taskCard) {
 
             try {
                 await clearTask(taskId);
-                eventBus.emit("answer:reset", { taskId });
+                // Сброс всего класса сервер сам рассылает одним событием answer:reset
+                if (getViewedUserId() !== "all") {
+                    eventBus.emit("answer:reset", { taskId });
+                }
                 showNotification("Ответы сброшены");
             } catch (err) {
                 console.error("Reset answer failed:", err);
@@ -7,6 +7,7 @@ from django.core.files.storage import default_storage
 from django.http import JsonResponse
 from rest_framework import serializers
 
+from classroom.answer_keys import invalidate_answer_key
 from courses.models import Section, Task, TASK_MODEL_MAP
 from courses.serializers import SERIALIZER_MAP
 from fastlesson import settings
@@ -208,6 +209,7 @@ class TaskProcessor:
             for key, value in validated_data.items():
                 setattr(specific_obj, key, value)
             specific_obj.save()
+            invalidate_answer_key(self.task.content_type_id, self.task.object_id)
             return specific_obj
 
         return None
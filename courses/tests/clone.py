@@ -12,6 +12,7 @@ from django.contrib.contenttypes.models import ContentType
 from courses.models import Course, Lesson, Section, Task, NoteTask, FileTask
 from courses.services import CloneService
 from courses.services import CopyService
+from courses.tests.fixtures import use_temp_media_root
 
 User = get_user_model()
 
@@ -25,6 +26,7 @@ class CloneCourseTests(TestCase):
         """
         Настройка тестовых данных.
         """
+        use_temp_media_root(self)
         self.user = User.objects.create_user(username='teacher', password='testpass')
         self.admin = User.objects.create_user(username='admin', password='testpass', is_staff=True)
         self.student = User.objects.create_user(username='student', password='testpass')
@@ -11,6 +11,7 @@ from django.contrib.contenttypes.models import ContentType
 from courses.models import Course, Lesson, Section, Task, NoteTask, FileTask
 from courses.services import CloneService
 from courses.services import CopyService
+from courses.tests.fixtures import use_temp_media_root
 
 User = get_user_model()
 
@@ -24,6 +25,7 @@ class CopyCourseTests(TestCase):
         """
         Настройка тестовых данных.
         """
+        use_temp_media_root(self)
         self.user = User.objects.create_user(username='teacher', password='testpass')
         self.admin = User.objects.create_user(username='admin', password='testpass', is_staff=True)
         self.student = User.objects.create_user(username='student', password='testpass')
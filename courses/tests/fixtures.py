@@ -0,0 +1,21 @@
+"""
+Общие данные для тестов курсов.
+"""
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+def use_temp_media_root(test_case):
+    """
+    Переключает MEDIA_ROOT на временный каталог до конца теста,
+    чтобы загруженные и скопированные файлы не попадали в media/ проекта.
+    """
+    media_root = tempfile.mkdtemp(prefix="fastlesson-media-")
+    test_case.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+
+    media_settings = override_settings(MEDIA_ROOT=media_root)
+    media_settings.enable()
+    test_case.addCleanup(media_settings.disable)
+    return media_root
@@ -10,6 +10,7 @@ from rest_framework import serializers
 from courses.models import Section, Lesson, Course, Task, TestTask, NoteTask, TrueFalseTask, FillGapsTask, \
     MatchCardsTask, TextInputTask, IntegrationTask, FileTask, WordListTask
 from courses.services import TaskProcessor, get_task_data, CloneService, CopyService
+from courses.tests.fixtures import use_temp_media_root
 
 
 def parse_json_response(response):
@@ -18,6 +19,7 @@ def parse_json_response(response):
 
 class TaskProcessorTests(TestCase):
     def setUp(self):
+        use_temp_media_root(self)
         User = get_user_model()
         self.user = User.objects.create_user(
             username='testuser',
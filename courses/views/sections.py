@@ -6,7 +6,10 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 
+from classroom.utils.single_flight import single_flight
 
+
+@single_flight(vary_on_user="auth", shared=True)
 def lesson_sections(request, lesson_id):
     """
     Возвращает список разделов урока (оригинал или копия)
@@ -5,10 +5,13 @@ from channels.auth import AuthMiddlewareStack
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fastlesson.settings')
 
 from django.core.asgi import get_asgi_application
+
+django_asgi_app = get_asgi_application()
+
 import fastlesson.routing
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             fastlesson.routing.websocket_urlpatterns
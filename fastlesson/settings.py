@@ -80,12 +80,69 @@ CHANNEL_LAYERS = {
                 config('REDIS_HOST', default='127.0.0.1'),
                 config('REDIS_PORT', default=6379, cast=int)
             )],
+            # Полоса управляющих событий виртуального класса (classroom.services.lanes).
+            # Её каналы делят очередь процесса с массовым трафиком, предел лишь
+            # выше: отправка control получает ChannelFull позже обычной
+            "channel_capacity": {
+                "*.control": config('CLASSROOM_CONTROL_CAPACITY', default=1000, cast=int),
+            },
         },
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        "LOCATION": config(
+            'CACHE_LOCATION',
+            default=f"redis://{config('REDIS_HOST', default='127.0.0.1')}:{config('REDIS_PORT', default=6379, cast=int)}/1"
+        ),
+    },
+}
+
 CHANNELS_WS_PROTOCOLS = ["graphql-ws"]
 
+# Виртуальный класс: присутствие учеников (секунды)
+CLASSROOM_PRESENCE_TTL = config('CLASSROOM_PRESENCE_TTL', default=90, cast=int)
+
+# Виртуальный класс: keepalive соединений (секунды). Раз в PING_INTERVAL сервер шлёт ping
+# и продлевает присутствие; сокет, молчащий дольше IDLE_TIMEOUT, закрывается.
+# Каналы, не отмечавшиеся дольше CHANNEL_TTL, удаляет из групп sweep_classroom_groups
+CLASSROOM_PING_INTERVAL = config('CLASSROOM_PING_INTERVAL', default=25, cast=int)
+CLASSROOM_IDLE_TIMEOUT = config('CLASSROOM_IDLE_TIMEOUT', default=75, cast=int)
+CLASSROOM_CHANNEL_TTL = config('CLASSROOM_CHANNEL_TTL', default=120, cast=int)
+
+# Виртуальный класс: кодировщик WebSocket-кадров (auto, orjson, json)
+CLASSROOM_JSON_ENCODER = config('CLASSROOM_JSON_ENCODER', default='auto')
+
+# Виртуальный класс: бинарный подпротокол classroom.msgpack для клиентов, которые его предлагают.
+# permessage-deflate согласует uvicorn (включено по умолчанию) поверх любого формата
+CLASSROOM_WS_MSGPACK = config('CLASSROOM_WS_MSGPACK', default=True, cast=bool)
+
+# Виртуальный класс: окно микробатчинга исходящих кадров (мс, 0 — выключено, разумно 30–100)
+CLASSROOM_BATCH_WINDOW_MS = config('CLASSROOM_BATCH_WINDOW_MS', default=0, cast=int)
+# Виртуальный класс: предел обычных кадров в исходящей очереди, старшие сверх него отбрасываются
+CLASSROOM_OUTBOX_MAX_PENDING = config('CLASSROOM_OUTBOX_MAX_PENDING', default=200, cast=int)
+
+# Виртуальный класс: лимиты входящих действий по умолчанию заданы в
+# classroom.utils.rate_limit.DEFAULT_RATE_LIMITS; переопределяются через CLASSROOM_RATE_LIMITS
+
+# Виртуальный класс: журнал событий для возобновления потока после переподключения
+CLASSROOM_EVENT_LOG_SIZE = config('CLASSROOM_EVENT_LOG_SIZE', default=500, cast=int)
+CLASSROOM_EVENT_LOG_TTL = config('CLASSROOM_EVENT_LOG_TTL', default=3600, cast=int)
+CLASSROOM_EVENT_LOG_MAX_FRAME = config('CLASSROOM_EVENT_LOG_MAX_FRAME', default=16384, cast=int)
+
+# Виртуальный класс: максимальный размер снимка урока в событии lesson:attached (байты)
+CLASSROOM_LESSON_SNAPSHOT_MAX_BYTES = config('CLASSROOM_LESSON_SNAPSHOT_MAX_BYTES', default=262144, cast=int)
+
+# Виртуальный класс: кеш состава класса (секунды)
+CLASSROOM_ROSTER_TTL = config('CLASSROOM_ROSTER_TTL', default=3600, cast=int)
+CLASSROOM_ROSTER_LOCAL_TTL = config('CLASSROOM_ROSTER_LOCAL_TTL', default=5, cast=int)
+
+# Схлопывание одинаковых одновременных GET-запросов (секунды)
+SINGLE_FLIGHT_LOCK_TTL = config('SINGLE_FLIGHT_LOCK_TTL', default=5, cast=int)
+SINGLE_FLIGHT_RESULT_TTL = config('SINGLE_FLIGHT_RESULT_TTL', default=1, cast=int)
+
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 7776000    # 90 дней
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False